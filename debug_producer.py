@@ -7,8 +7,8 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from data_generator import TransactionGenerator
-from config import config
+from src.data_generator import TransactionGenerator
+from src.config import config
 import json
 import logging
 
@@ -21,7 +21,7 @@ def debug_producer_with_kafka():
     
     # Import the producer here to avoid issues if Kafka is not available
     try:
-        from producer import TransactionProducer
+        from src.producer import TransactionProducer
     except ImportError as e:
         logger.error(f"Failed to import TransactionProducer: {e}")
         return False
@@ -0,0 +1,269 @@
+"""
+Historical backfill: generate a date range of event-time traffic as fast as possible, then exit
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+from .config import config
+from .data_generator import TransactionGenerator
+from .ids import MAX_WORKER_ID
+from .profiles import PRODUCER_PROFILES
+from .scheduler import RateProfile, parse_rate_profile
+from .timestamps import from_micros, to_micros
+
+logger = logging.getLogger(__name__)
+
+# Rate samples per shard when integrating a rate profile
+PROFILE_SAMPLES = 60
+
+class Shard(NamedTuple):
+    """A slice of the backfill range and the number of transactions it holds"""
+    index: int
+    start_us: int
+    end_us: int
+    count: int
+
+    @property
+    def label(self) -> str:
+        return from_micros(self.start_us).strftime("%Y%m%dT%H%M%S")
+
+def plan_shards(start: datetime, end: datetime, shard_seconds: float = 3600.0, per_day: Optional[float] = None,
+                total: Optional[int] = None, profile: Optional[RateProfile] = None) -> List[Shard]:
+    """Split ``start``-``end`` into shards and assign each its share of the volume.
+
+    Volume is ``per_day`` transactions per day, ``total`` spread over the
+    range, or a rate profile integrated over event time (seconds since
+    ``start``). With both a profile and ``total`` the profile only sets the
+    shape. Counts are rounded cumulatively, so they add up to the exact total.
+    """
+    if end <= start:
+        raise ValueError(f"Backfill end {end} is not after its start {start}")
+    if shard_seconds <= 0:
+        raise ValueError(f"Shard length must be positive, got {shard_seconds}")
+    if profile is None and per_day is None and total is None:
+        raise ValueError("Backfill needs a volume: per_day, total or a rate profile")
+    start_us, end_us = to_micros(start), to_micros(end)
+    step_us = int(shard_seconds * 1_000_000)
+    bounds = list(range(start_us, end_us, step_us)) + [end_us]
+    lengths = np.diff(bounds) / 1e6
+
+    if profile is not None:
+        expected = np.empty(len(lengths))
+        for i, (begin, length) in enumerate(zip(bounds, lengths)):
+            offset = (begin - start_us) / 1e6
+            midpoints = offset + (np.arange(PROFILE_SAMPLES) + 0.5) * length / PROFILE_SAMPLES
+            expected[i] = sum(profile.rate(t) for t in midpoints.tolist()) * length / PROFILE_SAMPLES
+        if total is not None:
+            expected *= total / expected.sum() if expected.sum() else 0
+    elif per_day is not None:
+        expected = lengths * per_day / 86400
+    else:
+        expected = lengths * total / lengths.sum()
+
+    counts = np.diff(np.rint(np.concatenate([[0.0], np.cumsum(expected)]))).astype(np.int64)
+    return [Shard(i, bounds[i], bounds[i + 1], int(count)) for i, count in enumerate(counts.tolist())]
+
+def shard_seed(seed: int, index: int) -> int:
+    """Independent, reproducible seed for one shard"""
+    return int(np.random.SeedSequence([seed, index]).generate_state(1, np.uint64)[0])
+
+class ShardClock:
+    """Event clock spreading a shard's transactions evenly over its time span.
+
+    Each batch covers the share of the span matching its share of the
+    shard's transactions, using a cumulative sum of random gaps, so
+    timestamps never go backwards and the last one is before ``end_us``.
+    """
+
+    tracks_wall_clock = False
+
+    def __init__(self, start_us: int, end_us: int, count: int):
+        self.start_us = start_us
+        self.end_us = end_us
+        self.count = count
+        self.done = 0
+
+    def next_batch(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        span = self.end_us - self.start_us
+        total = max(self.count, self.done + count)
+        low = self.start_us + span * self.done / total
+        high = self.start_us + span * (self.done + count) / total
+        gaps = np.cumsum(rng.exponential(size=count + 1))
+        self.done += count
+        return np.floor(low + gaps[:-1] / gaps[-1] * (high - low)).astype(np.int64)
+
+    def stamp(self, timestamp_us: np.ndarray, rng: np.random.Generator):
+        timestamp_us[:] = self.next_batch(len(timestamp_us), rng)
+
+# Per-process state, set up once by _init_worker and reused for every shard
+_worker: Dict[str, Any] = {}
+
+def _init_worker(options: Dict[str, Any], slots=None):
+    """Build this process's generator and, for Kafka or sink output, its producer.
+
+    Pool processes take the next of ``slots``, a shared counter, and offset
+    ``ID_WORKER_ID`` by it so their snowflake IDs never collide.
+    """
+    if slots is not None:
+        with slots.get_lock():
+            slot = slots.value
+            slots.value += 1
+        config.generator.id_worker_id += slot
+    config.sink.type = options["sink"]
+    config.kafka.profile = options["producer_profile"]
+    # Workers would share one journal directory, and shards are settled (or counted failed) before they finish
+    config.spill.enabled = False
+    _worker["options"] = options
+    _worker["generator"] = TransactionGenerator(seed=options["seed"], pool_refresh_interval=0)
+    if options["format"] is None:
+        from .producer import TransactionProducer
+
+        _worker["producer"] = TransactionProducer()
+
+def _close_worker():
+    if "producer" in _worker:
+        _worker.pop("producer").close()
+    if "generator" in _worker:
+        _worker.pop("generator").close()
+
+def _run_shard(shard: Shard) -> Dict[str, Any]:
+    """Generate one shard and write it out, returning its row and failure counts"""
+    from .file_sinks import create_file_sink
+
+    options = _worker["options"]
+    generator = _worker["generator"]
+    if options["seed"] is not None:
+        generator.reseed(shard_seed(options["seed"], shard.index))
+    generator.clock = ShardClock(shard.start_us, shard.end_us, shard.count)
+    started = time.perf_counter()
+    rows = failed = 0
+    if options["format"] is not None:
+        sink = create_file_sink(options["format"], options["output"], options["compression"],
+                                prefix=f"transactions-{shard.label}")
+        with sink:
+            while rows < shard.count:
+                rows += sink.write_batch(generator.generate_batch(min(options["batch_size"], shard.count - rows)))
+    else:
+        producer = _worker["producer"]
+        failed_before = producer.failed
+        while rows < shard.count:
+            rows += producer.send_batch(generator.generate_batch(min(options["batch_size"], shard.count - rows)))
+        # Deliveries are settled per shard, so a finished shard is a durable one
+        remaining = producer.checkpoint(timeout=60)
+        failed = producer.failed - failed_before + remaining
+    return {"index": shard.index, "rows": rows, "failed": failed, "seconds": time.perf_counter() - started}
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
+
+def run_backfill(shards: List[Shard], workers: int = 0, batch_size: int = 50_000, seed: Optional[int] = None,
+                 output: Optional[str] = None, format: Optional[str] = None, compression: Optional[str] = None,
+                 sink: Optional[str] = None, producer_profile: str = "bulk-backfill",
+                 progress_interval: float = 10.0) -> Dict[str, Any]:
+    """Generate every shard, in ``workers`` processes (0 = this process), without pacing.
+
+    Output goes to file sinks in ``output`` when ``format`` is given, one set
+    of files per shard, or otherwise through ``TransactionProducer`` to the
+    configured sink (Kafka by default). Progress and an ETA are logged every
+    ``progress_interval`` seconds.
+    """
+    options = {"seed": seed, "batch_size": batch_size, "output": output, "format": format,
+               "compression": compression, "sink": sink or config.sink.type, "producer_profile": producer_profile}
+    # Pool process k mints snowflake IDs as ID_WORKER_ID + k
+    first_id = config.generator.id_worker_id
+    if config.generator.id_scheme == "snowflake" and first_id + max(workers, 1) - 1 > MAX_WORKER_ID:
+        raise ValueError(f"{workers} backfill workers need snowflake worker IDs {first_id} to "
+                         f"{first_id + workers - 1}, past {MAX_WORKER_ID}; lower ID_WORKER_ID")
+    if config.spill.enabled and format is None:
+        logger.warning("SPILL_ENABLED is ignored by backfill: undelivered messages are counted as failed per shard")
+    total = sum(shard.count for shard in shards)
+    pending = [shard for shard in shards if shard.count]
+    # Largest shards first keeps the pool busy to the end
+    pending.sort(key=lambda shard: -shard.count)
+    started = time.perf_counter()
+    last_report = started
+    done = failed = finished = 0
+
+    def report(result: Dict[str, Any]):
+        nonlocal done, failed, finished, last_report
+        done += result["rows"]
+        failed += result["failed"]
+        finished += 1
+        now = time.perf_counter()
+        if finished == len(pending) or now - last_report >= progress_interval:
+            rate = done / (now - started) if now > started else 0.0
+            eta = (total - done) / rate if rate else 0.0
+            logger.info(f"Backfill {done:,}/{total:,} rows ({done / total:.1%}), {finished}/{len(pending)} shards, "
+                        f"{rate:,.0f} rows/s, ETA {_format_duration(eta)}")
+            last_report = now
+
+    if workers <= 0:
+        _init_worker(options)
+        try:
+            for shard in pending:
+                report(_run_shard(shard))
+        finally:
+            _close_worker()
+    else:
+        slots = multiprocessing.Value('i', 0)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options, slots)) as pool:
+            futures = [pool.submit(_run_shard, shard) for shard in pending]
+            for future in as_completed(futures):
+                report(future.result())
+            # Worker producers are settled per shard, so exiting the pool loses nothing
+    elapsed = time.perf_counter() - started
+    summary = {"rows": done, "failed": failed, "shards": len(pending), "elapsed_s": elapsed,
+               "rows_per_sec": done / elapsed if elapsed else 0.0}
+    logger.info(f"Backfill finished: {done:,} rows in {len(pending)} shards in {_format_duration(elapsed)} "
+                f"({summary['rows_per_sec']:,.0f} rows/s, {failed} failed)")
+    return summary
+
+def main():
+    """Backfill a date range of event-time traffic, then exit"""
+    from .file_sinks import FILE_FORMATS
+    from .sinks import SINKS
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Generate historical traffic for a date range as fast as possible")
+    parser.add_argument("--start", required=True, help="first event time, ISO format (e.g. 2024-01-01)")
+    parser.add_argument("--end", required=True, help="end of the range, exclusive (e.g. 2024-01-31)")
+    volume = parser.add_argument_group("volume (per-day, total or a rate profile)")
+    volume.add_argument("--per-day", type=float, help="transactions per day")
+    volume.add_argument("--total", type=int, help="transactions over the whole range")
+    volume.add_argument("--rate-profile", help="event-time rate spec as in RATE_PROFILE, in seconds since --start; "
+                                               "with --total only its shape is used")
+    parser.add_argument("--shard-hours", type=float, default=1.0, help="event time per shard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="generator processes (0 = generate in this process)")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="transactions generated per batch")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible output")
+    parser.add_argument("--output", help="write to file sinks in this directory instead of producing")
+    parser.add_argument("--format", choices=FILE_FORMATS, default="parquet", help="file format with --output")
+    parser.add_argument("--compression", default=None, help="file codec with --output (default zstd, gzip for ndjson without zstandard)")
+    parser.add_argument("--sink", choices=sorted(SINKS), help="message sink without --output (overrides SINK)")
+    parser.add_argument("--producer-profile", choices=sorted(PRODUCER_PROFILES), default="bulk-backfill",
+                        help="producer tuning profile")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="seconds between progress reports")
+    args = parser.parse_args()
+
+    shards = plan_shards(datetime.fromisoformat(args.start), datetime.fromisoformat(args.end),
+                         args.shard_hours * 3600, per_day=args.per_day, total=args.total,
+                         profile=parse_rate_profile(args.rate_profile) if args.rate_profile else None)
+    logger.info(f"Backfilling {sum(shard.count for shard in shards):,} transactions from {args.start} to {args.end} "
+                f"in {len(shards)} shards with {args.workers} workers")
+    summary = run_backfill(shards, workers=args.workers, batch_size=args.batch_size, seed=args.seed,
+                           output=args.output, format=args.format if args.output else None,
+                           compression=args.compression, sink=args.sink, producer_profile=args.producer_profile,
+                           progress_interval=args.progress_interval)
+    raise SystemExit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Reproducible benchmark suite for the generation, serialization and produce paths
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from .blast import PayloadRing
+from .data_generator import TransactionGenerator, TRANSACTION_TYPES
+from .ids import ID_SCHEMES, create_id_generator
+from .serializers import SERIALIZERS, create_serializer
+from .sinks import NullSink
+
+logger = logging.getLogger(__name__)
+
+def _measure(name: str, items: int, func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Time ``func`` (best of ``repeat``) and trace its allocations in a separate run"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    before = tracemalloc.take_snapshot()
+    output = func()  # Kept alive so its memory counts as allocated by the stage
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del output
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    return {
+        "stage": name,
+        "items": items,
+        "seconds": best,
+        "items_per_sec": items / best if best else 0.0,
+        "us_per_item": best / items * 1e6 if items else 0.0,
+        "allocated_bytes_per_item": (current - base) / items if items else 0.0,
+        "allocated_blocks_per_item": blocks / items if items else 0.0,
+        "peak_bytes_per_item": (peak - base) / items if items else 0.0,
+    }
+
+def run_benchmarks(count: int = 20000, seed: int = 42, repeat: int = 3,
+                   stages: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Run every benchmark stage whose name starts with one of ``stages``"""
+    from .producer import TransactionProducer
+
+    generator = TransactionGenerator(seed=seed, pool_refresh_interval=0)
+    batch = generator.generate_batch(count)
+    records = batch.records()
+    views = batch.views()
+    dicts = batch.to_dicts()
+
+    cases: List[tuple] = []
+    for transaction_type in TRANSACTION_TYPES:
+        cases.append((f"generate.batch.{transaction_type}", count,
+                      lambda t=transaction_type: generator.generate_batch(count, t)))
+    cases.append(("generate.batch.mixed", count, lambda: generator.generate_batch(count)))
+    cases.append(("generate.counter.mixed", count, lambda: generator.generate_range(0, count)))
+    per_call = max(1, count // 20)
+    cases.append(("generate.single.IBFT", per_call,
+                  lambda: [generator.generate_ibft_transaction() for _ in range(per_call)]))
+    for scheme in ID_SCHEMES:
+        cases.append((f"ids.{scheme}", count, lambda ids=create_id_generator(scheme): ids.generate(count)))
+    cases.append(("batch.timestamps", count, batch.timestamps))
+    cases.append(("batch.records", count, batch.records))
+    cases.append(("batch.to_dicts", count, batch.to_dicts))
+    cases.append(("transaction.to_dict", count, lambda: [record.to_dict() for record in records]))
+
+    for name in SERIALIZERS:
+        try:
+            serializer = create_serializer(name)
+        except ImportError as e:
+            logger.info(f"Skipping serializer {name}: {e}")
+            continue
+        cases.append((f"encode.{name}.dict", count, lambda s=serializer: [s.encode(txn) for txn in dicts]))
+        cases.append((f"encode.{name}.record", count, lambda s=serializer: s.encode_rows(records)))
+
+    def send_batch():
+        producer = TransactionProducer(producer=NullSink())
+        producer.send_transactions_batch(views)
+        producer.checkpoint()
+
+    cases.append(("produce.send_transactions_batch", count, send_batch))
+
+    ring = PayloadRing(generator, create_serializer("json"), 1024)
+    blast_batch = ring.render(count)
+
+    def send_blast():
+        producer = TransactionProducer(producer=NullSink(), blast=True)
+        producer.send_blast(blast_batch)
+        producer.checkpoint()
+
+    cases.append(("blast.render", count, lambda: ring.render(count)))
+    cases.append(("produce.send_blast", count, send_blast))
+
+    results = []
+    for name, items, func in cases:
+        if stages and not any(name.startswith(stage) for stage in stages):
+            continue
+        result = _measure(name, items, func, repeat)
+        logger.info(f"{name:<36} {result['items_per_sec']:>12,.0f}/s "
+                    f"{result['allocated_bytes_per_item']:>8.0f} B/item "
+                    f"{result['peak_bytes_per_item']:>8.0f} B/item peak")
+        results.append(result)
+    generator.close()
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except Exception:
+        return None
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.20) -> List[Dict[str, Any]]:
+    """List stages whose throughput dropped more than ``threshold`` vs the baseline"""
+    previous = {r["stage"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(result["stage"])
+        if not before or not before["items_per_sec"]:
+            continue
+        change = result["items_per_sec"] / before["items_per_sec"] - 1
+        if change < -threshold:
+            regressions.append({"stage": result["stage"], "change": change,
+                                "before": before["items_per_sec"], "after": result["items_per_sec"]})
+    return regressions
+
+def main():
+    """Run the benchmark suite and write results as JSON"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Benchmark generation, serialization and produce paths")
+    parser.add_argument("--count", type=int, default=20000, help="transactions per stage")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per stage (best is kept)")
+    parser.add_argument("--stages", default=None, help="comma-separated stage name prefixes to run")
+    parser.add_argument("--output", default="benchmark_results.json", help="results JSON file")
+    parser.add_argument("--compare", default=None, help="baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed throughput drop vs baseline")
+    args = parser.parse_args()
+
+    # Keep the produce stage from logging per batch
+    logging.getLogger('src.producer').setLevel(logging.WARNING)
+
+    stages = args.stages.split(',') if args.stages else None
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "count": args.count,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": run_benchmarks(args.count, args.seed, args.repeat, stages),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold)
+        for regression in regressions:
+            logger.warning(f"REGRESSION {regression['stage']}: {regression['change']:+.1%} "
+                           f"({regression['before']:,.0f}/s -> {regression['after']:,.0f}/s)")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,25 @@ Configuration settings for the VPBank Transaction Simulator
 """
 
 import os
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 @dataclass
 class KafkaConfig:
     """Kafka configuration settings"""
     bootstrap_servers: str = "localhost:9092"
     topics: List[str] = None
+    profile: str = "default"        # Producer tuning profile: default, latency, throughput, durable-idempotent, bulk-backfill
+    pipelined: bool = True          # Keep messages in flight across batches instead of flushing each batch
+    max_in_flight: int = 100000     # Undelivered messages allowed before the producer applies backpressure
+    buffer_retry_timeout: float = 30.0  # Seconds to keep retrying when the local queue is full
+    checkpoint_interval: float = 0.0    # Seconds between flush checkpoints in pipelined mode (0 = shutdown only)
+    serializer: str = "orjson"          # Message encoding: json, orjson, msgspec, avro, protobuf
+    schema_registry_path: str = "schemas/registry.json"  # Local schema registry file for avro/protobuf
+    key_strategy: str = "transaction_id"  # Message key: transaction_id, sender_account, wallet_id, merchant_id, customer_name
+    hot_key_share: float = 0.0          # Fraction of messages sent with a single hot key (0 = none)
+    hot_key: str = "hot-key"            # Key used for the hot share
+    latency_headers: bool = False       # Stamp messages with generation/produce time headers for src.latency
     
     def __post_init__(self):
         if self.topics is None:
@@ -22,27 +33,161 @@ class TransactionConfig:
     min_interval: float = 0.1  # Minimum seconds between transactions
     max_interval: float = 5.0  # Maximum seconds between transactions
     batch_size: int = 100      # Number of transactions to generate per batch
+    rate_profile: str = ""     # Target-rate pacing spec, e.g. "constant:20000" (empty = random interval sleeps)
+    pacing_resolution: float = 0.001  # Seconds of traffic sent per paced chunk
+    rate_report_interval: float = 10.0  # Seconds between achieved-vs-target rate reports
     
+@dataclass
+class GeneratorConfig:
+    """Synthetic value generation settings"""
+    pool_size: int = 2000              # Pre-generated Faker values per pool (0 = call Faker per value)
+    pool_refresh_interval: float = 0.0  # Seconds between background pool refreshes (0 = never)
+    seed: Optional[int] = None         # Seed for reproducible output (None = random)
+    counter_mode: bool = False         # Derive transaction N from (seed, N) with a counter-based RNG
+    start_time: str = "2024-01-01T00:00:00"  # Timestamp origin of the counter-mode stream
+    start_offset: int = 0              # First counter-mode position to generate
+    counter_step_us: int = 155_000_000  # Mean gap between counter-mode timestamps in microseconds
+    shard_index: int = 0               # This process's shard of the counter-mode stream
+    shard_count: int = 1               # Number of shards the counter-mode stream is split into
+    workers: int = 0                   # Generator worker processes feeding the producer (0 = in-process)
+    ring_slots: int = 8                # Shared-memory ring slots per worker
+    ring_slot_bytes: int = 4 * 1024 * 1024  # Bytes per ring slot
+    fanout_step_us: int = 0            # Worker timestamp step in microseconds (0 = from RATE_PROFILE's starting rate)
+    user_count: int = 100              # Customers in the generated user population
+    user_store_path: str = ""          # Pre-built user store directory to memory-map (empty = build at startup)
+    user_distribution: str = "uniform"      # User activity: uniform, zipf:<s>, hotset:<fraction>,<share>
+    merchant_distribution: str = "uniform"  # Merchant activity, same specs (weights:<w1>,... per merchant)
+    type_distribution: str = "uniform"      # Transaction type mix, e.g. weights:5,3,2 for IBFT,QR,TOPUP
+    clock_mode: str = "sequential"     # Event time: sequential, wall, accelerated or historical
+    clock_speed: float = 1.0           # Event seconds per wall-clock second (accelerated/historical)
+    clock_start: str = ""              # Event clock origin, ISO format (empty = now, or now - 24h when sequential)
+    clock_end: str = ""                # End of the replayed window in historical mode
+    clock_track_sends: bool = True     # Restamp paced chunks as they are released (wall-clock modes)
+    id_scheme: str = "uuid4"           # Transaction IDs: uuid4, uuid7, ulid or snowflake
+    id_worker_id: int = 0              # Snowflake worker ID (0-1023), unique per simulator instance
+    blast: bool = False                # Send pre-encoded templates patched in place (max throughput)
+    blast_ring_size: int = 1024        # Pre-rendered templates cycled through in blast mode
+
+@dataclass
+class MetricsConfig:
+    """Metrics endpoint settings"""
+    port: int = 9108                # Prometheus /metrics HTTP port (0 = disabled)
+    stats_interval_ms: int = 5000   # librdkafka statistics interval (0 = disabled)
+
+@dataclass
+class SinkConfig:
+    """Where produced messages go"""
+    type: str = "kafka"                  # kafka, null, memory, file or socket
+    path: str = "data/sink"              # Segment log directory for the file sink
+    address: str = "localhost:9999"      # host:port or unix:/path for the socket sink
+    capacity: int = 100000               # Messages the memory sink holds before applying backpressure
+
+@dataclass
+class SpillConfig:
+    """Local disk journal for messages the broker cannot take"""
+    enabled: bool = False                # Spill to disk instead of blocking or dropping when Kafka is full or down
+    path: str = "data/spill"             # Journal directory (segment log format)
+    max_mb: int = 1024                   # Disk the journal may use; messages beyond it are dropped
+    segment_mb: int = 16                 # Journal segment size; drained segments are deleted whole
+
+@dataclass
+class ControlConfig:
+    """Runtime control API settings"""
+    port: int = 0                   # HTTP port for changing rate, mix, batch size and pause state (0 = disabled)
+
 @dataclass
 class AppConfig:
     """Application configuration"""
     kafka: KafkaConfig
     transaction: TransactionConfig
+    generator: GeneratorConfig = field(default_factory=GeneratorConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    sink: SinkConfig = field(default_factory=SinkConfig)
+    control: ControlConfig = field(default_factory=ControlConfig)
+    spill: SpillConfig = field(default_factory=SpillConfig)
     
     @classmethod
     def from_env(cls):
         """Load configuration from environment variables"""
         kafka_config = KafkaConfig(
-            bootstrap_servers=os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+            bootstrap_servers=os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"),
+            profile=os.getenv("PRODUCER_PROFILE", "default"),
+            pipelined=os.getenv("PRODUCER_PIPELINED", "true").lower() == "true",
+            max_in_flight=int(os.getenv("PRODUCER_MAX_IN_FLIGHT", "100000")),
+            buffer_retry_timeout=float(os.getenv("PRODUCER_BUFFER_RETRY_TIMEOUT", "30")),
+            checkpoint_interval=float(os.getenv("PRODUCER_CHECKPOINT_INTERVAL", "0")),
+            serializer=os.getenv("SERIALIZER", "orjson"),
+            schema_registry_path=os.getenv("SCHEMA_REGISTRY_PATH", "schemas/registry.json"),
+            key_strategy=os.getenv("KEY_STRATEGY", "transaction_id"),
+            hot_key_share=float(os.getenv("HOT_KEY_SHARE", "0")),
+            hot_key=os.getenv("HOT_KEY", "hot-key"),
+            latency_headers=os.getenv("LATENCY_HEADERS", "false").lower() == "true"
         )
         
         transaction_config = TransactionConfig(
             min_interval=float(os.getenv("MIN_INTERVAL", "0.1")),
             max_interval=float(os.getenv("MAX_INTERVAL", "5.0")),
-            batch_size=int(os.getenv("BATCH_SIZE", "100"))
+            batch_size=int(os.getenv("BATCH_SIZE", "100")),
+            rate_profile=os.getenv("RATE_PROFILE", ""),
+            pacing_resolution=float(os.getenv("PACING_RESOLUTION", "0.001")),
+            rate_report_interval=float(os.getenv("RATE_REPORT_INTERVAL", "10"))
+        )
+        
+        generator_config = GeneratorConfig(
+            pool_size=int(os.getenv("FAKER_POOL_SIZE", "2000")),
+            pool_refresh_interval=float(os.getenv("FAKER_POOL_REFRESH", "0")),
+            seed=int(os.getenv("GENERATOR_SEED")) if os.getenv("GENERATOR_SEED") else None,
+            counter_mode=os.getenv("GENERATOR_COUNTER_MODE", "false").lower() == "true",
+            start_time=os.getenv("GENERATOR_START_TIME", "2024-01-01T00:00:00"),
+            start_offset=int(os.getenv("GENERATOR_START_OFFSET", "0")),
+            counter_step_us=int(os.getenv("GENERATOR_COUNTER_STEP_US", "155000000")),
+            shard_index=int(os.getenv("GENERATOR_SHARD_INDEX", "0")),
+            shard_count=int(os.getenv("GENERATOR_SHARD_COUNT", "1")),
+            workers=int(os.getenv("GENERATOR_WORKERS", "0")),
+            ring_slots=int(os.getenv("FANOUT_RING_SLOTS", "8")),
+            ring_slot_bytes=int(os.getenv("FANOUT_SLOT_BYTES", str(4 * 1024 * 1024))),
+            fanout_step_us=int(os.getenv("FANOUT_STEP_US", "0")),
+            user_count=int(os.getenv("USER_COUNT", "100")),
+            user_store_path=os.getenv("USER_STORE_PATH", ""),
+            user_distribution=os.getenv("USER_DISTRIBUTION", "uniform"),
+            merchant_distribution=os.getenv("MERCHANT_DISTRIBUTION", "uniform"),
+            type_distribution=os.getenv("TYPE_DISTRIBUTION", "uniform"),
+            clock_mode=os.getenv("EVENT_CLOCK_MODE", "sequential"),
+            clock_speed=float(os.getenv("EVENT_CLOCK_SPEED", "1")),
+            clock_start=os.getenv("EVENT_CLOCK_START", ""),
+            clock_end=os.getenv("EVENT_CLOCK_END", ""),
+            clock_track_sends=os.getenv("EVENT_CLOCK_TRACK_SENDS", "true").lower() == "true",
+            id_scheme=os.getenv("ID_SCHEME", "uuid4"),
+            id_worker_id=int(os.getenv("ID_WORKER_ID", "0")),
+            blast=os.getenv("BLAST_MODE", "false").lower() == "true",
+            blast_ring_size=int(os.getenv("BLAST_RING_SIZE", "1024"))
+        )
+        
+        metrics_config = MetricsConfig(
+            port=int(os.getenv("METRICS_PORT", "9108")),
+            stats_interval_ms=int(os.getenv("STATS_INTERVAL_MS", "5000"))
+        )
+        
+        sink_config = SinkConfig(
+            type=os.getenv("SINK", "kafka"),
+            path=os.getenv("SINK_PATH", "data/sink"),
+            address=os.getenv("SINK_ADDRESS", "localhost:9999"),
+            capacity=int(os.getenv("SINK_CAPACITY", "100000"))
+        )
+        
+        control_config = ControlConfig(
+            port=int(os.getenv("CONTROL_PORT", "0"))
+        )
+        
+        spill_config = SpillConfig(
+            enabled=os.getenv("SPILL_ENABLED", "false").lower() == "true",
+            path=os.getenv("SPILL_PATH", "data/spill"),
+            max_mb=int(os.getenv("SPILL_MAX_MB", "1024")),
+            segment_mb=int(os.getenv("SPILL_SEGMENT_MB", "16"))
         )
         
-        return cls(kafka=kafka_config, transaction=transaction_config)
+        return cls(kafka=kafka_config, transaction=transaction_config, generator=generator_config,
+                   metrics=metrics_config, sink=sink_config, control=control_config, spill=spill_config)
 
 # Global configuration instance
 config = AppConfig.from_env()
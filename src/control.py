@@ -0,0 +1,261 @@
+"""
+Runtime control plane: change rate, type mix, batch size, keying and pause state over HTTP
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, Optional, Tuple
+from .data_generator import TRANSACTION_TYPES
+from .keys import KEY_FIELDS
+from .metrics import REGISTRY
+from .sampling import parse_distribution
+
+logger = logging.getLogger(__name__)
+
+CONTROL_CHANGES = REGISTRY.counter('txn_control_changes_total', 'Settings changes accepted by the control API')
+CONTROL_VERSION = REGISTRY.gauge('txn_control_settings_version', 'Version of the settings applied by the send loop')
+CONTROL_PAUSED = REGISTRY.gauge('txn_control_paused', 'Whether sending is paused (1) or running (0)')
+CONTROL_BATCH_SIZE = REGISTRY.gauge('txn_control_batch_size', 'Transactions generated per batch')
+CONTROL_TYPE_SHARE = REGISTRY.gauge('txn_control_type_share', 'Configured share of each transaction type',
+                                    ['transaction_type'])
+
+# Largest request body the control API reads
+MAX_BODY_BYTES = 64 * 1024
+
+@dataclass(frozen=True)
+class Settings:
+    """One consistent snapshot of the runtime-adjustable settings"""
+    rate: Optional[float] = None       # Constant target rate in messages/second (None = RATE_PROFILE or interval sleeps)
+    type_mix: str = "uniform"          # Transaction type distribution, as in TYPE_DISTRIBUTION
+    batch_size: int = 100              # Transactions generated per batch
+    paused: bool = False               # Stop generating and sending until resumed
+    key_strategy: str = "transaction_id"  # Message key field, as in KEY_STRATEGY
+    hot_key_share: float = 0.0         # Fraction of messages sent with the hot key
+    version: int = 0                   # Incremented by every accepted change
+
+    @classmethod
+    def from_config(cls) -> 'Settings':
+        """Settings as loaded from the environment"""
+        from .config import config
+
+        return cls(
+            type_mix=config.generator.type_distribution or "uniform",
+            batch_size=config.transaction.batch_size,
+            key_strategy=config.kafka.key_strategy,
+            hot_key_share=config.kafka.hot_key_share,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def type_shares(self) -> Dict[str, float]:
+        """Share of each transaction type implied by ``type_mix``"""
+        table = parse_distribution(self.type_mix, len(TRANSACTION_TYPES))
+        if table is None:
+            return {transaction_type: 1 / len(TRANSACTION_TYPES) for transaction_type in TRANSACTION_TYPES}
+        return dict(zip(TRANSACTION_TYPES, table.probabilities().tolist()))
+
+def _parse_type_mix(value: Any) -> str:
+    if isinstance(value, dict):
+        unknown = set(value) - set(TRANSACTION_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown transaction types {sorted(unknown)}, expected {list(TRANSACTION_TYPES)}")
+        value = "weights:" + ",".join(str(float(value.get(transaction_type, 0))) for transaction_type in TRANSACTION_TYPES)
+    if not isinstance(value, str):
+        raise ValueError("type_mix must be a distribution spec or a {type: weight} object")
+    parse_distribution(value, len(TRANSACTION_TYPES))
+    return value
+
+def _parse_rate(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    rate = float(value)
+    if rate <= 0:
+        raise ValueError(f"rate must be positive (pause instead of setting 0), got {rate}")
+    return rate
+
+def _parse_batch_size(value: Any) -> int:
+    if isinstance(value, bool) or int(value) != value or value <= 0:
+        raise ValueError(f"batch_size must be a positive integer, got {value!r}")
+    return int(value)
+
+def _parse_paused(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError(f"paused must be true or false, got {value!r}")
+    return value
+
+def _parse_key_strategy(value: Any) -> str:
+    if value not in KEY_FIELDS:
+        raise ValueError(f"Unknown key strategy {value!r}, expected one of {', '.join(KEY_FIELDS)}")
+    return value
+
+def _parse_hot_key_share(value: Any) -> float:
+    share = float(value)
+    if not 0.0 <= share <= 1.0:
+        raise ValueError(f"hot_key_share must be between 0 and 1, got {share}")
+    return share
+
+_PARSERS = {
+    "rate": _parse_rate,
+    "type_mix": _parse_type_mix,
+    "batch_size": _parse_batch_size,
+    "paused": _parse_paused,
+    "key_strategy": _parse_key_strategy,
+    "hot_key_share": _parse_hot_key_share,
+}
+
+class ControlState:
+    """The current ``Settings`` snapshot and how it may change.
+
+    ``update`` validates every requested change before swapping in a new
+    snapshot, so a request applies completely or not at all. Readers take
+    ``settings`` once and work from that object, so they never see half of
+    an update. ``fixed`` maps settings that cannot change in this process to
+    the reason why.
+    """
+
+    def __init__(self, settings: Settings, fixed: Optional[Dict[str, str]] = None):
+        self.settings = settings
+        self.fixed = fixed or {}
+        self.changed = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, changes: Dict[str, Any]) -> Settings:
+        """Apply ``changes`` atomically and return the new snapshot (raises ``ValueError``)"""
+        if not isinstance(changes, dict):
+            raise ValueError("Expected a JSON object of settings")
+        parsed = {}
+        for name, value in changes.items():
+            if name not in _PARSERS:
+                raise ValueError(f"Unknown setting '{name}', expected one of {', '.join(_PARSERS)}")
+            if name in self.fixed:
+                raise ValueError(f"'{name}' cannot be changed: {self.fixed[name]}")
+            try:
+                parsed[name] = _PARSERS[name](value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(str(e)) from None
+        with self._lock:
+            self.settings = replace(self.settings, **parsed, version=self.settings.version + 1)
+            settings = self.settings
+        CONTROL_CHANGES.inc()
+        self.changed.set()
+        logger.info(f"Control settings v{settings.version}: {parsed}")
+        return settings
+
+def publish(settings: Settings):
+    """Export an applied snapshot as gauges"""
+    CONTROL_VERSION.set(settings.version)
+    CONTROL_PAUSED.set(1 if settings.paused else 0)
+    CONTROL_BATCH_SIZE.set(settings.batch_size)
+    for transaction_type, share in settings.type_shares().items():
+        CONTROL_TYPE_SHARE.labels(transaction_type).set(share)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+class ControlServer:
+    """Serves a ``ControlState`` over HTTP from an asyncio loop on a daemon thread.
+
+    ``GET /settings`` returns the current snapshot and ``PUT /settings``
+    applies a JSON object of changes. ``GET``/``PUT /settings/<name>`` read
+    or set a single setting (``batch-size`` and ``batch_size`` both work),
+    and ``POST /pause`` and ``POST /resume`` toggle ``paused``.
+    """
+
+    def __init__(self, state: ControlState, port: int, host: str = '0.0.0.0'):
+        self.state = state
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        logger.info(f"Serving control API on port {self.port}")
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """Handle one request, returning the status code and a JSON-serializable body"""
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        try:
+            payload = json.loads(body) if body.strip() else None
+        except ValueError:
+            return 400, {"error": "Request body is not valid JSON"}
+        try:
+            if parts == ["settings"]:
+                if method == "GET":
+                    return 200, self.state.settings.to_dict()
+                if method == "PUT":
+                    return 200, self.state.update(payload).to_dict()
+            elif len(parts) == 2 and parts[0] == "settings":
+                name = parts[1].replace('-', '_')
+                if name not in {field.name for field in fields(Settings)}:
+                    return 404, {"error": f"Unknown setting '{parts[1]}'"}
+                if method == "GET":
+                    return 200, {name: getattr(self.state.settings, name)}
+                if method == "PUT":
+                    return 200, {name: getattr(self.state.update({name: payload}), name)}
+            elif parts in (["pause"], ["resume"]):
+                if method == "POST":
+                    return 200, self.state.update({"paused": parts[0] == "pause"}).to_dict()
+            else:
+                return 404, {"error": f"No such endpoint {path}"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        return 405, {"error": f"{method} is not supported on {path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            if length > MAX_BODY_BYTES:
+                status, response = 413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"}
+            else:
+                body = await reader.readexactly(length) if length else b''
+                status, response = self.route(method.upper(), path, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, response = 400, {"error": "Malformed HTTP request"}
+        data = json.dumps(response).encode('utf-8') + b'\n'
+        writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode('latin-1') + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
@@ -2,60 +2,268 @@
 Data generator for mock banking transactions
 """
 
-import random
-import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
-from dataclasses import dataclass
+import logging
+from datetime import datetime
+from collections.abc import Mapping
+from typing import Dict, Any, List, NamedTuple, Optional, Iterator
 import json
 import ipaddress
-from faker import Faker
-from faker.providers import internet, automotive
+import os
+import numpy as np
+from .config import config
+from .ids import create_id_generator, decode_ascii, uuid_ascii
+from .latency import now_ns
+from .sampling import AliasTable, parse_distribution
+from .timestamps import EventClock, event_clock_from_config, format_timestamps, from_micros, to_micros
+from .users import UserStore
+from .value_pools import ValuePools
 
-@dataclass
-class Transaction:
-    """Base transaction class with normalized schema fields"""
+logger = logging.getLogger(__name__)
+
+# Field order of the normalized transaction schema
+TRANSACTION_FIELDS = (
+    "transaction_id", "timestamp", "customer_name", "transaction_type",
+    "amount", "currency", "merchant_id", "sender_account", "receiver_account",
+    "wallet_id", "location_lat", "location_long", "ip_address", "user_agent"
+)
+
+_FIELD_INDEX = {field: index for index, field in enumerate(TRANSACTION_FIELDS)}
+
+# Transaction type codes used by the columnar batch engine
+TRANSACTION_TYPES = ("IBFT", "QR", "TOPUP")
+
+# Amount range per transaction type code
+AMOUNT_RANGES = np.array([
+    (10000, 50000000),   # IBFT
+    (5000, 2000000),     # QR
+    (50000, 5000000),    # TOPUP
+], dtype=np.float64)
+
+# Philox words drawn per transaction in counter mode (3 Philox4x64 blocks).
+# Words: 0-1 id, 2 type/user, 3 receiver/merchant, 4 amount, 5 lat, 6 long,
+# 7 timestamp jitter, 8 ip/user agent, 9 skewed type, 10 skewed user,
+# 11 skewed receiver/merchant (never both: receivers are IBFT-only, merchants QR-only)
+COUNTER_WORDS_PER_TRANSACTION = 12
+COUNTER_BLOCKS_PER_TRANSACTION = COUNTER_WORDS_PER_TRANSACTION // 4
+
+# Transactions per block when a counter-mode stream is sharded
+SHARD_BLOCK = 4096
+
+class Transaction(NamedTuple):
+    """Compact transaction record with normalized schema fields.
+
+    A named tuple has no per-instance ``__dict__`` and is encoded positionally,
+    so no dict copy is made on the way to the wire. Use ``TransactionView``
+    where key-based access is needed.
+    """
     transaction_id: str
     timestamp: str
     customer_name: str
     transaction_type: str
     amount: float
     currency: str
-    merchant_id: str = None
-    sender_account: str = None
-    receiver_account: str = None
-    wallet_id: str = None
-    location_lat: float = None
-    location_long: float = None
-    ip_address: str = None
-    user_agent: str = None
+    merchant_id: Optional[str] = None
+    sender_account: Optional[str] = None
+    receiver_account: Optional[str] = None
+    wallet_id: Optional[str] = None
+    location_lat: Optional[float] = None
+    location_long: Optional[float] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert transaction to dictionary"""
+        return dict(zip(TRANSACTION_FIELDS, self))
+
+class TransactionView(Mapping):
+    """Read-only mapping view over a ``Transaction`` record.
+
+    Supports ``txn['field']``, ``txn.get('field')``, ``keys()`` and ``items()``
+    without copying the record into a dict.
+    """
+
+    __slots__ = ('record',)
+
+    def __init__(self, record: Transaction):
+        self.record = record
+
+    def __getitem__(self, key: str) -> Any:
+        index = _FIELD_INDEX.get(key)
+        if index is None:
+            raise KeyError(key)
+        return self.record[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TRANSACTION_FIELDS)
+
+    def __len__(self) -> int:
+        return len(TRANSACTION_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"TransactionView({self.record!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy the record into a dictionary"""
+        return self.record.to_dict()
+
+def _format_uuid4(raw: np.ndarray) -> List[str]:
+    """Format a writable ``(count, 16)`` uint8 array of random bytes as UUID4 strings"""
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    return decode_ascii(uuid_ascii(raw))
+
+def _unit_floats(words: np.ndarray) -> np.ndarray:
+    """Map uint64 random words to floats in [0, 1) using their top 53 bits"""
+    return (words >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+def _scaled_index(words: np.ndarray, size: int) -> np.ndarray:
+    """Map the low 32 bits of random words to indices in [0, size)"""
+    return ((words & np.uint64(0xFFFFFFFF)) * np.uint64(size)) >> np.uint64(32)
+
+def counter_words(seed: int, start: int, count: int) -> np.ndarray:
+    """Philox output for transactions ``start`` to ``start + count`` as a ``(count, 12)`` array.
+
+    Philox is counter-based: the words for transaction N depend only on the
+    seed and N, so any range can be produced without generating what precedes it.
+    """
+    bit_generator = np.random.Philox(seed)
+    bit_generator.advance(start * COUNTER_BLOCKS_PER_TRANSACTION)
+    return bit_generator.random_raw(count * COUNTER_WORDS_PER_TRANSACTION).reshape(
+        count, COUNTER_WORDS_PER_TRANSACTION)
+
+def shard_indices(positions: np.ndarray, shard_index: int, shard_count: int,
+                  block: int = SHARD_BLOCK) -> np.ndarray:
+    """Map positions within a shard to indices of the full stream.
+
+    The stream is split into blocks of ``block`` transactions dealt out
+    round-robin, so shard k of K owns blocks k, k + K, k + 2K, ...
+    """
+    return ((positions // block) * shard_count + shard_index) * block + positions % block
+
+class TransactionBatch:
+    """Struct-of-arrays batch of transactions.
+
+    Numeric columns are NumPy arrays, string columns are object arrays with
+    ``None`` where a field does not apply to the transaction type. Rows can be
+    materialized as dicts with ``to_dicts()`` or consumed column-wise with
+    ``columns()``. ``generated_ns`` is the ``latency.now_ns()`` stamp taken
+    when the batch was assembled.
+    """
+
+    def __init__(self, transaction_id: List[str], timestamp_us: np.ndarray,
+                 customer_name: np.ndarray, type_code: np.ndarray,
+                 amount: np.ndarray, currency: np.ndarray,
+                 merchant_id: np.ndarray, sender_account: np.ndarray,
+                 receiver_account: np.ndarray, wallet_id: np.ndarray,
+                 location_lat: np.ndarray, location_long: np.ndarray,
+                 ip_address: np.ndarray, user_agent: np.ndarray, generated_ns: Optional[int] = None):
+        self.transaction_id = transaction_id
+        self.timestamp_us = timestamp_us
+        self.customer_name = customer_name
+        self.type_code = type_code
+        self.amount = amount
+        self.currency = currency
+        self.merchant_id = merchant_id
+        self.sender_account = sender_account
+        self.receiver_account = receiver_account
+        self.wallet_id = wallet_id
+        self.location_lat = location_lat
+        self.location_long = location_long
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.generated_ns = generated_ns
+
+    def __len__(self) -> int:
+        return len(self.type_code)
+
+    def slice(self, start: int, stop: int) -> 'TransactionBatch':
+        """Return the rows ``start:stop`` as a new batch sharing column memory"""
+        return TransactionBatch(generated_ns=self.generated_ns, **{
+            name: column[start:stop] for name, column in vars(self).items() if name != 'generated_ns'
+        })
+
+    @property
+    def transaction_type(self) -> np.ndarray:
+        """Transaction type names for each row"""
+        return np.asarray(TRANSACTION_TYPES, dtype=object)[self.type_code]
+
+    def timestamps(self) -> List[str]:
+        """ISO formatted timestamps for each row"""
+        return format_timestamps(self.timestamp_us)
+
+    def columns(self) -> Dict[str, list]:
+        """Return the batch as a mapping of field name to Python values"""
         return {
-            "transaction_id": self.transaction_id,
-            "timestamp": self.timestamp,
-            "customer_name": self.customer_name,
-            "transaction_type": self.transaction_type,
-            "amount": self.amount,
-            "currency": self.currency,
-            "merchant_id": self.merchant_id,
-            "sender_account": self.sender_account,
-            "receiver_account": self.receiver_account,
-            "wallet_id": self.wallet_id,
-            "location_lat": self.location_lat,
-            "location_long": self.location_long,
-            "ip_address": self.ip_address,
-            "user_agent": self.user_agent
+            "transaction_id": list(self.transaction_id),
+            "timestamp": self.timestamps(),
+            "customer_name": self.customer_name.tolist(),
+            "transaction_type": self.transaction_type.tolist(),
+            "amount": self.amount.tolist(),
+            "currency": self.currency.tolist(),
+            "merchant_id": self.merchant_id.tolist(),
+            "sender_account": self.sender_account.tolist(),
+            "receiver_account": self.receiver_account.tolist(),
+            "wallet_id": self.wallet_id.tolist(),
+            "location_lat": self.location_lat.tolist(),
+            "location_long": self.location_long.tolist(),
+            "ip_address": self.ip_address.tolist(),
+            "user_agent": self.user_agent.tolist(),
         }
 
+    def rows(self) -> Iterator[tuple]:
+        """Iterate over rows as tuples in ``TRANSACTION_FIELDS`` order"""
+        columns = self.columns()
+        return zip(*(columns[field] for field in TRANSACTION_FIELDS))
+
+    def records(self) -> List[Transaction]:
+        """Materialize the batch as compact ``Transaction`` records"""
+        make = Transaction._make
+        return [make(row) for row in self.rows()]
+
+    def views(self) -> List[TransactionView]:
+        """Materialize the batch as mapping views over ``Transaction`` records"""
+        return [TransactionView(record) for record in self.records()]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the batch as a list of transaction dicts"""
+        return [dict(zip(TRANSACTION_FIELDS, row)) for row in self.rows()]
+
 class TransactionGenerator:
     """Generates mock banking transactions"""
     
-    def __init__(self):
-        self.fake = Faker('vi_VN')  # Vietnamese locale
-        self.fake.add_provider(internet)
-        self.fake.add_provider(automotive)
+    def __init__(self, pool_size: Optional[int] = None, pool_refresh_interval: Optional[float] = None,
+                 seed: Optional[int] = None, counter_mode: Optional[bool] = None,
+                 start_time: Optional[datetime] = None, shard_index: Optional[int] = None,
+                 shard_count: Optional[int] = None, user_count: Optional[int] = None,
+                 clock: Optional[EventClock] = None, counter_step_us: Optional[int] = None):
+        pool_size = config.generator.pool_size if pool_size is None else pool_size
+        pool_refresh_interval = (config.generator.pool_refresh_interval
+                                 if pool_refresh_interval is None else pool_refresh_interval)
+        seed = config.generator.seed if seed is None else seed
+        self.counter_mode = config.generator.counter_mode if counter_mode is None else counter_mode
+        if self.counter_mode:
+            if pool_size <= 0:
+                raise ValueError("Counter mode needs value pools (FAKER_POOL_SIZE > 0)")
+            if pool_refresh_interval > 0:
+                logger.warning("Value pool refreshes are disabled in counter mode")
+                pool_refresh_interval = 0
+            if seed is None:
+                seed = int.from_bytes(os.urandom(8), 'little')
+                logger.info(f"Counter mode seed: {seed}")
+        
+        # A fixed seed makes generated values (and IDs) reproducible
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        
+        # Pre-generated Faker values keep Faker off the per-transaction path
+        self.pools = ValuePools(
+            locale='vi_VN',
+            pool_size=pool_size,
+            refresh_interval=pool_refresh_interval,
+            rng=self.rng,
+            seed=seed
+        )
+        self.pools.start()
         
         self.currencies = ["VND", "USD", "EUR"]
         self.banks = ["VPBank", "Vietcombank", "BIDV", "Techcombank", "ACB"]
@@ -65,151 +273,283 @@ class TransactionGenerator:
             "7-Eleven", "Grab", "Shopee", "Lazada", "Tiki"
         ]
         
-        # Generate a fixed pool of 100 users
-        self.users = self._generate_user_pool(100)
+        # Columnar user population, memory-mapped from a pre-built store if configured
+        self.users = self._load_users(config.generator.user_count if user_count is None else user_count)
+        self._merchants = np.array(self.merchants, dtype=object)
+        
+        # Activity skew: alias tables for non-uniform distributions, None for uniform
+        self.user_sampler = parse_distribution(config.generator.user_distribution, len(self.users))
+        self.merchant_sampler = parse_distribution(config.generator.merchant_distribution, len(self.merchants))
+        self.type_sampler = parse_distribution(config.generator.type_distribution, len(TRANSACTION_TYPES))
         
-        # Initialize timestamp for sequential generation
-        self.current_timestamp = datetime.now() - timedelta(hours=24)
-    
-    def _generate_user_pool(self, count: int) -> List[Dict[str, str]]:
-        """Generate a fixed pool of users with consistent data"""
-        users = []
-        for _ in range(count):
-            user = {
-                'name': self.fake.name(),
-                'account_number': self.fake.numerify('############'),
-                'wallet_id': f"WALLET{random.randint(1000, 9999)}"
-            }
-            users.append(user)
-        return users
+        # Event time for sequential generation
+        self.clock = clock or event_clock_from_config()
+        # Transaction IDs for sequential generation; counter mode derives UUID4s from its Philox words
+        self.ids = create_id_generator(config.generator.id_scheme, self.rng if seed is not None else None,
+                                       config.generator.id_worker_id)
+        
+        # Counter mode: transaction N is a pure function of (seed, N)
+        self.start_time = start_time or datetime.fromisoformat(config.generator.start_time)
+        self.counter_step_us = config.generator.counter_step_us if counter_step_us is None else counter_step_us
+        if self.counter_step_us <= 0:
+            raise ValueError(f"Counter step must be positive, got {self.counter_step_us} us")
+        # Last stream index whose timestamp window ends by datetime.max
+        self.last_index = (to_micros(datetime.max) - to_micros(self.start_time) + 1) // self.counter_step_us - 1
+        self.shard_index = config.generator.shard_index if shard_index is None else shard_index
+        self.shard_count = config.generator.shard_count if shard_count is None else shard_count
+        if not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(f"Invalid shard {self.shard_index} of {self.shard_count}")
+        # Next position within this shard's part of the stream
+        self.position = config.generator.start_offset
+        if self.counter_mode:
+            self._check_indices(shard_indices(np.array([self.position]), self.shard_index, self.shard_count))
+    
+    def _load_users(self, count: int) -> UserStore:
+        """Load the configured user store, or build ``count`` users in memory"""
+        if config.generator.user_store_path:
+            users = UserStore.load(config.generator.user_store_path)
+            logger.info(f"Loaded {len(users):,} users from {config.generator.user_store_path}")
+            return users
+        # Names are interned from the name pool rather than drawn per user
+        names = self.pools.pools['name'] if self.pools.pooled else self.pools.values('name', 1000)
+        return UserStore.build(count, list(dict.fromkeys(names)), self.rng)
     
     def get_random_user(self) -> Dict[str, str]:
         """Get a random user from the pool"""
-        return random.choice(self.users)
+        if self.user_sampler is not None:
+            return self.users.user(int(self.user_sampler.sample(self.rng, 1)[0]))
+        return self.users.user(int(self.rng.integers(len(self.users))))
     
     def generate_transaction_id(self) -> str:
         """Generate unique transaction ID"""
-        return str(uuid.uuid4())
+        return self.ids.generate(1)[0]
     
     def generate_timestamp(self) -> str:
-        """Generate sequential timestamp (chronological order)"""
-        # Add random interval between 10 seconds to 5 minutes
-        random_interval = random.uniform(10, 300)  # 10 seconds to 5 minutes
-        self.current_timestamp += timedelta(seconds=random_interval)
-        return self.current_timestamp.isoformat()
+        """Generate the next event-clock timestamp (chronological order)"""
+        return from_micros(int(self.clock.next_batch(1, self.rng)[0])).isoformat()
     
     def generate_amount(self, min_amount: float = 1000, max_amount: float = 10000000) -> float:
         """Generate random transaction amount"""
-        return round(random.uniform(min_amount, max_amount), 2)
+        return round(float(self.rng.uniform(min_amount, max_amount)), 2)
     
     def generate_account_number(self) -> str:
         """Generate bank account number"""
-        return self.fake.numerify('############')
+        return self.pools.pick('account_number')
     
     def generate_location(self) -> tuple:
         """Generate random lat/long in Vietnam"""
         # Rough boundaries for Vietnam
-        lat = random.uniform(8.18, 23.39)
-        long = random.uniform(102.14, 109.46)
+        lat = float(self.rng.uniform(8.18, 23.39))
+        long = float(self.rng.uniform(102.14, 109.46))
         return (round(lat, 6), round(long, 6))
     
     def generate_ip_address(self) -> str:
         """Generate random IP address"""
-        return self.fake.ipv4()
+        return self.pools.pick('ip_address')
     
     def generate_customer_name(self) -> str:
         """Generate Vietnamese customer name"""
-        return self.fake.name()
+        return self.pools.pick('name')
     
     def generate_user_agent(self) -> str:
         """Generate random user agent"""
-        return self.fake.user_agent()
+        return self.pools.pick('user_agent')
     
-    def generate_ibft_transaction(self) -> Dict[str, Any]:
-        """Generate Inter-bank Fund Transfer transaction"""
-        lat, long = self.generate_location()
-        sender_user = self.get_random_user()
-        receiver_user = self.get_random_user()
+    def generate_batch(self, count: int = 100, transaction_type: Optional[str] = None) -> TransactionBatch:
+        """Generate a columnar batch of transactions.
+
+        All random draws for the batch (type mix, users, amounts, locations and
+        timestamp deltas) are made with a handful of vectorized NumPy calls.
+        If ``transaction_type`` is given every row has that type, otherwise
+        types are mixed uniformly. In counter mode the batch is the next
+        ``count`` transactions of this generator's shard.
+        """
+        if self.counter_mode:
+            positions = np.arange(self.position, self.position + count, dtype=np.int64)
+            self.position += count
+            if self.shard_count == 1:
+                return self.generate_range(int(positions[0]) if count else 0, count, transaction_type)
+            return self._generate_indices(shard_indices(positions, self.shard_index, self.shard_count),
+                                          transaction_type)
         
-        transaction = Transaction(
-            transaction_id=self.generate_transaction_id(),
-            timestamp=self.generate_timestamp(),
-            customer_name=sender_user['name'],
-            transaction_type="IBFT",
-            amount=self.generate_amount(10000, 50000000),
-            currency=random.choice(self.currencies[:1]),
-            merchant_id=None,
-            sender_account=sender_user['account_number'],
-            receiver_account=receiver_user['account_number'],
-            wallet_id=None,
-            location_lat=lat,
-            location_long=long,
-            ip_address=self.generate_ip_address(),
-            user_agent=self.generate_user_agent()
+        rng = self.rng
+        if transaction_type is None:
+            if self.type_sampler is not None:
+                type_code = self.type_sampler.sample(rng, count).astype(np.int8)
+            else:
+                type_code = rng.integers(0, len(TRANSACTION_TYPES), size=count, dtype=np.int8)
+        else:
+            type_code = np.full(count, TRANSACTION_TYPES.index(transaction_type), dtype=np.int8)
+
+        # Monotonic event times from the event clock
+        timestamp_us = self.clock.next_batch(count, rng)
+
+        user_idx = self._draw(self.user_sampler, len(self.users), count)
+        receiver_idx = self._draw(self.user_sampler, len(self.users), count)
+        merchant_idx = self._draw(self.merchant_sampler, len(self.merchants), count)
+
+        ranges = AMOUNT_RANGES[type_code]
+        amount = rng.uniform(ranges[:, 0], ranges[:, 1])
+        lat = rng.uniform(8.18, 23.39, size=count)
+        long = rng.uniform(102.14, 109.46, size=count)
+
+        return self._assemble_batch(
+            transaction_id=self.ids.generate(count),
+            timestamp_us=timestamp_us,
+            type_code=type_code,
+            user_idx=user_idx,
+            receiver_idx=receiver_idx,
+            merchant_idx=merchant_idx,
+            amount=amount,
+            lat=lat,
+            long=long,
+            ip_address=self.pools.sample('ip_address', count),
+            user_agent=self.pools.sample('user_agent', count),
         )
+    
+    def _draw(self, sampler: Optional[AliasTable], size: int, count: int) -> np.ndarray:
+        """Draw ``count`` entity indices, uniformly unless a skewed sampler is configured"""
+        if sampler is not None:
+            return sampler.sample(self.rng, count)
+        return self.rng.integers(0, size, size=count)
+    
+    def generate_range(self, start: int, count: int, transaction_type: Optional[str] = None) -> TransactionBatch:
+        """Generate transactions ``start`` to ``start + count`` of the counter-mode stream"""
+        return self._generate_indices(np.arange(start, start + count, dtype=np.int64), transaction_type)
+    
+    def generate_at(self, index: int, transaction_type: Optional[str] = None) -> TransactionView:
+        """Regenerate transaction ``index`` of the counter-mode stream"""
+        return self.generate_range(index, 1, transaction_type).views()[0]
+    
+    def seek(self, position: int):
+        """Move the counter-mode stream to ``position`` within this generator's shard"""
+        self._check_indices(shard_indices(np.array([position]), self.shard_index, self.shard_count))
+        self.position = position
+
+    def reseed(self, seed: int):
+        """Restart sequential generation from ``seed`` without rebuilding pools or users"""
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.pools.rng = self.rng
+        self.ids.rng = self.rng
+
+    def _check_indices(self, indices: np.ndarray):
+        """Reject stream indices whose timestamps would fall past ``datetime.max``"""
+        if len(indices) and int(indices.max()) > self.last_index:
+            raise ValueError(f"Counter-mode index {int(indices.max())} is past the last timestamp: "
+                             f"from {self.start_time.isoformat()} at {self.counter_step_us} us per "
+                             f"transaction the stream ends at index {self.last_index}")
+
+    def _generate_indices(self, indices: np.ndarray, transaction_type: Optional[str] = None) -> TransactionBatch:
+        """Build the counter-mode transactions at the given stream indices"""
+        if self.seed is None:
+            raise ValueError("Counter-based generation needs a seed")
+        self._check_indices(indices)
+        count = len(indices)
+        if count:
+            # Philox is drawn once per run of consecutive indices
+            breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+            runs = np.split(indices, breaks)
+            words = np.concatenate([counter_words(self.seed, int(run[0]), len(run)) for run in runs])
+        else:
+            words = np.empty((0, COUNTER_WORDS_PER_TRANSACTION), dtype=np.uint64)
         
-        return transaction.to_dict()
+        if transaction_type is None:
+            if self.type_sampler is not None:
+                type_code = self.type_sampler.sample_words(words[:, 9]).astype(np.int8)
+            else:
+                type_code = _scaled_index(words[:, 2], len(TRANSACTION_TYPES)).astype(np.int8)
+        else:
+            type_code = np.full(count, TRANSACTION_TYPES.index(transaction_type), dtype=np.int8)
+        
+        # Timestamp N falls in [base + N*step, base + (N+1)*step), so the stream
+        # is strictly increasing and any index maps to its timestamp in O(1)
+        jitter = (_unit_floats(words[:, 7]) * self.counter_step_us).astype(np.int64)
+        timestamp_us = to_micros(self.start_time) + indices * self.counter_step_us + jitter
+        
+        ranges = AMOUNT_RANGES[type_code]
+        ip_pool = self.pools.pools['ip_address']
+        agent_pool = self.pools.pools['user_agent']
+        high = np.uint64(32)
+        if self.user_sampler is not None:
+            user_idx = self.user_sampler.sample_words(words[:, 10])
+            receiver_idx = self.user_sampler.sample_words(words[:, 11])
+        else:
+            user_idx = _scaled_index(words[:, 2] >> high, len(self.users))
+            receiver_idx = _scaled_index(words[:, 3], len(self.users))
+        if self.merchant_sampler is not None:
+            merchant_idx = self.merchant_sampler.sample_words(words[:, 11])
+        else:
+            merchant_idx = _scaled_index(words[:, 3] >> high, len(self.merchants))
+        return self._assemble_batch(
+            transaction_id=_format_uuid4(words[:, :2].copy().view(np.uint8)),
+            timestamp_us=timestamp_us,
+            type_code=type_code,
+            user_idx=user_idx,
+            receiver_idx=receiver_idx,
+            merchant_idx=merchant_idx,
+            amount=ranges[:, 0] + _unit_floats(words[:, 4]) * (ranges[:, 1] - ranges[:, 0]),
+            lat=8.18 + _unit_floats(words[:, 5]) * (23.39 - 8.18),
+            long=102.14 + _unit_floats(words[:, 6]) * (109.46 - 102.14),
+            ip_address=ip_pool[_scaled_index(words[:, 8], len(ip_pool))],
+            user_agent=agent_pool[_scaled_index(words[:, 8] >> high, len(agent_pool))],
+        )
+    
+    def _assemble_batch(self, transaction_id: List[str], timestamp_us: np.ndarray, type_code: np.ndarray,
+                        user_idx: np.ndarray, receiver_idx: np.ndarray, merchant_idx: np.ndarray,
+                        amount: np.ndarray, lat: np.ndarray, long: np.ndarray,
+                        ip_address: np.ndarray, user_agent: np.ndarray) -> TransactionBatch:
+        """Lay out drawn values as batch columns, blanking fields a type does not use"""
+        count = len(type_code)
+        is_ibft = type_code == 0
+        is_qr = type_code == 1
+        is_topup = type_code == 2
+        empty = np.full(count, None, dtype=object)
+        users = self.users
+        sender_account = empty.copy()
+        sender_account[is_ibft] = users.accounts_at(user_idx[is_ibft])
+        receiver_account = empty.copy()
+        receiver_account[is_ibft] = users.accounts_at(receiver_idx[is_ibft])
+        wallet_id = empty.copy()
+        wallet_id[is_topup] = users.wallets_at(user_idx[is_topup])
+        return TransactionBatch(
+            transaction_id=transaction_id,
+            timestamp_us=timestamp_us,
+            customer_name=users.names_at(user_idx),
+            type_code=type_code,
+            amount=np.round(amount, 2),
+            currency=np.full(count, self.currencies[0], dtype=object),
+            merchant_id=np.where(is_qr, self._merchants[merchant_idx], empty),
+            sender_account=sender_account,
+            receiver_account=receiver_account,
+            wallet_id=wallet_id,
+            location_lat=np.round(lat, 6),
+            location_long=np.round(long, 6),
+            ip_address=ip_address,
+            user_agent=user_agent,
+            generated_ns=now_ns(),
+        )
+    
+    def generate_ibft_transaction(self) -> Dict[str, Any]:
+        """Generate Inter-bank Fund Transfer transaction"""
+        return self.generate_batch(1, "IBFT").to_dicts()[0]
     
     def generate_qr_payment_transaction(self) -> Dict[str, Any]:
         """Generate QR Code Payment transaction"""
-        lat, long = self.generate_location()
-        user = self.get_random_user()
-        
-        transaction = Transaction(
-            transaction_id=self.generate_transaction_id(),
-            timestamp=self.generate_timestamp(),
-            customer_name=user['name'],
-            transaction_type="QR",
-            amount=self.generate_amount(5000, 2000000),
-            currency="VND",
-            merchant_id=random.choice(self.merchants),
-            sender_account=None,
-            receiver_account=None,
-            wallet_id=None,
-            location_lat=lat,
-            location_long=long,
-            ip_address=self.generate_ip_address(),
-            user_agent=self.generate_user_agent()
-        )
-        
-        return transaction.to_dict()
+        return self.generate_batch(1, "QR").to_dicts()[0]
     
     def generate_topup_wallet_transaction(self) -> Dict[str, Any]:
         """Generate Wallet Top-up transaction"""
-        lat, long = self.generate_location()
-        user = self.get_random_user()
-        
-        transaction = Transaction(
-            transaction_id=self.generate_transaction_id(),
-            timestamp=self.generate_timestamp(),
-            customer_name=user['name'],
-            transaction_type="TOPUP",
-            amount=self.generate_amount(50000, 5000000),
-            currency="VND",
-            merchant_id=None,
-            sender_account=None,
-            receiver_account=None,
-            wallet_id=user['wallet_id'],
-            location_lat=lat,
-            location_long=long,
-            ip_address=self.generate_ip_address(),
-            user_agent=self.generate_user_agent()
-        )
-        
-        return transaction.to_dict()
+        return self.generate_batch(1, "TOPUP").to_dicts()[0]
     
     def generate_transactions(self, count: int = 100) -> List[Dict[str, Any]]:
         """Generate a batch of mixed transactions"""
-        transactions = []
-        transaction_types = [
-            self.generate_ibft_transaction,
-            self.generate_qr_payment_transaction,
-            self.generate_topup_wallet_transaction
-        ]
-        
-        for _ in range(count):
-            transaction_func = random.choice(transaction_types)
-            transaction = transaction_func()
-            transactions.append(transaction)
-        
-        return transactions
+        return self.generate_batch(count).to_dicts()
+    
+    def generate_views(self, count: int = 100, transaction_type: Optional[str] = None) -> List[TransactionView]:
+        """Generate transactions as mapping views over compact records, without a dict per transaction"""
+        return self.generate_batch(count, transaction_type).views()
+    
+    def close(self):
+        """Stop background work such as value pool refreshes"""
+        self.pools.stop()
@@ -0,0 +1,361 @@
+"""
+Multi-process transaction generation feeding one producer through shared-memory rings
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import struct
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+from .config import config
+from .data_generator import TransactionGenerator, TRANSACTION_TYPES
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Ring header: head (slots written), tail (slots read), writer stalls,
+# transactions generated, worker state
+_COUNTER = struct.Struct('<Q')
+_HEAD, _TAIL, _STALLS, _GENERATED, _STATE = (i * _COUNTER.size for i in range(5))
+HEADER_BYTES = 64
+
+# Slot header: payload bytes, message count, batch generation time (latency.now_ns, 0 = unknown)
+SLOT_HEADER = struct.Struct('<IIq')
+# Message header: transaction type code, key length, value length
+RECORD_HEADER = struct.Struct('<BHI')
+
+STATE_RUNNING, STATE_DONE, STATE_FAILED = 0, 1, 2
+
+RING_OCCUPANCY = REGISTRY.gauge('txn_fanout_ring_slots_used', 'Filled slots per worker ring', ['worker'])
+RING_STALLS = REGISTRY.gauge('txn_fanout_worker_stalls', 'Times a worker waited on a full ring', ['worker'])
+
+class RingBuffer:
+    """Single-producer, single-consumer ring of fixed-size slots in shared memory.
+
+    The writing worker only advances ``head`` and the reading parent only
+    advances ``tail``, so neither side takes a lock. When every slot is full
+    the writer waits, which is the backpressure that keeps workers from
+    outrunning the producer.
+    """
+
+    def __init__(self, slot_count: int, slot_bytes: int, name: Optional[str] = None):
+        self.slot_count = slot_count
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=HEADER_BYTES + slot_count * slot_bytes)
+        if self.owner:
+            self.shm.buf[:HEADER_BYTES] = bytes(HEADER_BYTES)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def capacity(self) -> int:
+        """Largest payload a slot can hold"""
+        return self.slot_bytes - SLOT_HEADER.size
+
+    def _get(self, field: int) -> int:
+        return _COUNTER.unpack_from(self.shm.buf, field)[0]
+
+    def _set(self, field: int, value: int):
+        _COUNTER.pack_into(self.shm.buf, field, value)
+
+    def used(self) -> int:
+        """Slots written but not yet read"""
+        return self._get(_HEAD) - self._get(_TAIL)
+
+    @property
+    def stalls(self) -> int:
+        return self._get(_STALLS)
+
+    @property
+    def generated(self) -> int:
+        return self._get(_GENERATED)
+
+    def add_generated(self, count: int):
+        self._set(_GENERATED, self._get(_GENERATED) + count)
+
+    @property
+    def state(self) -> int:
+        return self._get(_STATE)
+
+    @state.setter
+    def state(self, value: int):
+        self._set(_STATE, value)
+
+    def _slot_offset(self, sequence: int) -> int:
+        return HEADER_BYTES + (sequence % self.slot_count) * self.slot_bytes
+
+    def write(self, payload: bytes, count: int, stop_event=None, wait: float = 0.0005,
+              generated_ns: Optional[int] = None) -> bool:
+        """Copy a packed payload into the next slot, waiting while the ring is full"""
+        if len(payload) > self.capacity:
+            raise ValueError(f"Payload of {len(payload)} bytes exceeds slot capacity {self.capacity}")
+        head = self._get(_HEAD)
+        if head - self._get(_TAIL) >= self.slot_count:
+            self._set(_STALLS, self._get(_STALLS) + 1)
+            while head - self._get(_TAIL) >= self.slot_count:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                time.sleep(wait)
+        offset = self._slot_offset(head)
+        SLOT_HEADER.pack_into(self.shm.buf, offset, len(payload), count, generated_ns or 0)
+        start = offset + SLOT_HEADER.size
+        self.shm.buf[start:start + len(payload)] = payload
+        # Publish the slot only after its contents are in place
+        self._set(_HEAD, head + 1)
+        return True
+
+    def read(self) -> Optional[Tuple[int, bytes, Optional[int]]]:
+        """Copy out the oldest filled slot as (message count, payload, generated_ns) and free it"""
+        tail = self._get(_TAIL)
+        if tail == self._get(_HEAD):
+            return None
+        offset = self._slot_offset(tail)
+        size, count, generated_ns = SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        start = offset + SLOT_HEADER.size
+        payload = bytes(self.shm.buf[start:start + size])
+        self._set(_TAIL, tail + 1)
+        return count, payload, generated_ns or None
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def pack_messages(type_codes: List[int], keys: List[bytes], values: List[bytes],
+                  capacity: int) -> Iterator[Tuple[bytes, int]]:
+    """Pack messages into payloads of at most ``capacity`` bytes, yielding (payload, count)"""
+    parts = []
+    size = 0
+    pack = RECORD_HEADER.pack
+    for type_code, key, value in zip(type_codes, keys, values):
+        record = pack(type_code, len(key), len(value)) + key + value
+        if len(record) > capacity:
+            raise ValueError(f"Message of {len(record)} bytes exceeds slot capacity {capacity}")
+        if size + len(record) > capacity:
+            yield b''.join(parts), len(parts)
+            parts = []
+            size = 0
+        parts.append(record)
+        size += len(record)
+    if parts:
+        yield b''.join(parts), len(parts)
+
+def unpack_messages(payload: bytes, count: int, topics: List[str]) -> List[Tuple[str, bytes, bytes]]:
+    """Split a packed payload back into (topic, value, key) messages"""
+    messages = []
+    position = 0
+    unpack = RECORD_HEADER.unpack_from
+    header_size = RECORD_HEADER.size
+    for _ in range(count):
+        type_code, key_len, value_len = unpack(payload, position)
+        position += header_size
+        key = payload[position:position + key_len]
+        position += key_len
+        messages.append((topics[type_code], payload[position:position + value_len], key))
+        position += value_len
+    return messages
+
+class EncodedBatch:
+    """Serialized messages ready for ``TransactionProducer.send_encoded``"""
+
+    __slots__ = ('messages', 'generated_ns')
+
+    def __init__(self, messages: List[Tuple[str, bytes, bytes]], generated_ns: Optional[int] = None):
+        self.messages = messages
+        self.generated_ns = generated_ns
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def slice(self, start: int, stop: int) -> 'EncodedBatch':
+        return EncodedBatch(self.messages[start:stop], self.generated_ns)
+
+def worker_generator(seed: int, worker_index: int, workers: int, start_time: datetime,
+                     step_us: int) -> TransactionGenerator:
+    """Counter-mode generator for one worker's shard, stamped from ``start_time`` at ``step_us`` per index"""
+    return TransactionGenerator(seed=seed, counter_mode=True, pool_refresh_interval=0,
+                                shard_index=worker_index, shard_count=workers,
+                                start_time=start_time, counter_step_us=step_us)
+
+def _worker_main(ring_name: str, slot_count: int, slot_bytes: int, worker_index: int, workers: int,
+                 batch_size: int, seed: int, start_time: datetime, step_us: int, stop_event):
+    """Generate and encode this worker's shard of the stream into its ring"""
+    from .keys import key_strategy_from_config
+    from .serializers import create_serializer
+
+    ring = RingBuffer(slot_count, slot_bytes, name=ring_name)
+    generator = None
+    try:
+        generator = worker_generator(seed, worker_index, workers, start_time, step_us)
+        serializer = create_serializer(config.kafka.serializer, config.kafka.schema_registry_path)
+        key_strategy = key_strategy_from_config(worker_index)
+        capacity = ring.capacity
+        while not stop_event.is_set():
+            batch = generator.generate_batch(batch_size)
+            values = serializer.encode_rows(batch.rows())
+            keys = key_strategy.batch_keys(batch)
+            for payload, count in pack_messages(batch.type_code.tolist(), keys, values, capacity):
+                if not ring.write(payload, count, stop_event, generated_ns=batch.generated_ns):
+                    return
+            ring.add_generated(len(batch))
+        ring.state = STATE_DONE
+    except Exception as e:
+        logger.error(f"Fan-out worker {worker_index} failed: {e}")
+        ring.state = STATE_FAILED
+    finally:
+        if generator is not None:
+            generator.close()
+        ring.close()
+
+class FanoutGenerator:
+    """Generates and encodes transactions in worker processes.
+
+    Each worker owns a shard of one counter-mode stream (see
+    ``TransactionGenerator.generate_batch``), so workers never duplicate a
+    transaction and need no coordination. Workers write encoded messages into
+    their own shared-memory ring. The parent drains the rings round-robin
+    into a single producer, so there is only one broker connection.
+
+    The stream's timestamps start when ``start`` is called and advance
+    ``step_us`` per stream index: ``FANOUT_STEP_US`` if set, else one
+    ``rate``-th of a second, else 1 us. At the target rate they keep pace
+    with the wall clock; unpaced, they trail it.
+    """
+
+    def __init__(self, workers: int, batch_size: int, seed: Optional[int] = None,
+                 slot_count: int = 8, slot_bytes: int = 4 * 1024 * 1024,
+                 rate: Optional[float] = None, step_us: Optional[int] = None):
+        from .producer import TOPIC_MAPPING
+
+        self.workers = workers
+        self.batch_size = batch_size
+        self.seed = seed if seed is not None else config.generator.seed
+        if self.seed is None:
+            self.seed = int.from_bytes(os.urandom(8), 'little')
+            logger.info(f"Fan-out seed: {self.seed}")
+        self.slot_count = slot_count
+        self.slot_bytes = slot_bytes
+        step_us = config.generator.fanout_step_us if step_us is None else step_us
+        if not step_us:
+            step_us = max(1, round(1_000_000 / rate)) if rate else 1
+        self.step_us = step_us
+        self.start_time: Optional[datetime] = None
+        self.topics = [TOPIC_MAPPING[transaction_type] for transaction_type in TRANSACTION_TYPES]
+        self.rings: List[RingBuffer] = []
+        self.processes: List[multiprocessing.Process] = []
+        # Spawned workers do not inherit the parent's threads or Kafka handles
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = self._context.Event()
+        self._next_ring = 0
+
+    def start(self):
+        """Create the rings and start the worker processes"""
+        self.start_time = datetime.now()
+        for index in range(self.workers):
+            ring = RingBuffer(self.slot_count, self.slot_bytes)
+            process = self._context.Process(
+                target=_worker_main, name=f"txn-worker-{index}", daemon=True,
+                args=(ring.name, self.slot_count, self.slot_bytes, index, self.workers,
+                      self.batch_size, self.seed, self.start_time, self.step_us, self._stop_event)
+            )
+            process.start()
+            self.rings.append(ring)
+            self.processes.append(process)
+            RING_OCCUPANCY.labels(index).set_function(ring.used)
+            RING_STALLS.labels(index).set_function(lambda ring=ring: ring.stalls)
+        logger.info(f"Started {self.workers} generator workers "
+                    f"({self.slot_count} x {self.slot_bytes // 1024} KB slots each, "
+                    f"timestamps {self.step_us} us apart from {self.start_time.isoformat()})")
+
+    def next_batch(self, timeout: float = 1.0, wait: float = 0.0005) -> EncodedBatch:
+        """Take the next filled slot from any ring; empty if none fills within ``timeout``"""
+        deadline = time.monotonic() + timeout
+        while True:
+            for _ in range(len(self.rings)):
+                ring = self.rings[self._next_ring]
+                self._next_ring = (self._next_ring + 1) % len(self.rings)
+                slot = ring.read()
+                if slot is not None:
+                    count, payload, generated_ns = slot
+                    return EncodedBatch(unpack_messages(payload, count, self.topics), generated_ns)
+            self._check_workers()
+            if time.monotonic() >= deadline:
+                return EncodedBatch([])
+            time.sleep(wait)
+
+    def _check_workers(self):
+        for index, (ring, process) in enumerate(zip(self.rings, self.processes)):
+            if ring.state == STATE_FAILED or (not process.is_alive() and not self._stop_event.is_set()):
+                raise RuntimeError(f"Generator worker {index} exited (exit code {process.exitcode})")
+
+    def stats(self) -> List[dict]:
+        """Per-worker generated count, ring occupancy and stall count"""
+        return [{"worker": index, "generated": ring.generated, "slots_used": ring.used(),
+                 "stalls": ring.stalls} for index, ring in enumerate(self.rings)]
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers and release the shared memory"""
+        self._stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+        for index, ring in enumerate(self.rings):
+            # Freeze the gauges at their last values before the shared memory goes away
+            RING_OCCUPANCY.labels(index).set_function(None)
+            RING_OCCUPANCY.labels(index).set(0)
+            RING_STALLS.labels(index).set_function(None)
+            RING_STALLS.labels(index).set(ring.stalls)
+            ring.close()
+        self.processes = []
+        self.rings = []
+
+def measure_fanout(workers: int, seconds: float = 5.0, batch_size: int = 5000,
+                   seed: int = 42) -> dict:
+    """Drain ``workers`` processes into the null sink and report messages/second"""
+    from .sinks import NullSink
+    from .producer import TransactionProducer
+
+    producer = TransactionProducer(producer=NullSink())
+    fanout = FanoutGenerator(workers, batch_size, seed=seed)
+    fanout.start()
+    try:
+        # Let the workers fill their rings before timing
+        fanout.next_batch(timeout=60.0)
+        sent = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            sent += producer.send_encoded(fanout.next_batch())
+        elapsed = time.perf_counter() - started
+        stalls = sum(stat["stalls"] for stat in fanout.stats())
+    finally:
+        fanout.stop()
+    return {"workers": workers, "messages": sent, "seconds": elapsed,
+            "messages_per_sec": sent / elapsed, "worker_stalls": stalls}
+
+def main():
+    """Measure fan-out throughput for one or more worker counts"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Measure multi-process generation throughput")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--seconds", type=float, default=5.0, help="measurement time per worker count")
+    parser.add_argument("--batch-size", type=int, default=5000, help="transactions per worker batch")
+    args = parser.parse_args()
+
+    logging.getLogger('src.producer').setLevel(logging.WARNING)
+    for workers in (int(w) for w in args.workers.split(',')):
+        result = measure_fanout(workers, args.seconds, args.batch_size)
+        logger.info(f"{workers} workers: {result['messages_per_sec']:>12,.0f} msgs/s "
+                    f"(worker stalls on full rings: {result['worker_stalls']})")
+
+if __name__ == "__main__":
+    main()
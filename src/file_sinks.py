@@ -0,0 +1,372 @@
+"""
+File sinks that write generated batches to rolling NDJSON, Arrow IPC or Parquet files
+"""
+
+import argparse
+import logging
+import os
+import re
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+from .data_generator import TRANSACTION_TYPES, TransactionBatch
+from .serializers import Serializer, create_serializer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FILE_FORMATS = ("ndjson", "parquet", "arrow")
+
+# Compression per format; the first entry is the default (NDJSON falls back to gzip without zstandard)
+NDJSON_COMPRESSION = ("zstd", "gzip", "none")
+ARROW_COMPRESSION = ("zstd", "lz4", "snappy", "gzip", "none")
+
+_EXTENSIONS = {
+    "ndjson": {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz", "none": ".ndjson"},
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# Files are written under this suffix and renamed once complete
+PARTIAL_SUFFIX = ".partial"
+
+class FileSink:
+    """Writes transaction batches to a directory of rolling files.
+
+    A new file is started once the current one reaches ``roll_bytes`` or has
+    been open for ``roll_seconds`` (0 disables either limit). Files are named
+    ``<prefix>-<sequence><extension>`` and carry a ``.partial`` suffix until
+    they are complete, so readers only ever see finished files. Numbering
+    continues after any files already in the directory.
+
+    Encoding happens on the calling thread. Compression and writes run on a
+    writer thread, one batch behind, since zlib, zstd and pyarrow release the
+    GIL while they work.
+    """
+
+    format = "base"
+
+    def __init__(self, directory: str, prefix: str = "transactions", roll_bytes: int = 512 * 1024 * 1024,
+                 roll_seconds: float = 0.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.roll_bytes = roll_bytes
+        self.roll_seconds = roll_seconds
+        self.extension = self._extension()
+        os.makedirs(directory, exist_ok=True)
+        pattern = re.compile(rf"{re.escape(prefix)}-(\d+){re.escape(self.extension)}$")
+        existing = [int(match.group(1)) for match in map(pattern.match, os.listdir(directory)) if match]
+        self._sequence = max(existing) + 1 if existing else 0
+        self._path: Optional[str] = None
+        self._opened_at = 0.0
+        self.files: List[str] = []
+        self.rows = 0
+        self.bytes_written = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.format}-writer")
+        self._in_flight: Optional[Future] = None
+
+    def _extension(self) -> str:
+        return _EXTENSIONS[self.format]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write_batch(self, batch: TransactionBatch) -> int:
+        """Append a generator batch, returning how many rows were written"""
+        if not len(batch):
+            return 0
+        if self._path is not None and self.roll_seconds and time.monotonic() - self._opened_at >= self.roll_seconds:
+            self._roll()
+        if self._path is None:
+            self._open()
+        self._write(batch)
+        self.rows += len(batch)
+        if self.roll_bytes and self._size() >= self.roll_bytes:
+            self._roll()
+        return len(batch)
+
+    def _open(self):
+        name = f"{self.prefix}-{self._sequence:05d}{self.extension}"
+        self._sequence += 1
+        self._path = os.path.join(self.directory, name)
+        self._opened_at = time.monotonic()
+        self._open_file(self._path + PARTIAL_SUFFIX)
+
+    def _in_background(self, func, *args):
+        """Run file I/O on the writer thread once the previous call has finished"""
+        self._wait()
+        self._in_flight = self._executor.submit(func, *args)
+
+    def _wait(self):
+        if self._in_flight is not None:
+            future, self._in_flight = self._in_flight, None
+            future.result()
+
+    def _roll(self):
+        """Finish the current file; the next write opens a new one"""
+        self._wait()
+        self._close_file()
+        partial = self._path + PARTIAL_SUFFIX
+        self.bytes_written += os.path.getsize(partial)
+        os.replace(partial, self._path)
+        self.files.append(self._path)
+        logger.info(f"Wrote {self._path} ({os.path.getsize(self._path) / 1024 / 1024:.1f} MiB)")
+        self._path = None
+
+    def close(self):
+        """Finish the current file and stop the writer thread"""
+        if self._path is not None:
+            self._roll()
+        self._executor.shutdown()
+
+    def _open_file(self, path: str):
+        raise NotImplementedError
+
+    def _write(self, batch: TransactionBatch):
+        raise NotImplementedError
+
+    def _size(self) -> int:
+        """Bytes in the current file so far"""
+        raise NotImplementedError
+
+    def _close_file(self):
+        raise NotImplementedError
+
+class _NoCompression:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b''
+
+class NdjsonFileSink(FileSink):
+    """Newline-delimited JSON, optionally gzip or zstd compressed.
+
+    Rows are encoded with the given JSON serializer (orjson when installed)
+    and compressed as one stream per file. ``level`` defaults to a fast
+    setting for each codec, and zstd uses all cores with ``threads=-1``.
+    """
+
+    format = "ndjson"
+
+    def __init__(self, directory: str, compression: Optional[str] = None, level: Optional[int] = None,
+                 serializer: Optional[Serializer] = None, threads: int = -1, **options):
+        compression = compression or default_compression(self.format)
+        if compression not in NDJSON_COMPRESSION:
+            raise ValueError(f"Unknown NDJSON compression '{compression}', expected one of {NDJSON_COMPRESSION}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        self.compression = compression
+        self.level = level
+        self.threads = threads
+        if serializer is None:
+            try:
+                serializer = create_serializer("orjson")
+            except ImportError:
+                serializer = create_serializer("json")
+        self.serializer = serializer
+        self._file = None
+        self._compressor = None
+        super().__init__(directory, **options)
+
+    def _extension(self) -> str:
+        return _EXTENSIONS["ndjson"][self.compression]
+
+    def _open_file(self, path: str):
+        self._file = open(path, 'wb')
+        if self.compression == "gzip":
+            self._compressor = zlib.compressobj(1 if self.level is None else self.level, zlib.DEFLATED, 31)
+        elif self.compression == "zstd":
+            self._compressor = zstandard.ZstdCompressor(
+                level=3 if self.level is None else self.level, threads=self.threads).compressobj()
+        else:
+            self._compressor = _NoCompression()
+
+    def _write(self, batch: TransactionBatch):
+        lines = self.serializer.encode_rows(batch.rows())
+        lines.append(b'')
+        self._in_background(self._write_compressed, b'\n'.join(lines))
+
+    def _write_compressed(self, data: bytes):
+        self._file.write(self._compressor.compress(data))
+
+    def _size(self) -> int:
+        return self._file.tell()
+
+    def _close_file(self):
+        self._file.write(self._compressor.flush())
+        self._file.close()
+        self._file = None
+
+def arrow_schema():
+    """Arrow schema of a transaction batch: native timestamps, dictionary-encoded type"""
+    string = pa.string()
+    return pa.schema([
+        ("transaction_id", string),
+        ("timestamp", pa.timestamp("us")),
+        ("customer_name", string),
+        ("transaction_type", pa.dictionary(pa.int8(), string)),
+        ("amount", pa.float64()),
+        ("currency", string),
+        ("merchant_id", string),
+        ("sender_account", string),
+        ("receiver_account", string),
+        ("wallet_id", string),
+        ("location_lat", pa.float64()),
+        ("location_long", pa.float64()),
+        ("ip_address", string),
+        ("user_agent", string),
+    ])
+
+def batch_to_arrow(batch: TransactionBatch, schema=None):
+    """Convert a ``TransactionBatch`` to an Arrow record batch without going through rows"""
+    if pa is None:
+        raise ImportError("Arrow conversion requires the pyarrow package")
+    schema = schema or arrow_schema()
+    string = pa.string()
+    return pa.RecordBatch.from_arrays([
+        pa.array(batch.transaction_id, string),
+        pa.array(batch.timestamp_us, pa.timestamp("us")),
+        pa.array(batch.customer_name, string),
+        pa.DictionaryArray.from_arrays(pa.array(batch.type_code, pa.int8()), pa.array(TRANSACTION_TYPES, string)),
+        pa.array(batch.amount, pa.float64()),
+        pa.array(batch.currency, string),
+        pa.array(batch.merchant_id, string),
+        pa.array(batch.sender_account, string),
+        pa.array(batch.receiver_account, string),
+        pa.array(batch.wallet_id, string),
+        pa.array(batch.location_lat, pa.float64()),
+        pa.array(batch.location_long, pa.float64()),
+        pa.array(batch.ip_address, string),
+        pa.array(batch.user_agent, string),
+    ], schema=schema)
+
+class ArrowFileSink(FileSink):
+    """Parquet or Arrow IPC files written from columnar batches.
+
+    Generator batches are converted column by column and buffered until
+    ``row_group_rows`` rows are pending, then written as one Parquet row
+    group or Arrow record batch, so row group size does not depend on the
+    generator's batch size.
+    """
+
+    def __init__(self, directory: str, format: str = "parquet", compression: str = "zstd",
+                 row_group_rows: int = 1_000_000, **options):
+        if pa is None:
+            raise ImportError(f"The '{format}' file sink requires the pyarrow package")
+        if format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown columnar format '{format}', expected parquet or arrow")
+        if compression not in ARROW_COMPRESSION:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {ARROW_COMPRESSION}")
+        self.format = format
+        self.compression = None if compression == "none" else compression
+        self.row_group_rows = row_group_rows
+        self.schema = arrow_schema()
+        self._writer = None
+        self._buffered = []
+        self._buffered_rows = 0
+        self._partial_path = None
+        super().__init__(directory, **options)
+
+    def _open_file(self, path: str):
+        self._partial_path = path
+        if self.format == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression=self.compression or "none")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(path, self.schema, options=options)
+
+    def _write(self, batch: TransactionBatch):
+        self._buffered.append(batch_to_arrow(batch, self.schema))
+        self._buffered_rows += len(batch)
+        if self._buffered_rows >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        """Write the buffered batches as one row group"""
+        if not self._buffered:
+            return
+        table = pa.Table.from_batches(self._buffered, self.schema)
+        self._buffered = []
+        self._buffered_rows = 0
+        self._in_background(self._write_table, table)
+
+    def _write_table(self, table):
+        if self.format == "parquet":
+            self._writer.write_table(table, row_group_size=self.row_group_rows)
+        else:
+            for record_batch in table.combine_chunks().to_batches(max_chunksize=self.row_group_rows):
+                self._writer.write_batch(record_batch)
+
+    def _size(self) -> int:
+        return os.path.getsize(self._partial_path)
+
+    def _close_file(self):
+        self._flush()
+        self._wait()
+        self._writer.close()
+        self._writer = None
+
+def default_compression(format: str) -> str:
+    """zstd, except for NDJSON when the optional zstandard package is missing"""
+    if format == "ndjson" and zstandard is None:
+        return "gzip"
+    return "zstd"
+
+def create_file_sink(format: str, directory: str, compression: Optional[str] = None, **options) -> FileSink:
+    """Create a file sink by format name; ``compression`` defaults to ``default_compression(format)``"""
+    if format not in FILE_FORMATS:
+        raise ValueError(f"Unknown file format '{format}', expected one of {FILE_FORMATS}")
+    compression = compression or default_compression(format)
+    if format == "ndjson":
+        return NdjsonFileSink(directory, compression=compression, **options)
+    return ArrowFileSink(directory, format=format, compression=compression, **options)
+
+def main():
+    """Generate a bulk dataset straight to files and report throughput"""
+    from .data_generator import TransactionGenerator
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Write generated transactions to rolling files")
+    parser.add_argument("--output", required=True, help="output directory")
+    parser.add_argument("--format", choices=FILE_FORMATS, default="parquet", help="file format")
+    parser.add_argument("--compression", default=None, help="codec (default zstd, gzip for ndjson without zstandard)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="transactions to write")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="transactions generated per batch")
+    parser.add_argument("--row-group", type=int, default=1_000_000, help="rows per Parquet row group / Arrow batch")
+    parser.add_argument("--roll-mb", type=float, default=512, help="start a new file after this many MiB (0 = never)")
+    parser.add_argument("--roll-seconds", type=float, default=0, help="start a new file after this long (0 = never)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible output")
+    args = parser.parse_args()
+
+    options = {"roll_bytes": int(args.roll_mb * 1024 * 1024), "roll_seconds": args.roll_seconds}
+    if args.format != "ndjson":
+        options["row_group_rows"] = args.row_group
+    generator = TransactionGenerator(seed=args.seed, pool_refresh_interval=0)
+    start = time.perf_counter()
+    with create_file_sink(args.format, args.output, args.compression, **options) as sink:
+        remaining = args.rows
+        while remaining > 0:
+            remaining -= sink.write_batch(generator.generate_batch(min(args.batch_size, remaining)))
+    elapsed = time.perf_counter() - start
+    generator.close()
+    logger.info(f"Wrote {sink.rows:,} rows to {len(sink.files)} files in {elapsed:.1f}s: "
+                f"{sink.rows / elapsed:,.0f} rows/s, {sink.bytes_written / elapsed * 60 / 1024 ** 3:.2f} GiB/min")
+
+if __name__ == "__main__":
+    main()
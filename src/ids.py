@@ -0,0 +1,208 @@
+"""
+Bulk transaction ID generation: UUIDv4, time-ordered UUIDv7 and ULID, and Snowflake IDs
+"""
+
+import argparse
+import os
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# 2024-01-01T00:00:00Z in Unix milliseconds, the origin of Snowflake timestamps
+SNOWFLAKE_EPOCH_MS = 1_704_067_200_000
+SNOWFLAKE_WORKER_BITS = 10
+SNOWFLAKE_SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << SNOWFLAKE_WORKER_BITS) - 1
+
+# IDs minted per millisecond before the timestamp field runs ahead of the clock
+_SEQUENCE_BITS = 12
+
+_HEX = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_CROCKFORD = np.frombuffer(b'0123456789ABCDEFGHJKMNPQRSTVWXYZ', dtype=np.uint8)
+# Positions of the 32 hex digits within a 36-character UUID string
+_UUID_DIGITS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+def uuid_ascii(raw: np.ndarray) -> np.ndarray:
+    """Format a ``(count, 16)`` uint8 array as canonical UUID text in a ``(count, 36)`` uint8 array"""
+    count = len(raw)
+    nibbles = np.empty((count, 32), dtype=np.uint8)
+    nibbles[:, 0::2] = raw >> 4
+    nibbles[:, 1::2] = raw & 0x0F
+    text = np.full((count, 36), ord('-'), dtype=np.uint8)
+    text[:, _UUID_DIGITS] = _HEX[nibbles]
+    return text
+
+def decode_ascii(text: np.ndarray) -> List[str]:
+    """Split a ``(count, width)`` uint8 array of ASCII into one string per row"""
+    width = text.shape[1]
+    joined = text.tobytes().decode('ascii')
+    return [joined[offset:offset + width] for offset in range(0, len(joined), width)]
+
+class IdGenerator:
+    """Generates fixed-width transaction IDs in bulk.
+
+    ``ascii`` returns ``count`` IDs as a ``(count, width)`` uint8 array built
+    from one random buffer per call, and ``generate`` decodes it to strings.
+    Random bytes come from the OS unless a seeded ``rng`` is given. The
+    time-ordered schemes are strictly increasing per generator: timestamps
+    come from the wall clock and a 12-bit sequence orders IDs minted in the
+    same millisecond.
+    """
+
+    name = "base"
+    width = 0
+
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        self.rng = rng
+        self._last_tick = -1
+
+    def _random(self, count: int, size: int) -> np.ndarray:
+        """A writable ``(count, size)`` array of random bytes"""
+        buffer = self.rng.bytes(count * size) if self.rng is not None else os.urandom(count * size)
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(count, size).copy()
+
+    def _ticks(self, count: int) -> np.ndarray:
+        """Strictly increasing ``(millisecond << 12) | sequence`` values, one per ID.
+
+        If more than 4096 IDs are minted within a millisecond, the timestamp
+        runs slightly ahead of the clock rather than repeating a value.
+        """
+        first = max(time.time_ns() // 1_000_000 << _SEQUENCE_BITS, self._last_tick + 1)
+        ticks = np.arange(first, first + count, dtype=np.int64)
+        if count:
+            self._last_tick = int(ticks[-1])
+        return ticks
+
+    def ascii(self, count: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def generate(self, count: int) -> List[str]:
+        """``count`` IDs as strings"""
+        return decode_ascii(self.ascii(count))
+
+class Uuid4Ids(IdGenerator):
+    """Random UUIDv4, identical in format to ``str(uuid.uuid4())``"""
+
+    name = "uuid4"
+    width = 36
+
+    def ascii(self, count: int) -> np.ndarray:
+        raw = self._random(count, 16)
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 9562 variant
+        return uuid_ascii(raw)
+
+class Uuid7Ids(IdGenerator):
+    """Time-ordered UUIDv7: 48-bit Unix milliseconds, 12-bit sequence, 62 random bits"""
+
+    name = "uuid7"
+    width = 36
+
+    def ascii(self, count: int) -> np.ndarray:
+        ticks = self._ticks(count)
+        raw = self._random(count, 16)
+        millis = (ticks >> _SEQUENCE_BITS).astype('>u8').view(np.uint8).reshape(count, 8)
+        raw[:, :6] = millis[:, 2:]
+        sequence = ticks & 0xFFF
+        raw[:, 6] = 0x70 | (sequence >> 8)  # version 7 and the sequence's high bits
+        raw[:, 7] = sequence & 0xFF
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+        return uuid_ascii(raw)
+
+class UlidIds(IdGenerator):
+    """ULID: 48-bit Unix milliseconds and 80 bits (12-bit sequence, 68 random) in Crockford base32"""
+
+    name = "ulid"
+    width = 26
+
+    def ascii(self, count: int) -> np.ndarray:
+        ticks = self._ticks(count).astype(np.uint64)
+        random_words = self._random(count, 16).view(np.uint64)
+        # 128-bit value as two words: 48-bit time and 16 bits of sequence/random, then 64 random bits
+        high = ((ticks >> np.uint64(_SEQUENCE_BITS)) << np.uint64(16)) \
+            | ((ticks & np.uint64(0xFFF)) << np.uint64(4)) | (random_words[:, 0] & np.uint64(0xF))
+        low = random_words[:, 1]
+        text = np.empty((count, self.width), dtype=np.uint8)
+        for column in range(self.width):
+            shift = 125 - 5 * column  # Lowest bit of this character's 5-bit group
+            if shift >= 64:
+                digit = high >> np.uint64(shift - 64)
+            elif shift + 5 <= 64:
+                digit = low >> np.uint64(shift)
+            else:
+                digit = (low >> np.uint64(shift)) | (high << np.uint64(64 - shift))
+            text[:, column] = _CROCKFORD[digit & np.uint64(31)]
+        return text
+
+class SnowflakeIds(IdGenerator):
+    """Snowflake IDs: 41-bit milliseconds since 2024, 10-bit worker ID, 12-bit sequence.
+
+    Written as zero-padded 19-digit decimals, so text order matches numeric
+    order. IDs from different ``worker_id`` values can never collide, and no
+    randomness is involved.
+    """
+
+    name = "snowflake"
+    width = 19
+
+    def __init__(self, rng: Optional[np.random.Generator] = None, worker_id: int = 0):
+        super().__init__(rng)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Snowflake worker ID must be between 0 and {MAX_WORKER_ID}, got {worker_id}")
+        self.worker_id = worker_id
+
+    def ascii(self, count: int) -> np.ndarray:
+        ticks = self._ticks(count)
+        millis = (ticks >> _SEQUENCE_BITS) - SNOWFLAKE_EPOCH_MS
+        value = ((millis << (SNOWFLAKE_WORKER_BITS + SNOWFLAKE_SEQUENCE_BITS))
+                 | (self.worker_id << SNOWFLAKE_SEQUENCE_BITS) | (ticks & 0xFFF))
+        text = np.empty((count, self.width), dtype=np.uint8)
+        for column in range(self.width - 1, -1, -1):
+            text[:, column] = value % 10 + 48
+            value = value // 10
+        return text
+
+ID_SCHEMES: Dict[str, Callable[..., IdGenerator]] = {
+    "uuid4": lambda rng, worker_id: Uuid4Ids(rng),
+    "uuid7": lambda rng, worker_id: Uuid7Ids(rng),
+    "ulid": lambda rng, worker_id: UlidIds(rng),
+    "snowflake": lambda rng, worker_id: SnowflakeIds(rng, worker_id),
+}
+
+def create_id_generator(name: str, rng: Optional[np.random.Generator] = None, worker_id: int = 0) -> IdGenerator:
+    """Create an ID generator by scheme name"""
+    if name not in ID_SCHEMES:
+        raise ValueError(f"Unknown ID scheme '{name}', expected one of {sorted(ID_SCHEMES)}")
+    return ID_SCHEMES[name](rng, worker_id)
+
+def compare_id_schemes(count: int, repeat: int = 3) -> List[Dict[str, float]]:
+    """IDs/s for each scheme in bulk, and for ``str(uuid.uuid4())`` per call"""
+    cases = [(name, lambda g=create_id_generator(name): g.generate(count)) for name in ID_SCHEMES]
+    cases.append(("uuid.uuid4 per call", lambda: [str(uuid.uuid4()) for _ in range(count)]))
+    results = []
+    for name, func in cases:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        results.append({"scheme": name, "ids_per_sec": count / best})
+    return results
+
+def main():
+    """Print bulk ID generation throughput per scheme"""
+    parser = argparse.ArgumentParser(description="Compare transaction ID schemes")
+    parser.add_argument("--count", type=int, default=100000, help="IDs generated per run")
+    args = parser.parse_args()
+
+    results = compare_id_schemes(args.count)
+    baseline = results[-1]["ids_per_sec"]
+    print(f"{'scheme':<20} {'IDs/s':>12} {'vs uuid4()':>11}")
+    for result in results:
+        print(f"{result['scheme']:<20} {result['ids_per_sec']:>12,.0f} {result['ids_per_sec'] / baseline:>10.1f}x")
+    for name in ID_SCHEMES:
+        print(f"  {name:<10} e.g. {create_id_generator(name).generate(1)[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Message key strategies for controlling partition load
+"""
+
+import argparse
+import logging
+from typing import Any, List, Mapping, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Transaction fields that can be used as the message key
+KEY_FIELDS = ("transaction_id", "sender_account", "wallet_id", "merchant_id", "customer_name")
+
+class KeyStrategy:
+    """Chooses the Kafka message key for each transaction.
+
+    Messages are keyed by ``field``. Transactions that do not have that field,
+    such as a QR payment keyed by ``sender_account``, fall back to their
+    transaction ID. With ``hot_share`` > 0, that fraction of messages gets the
+    same ``hot_key`` instead, so Kafka's default partitioner sends all of them
+    to one partition.
+    """
+
+    def __init__(self, field: str = "transaction_id", hot_share: float = 0.0, hot_key: str = "hot-key",
+                 rng: Optional[np.random.Generator] = None):
+        if field not in KEY_FIELDS:
+            raise ValueError(f"Unknown key strategy '{field}' (expected one of {', '.join(KEY_FIELDS)})")
+        if not 0.0 <= hot_share <= 1.0:
+            raise ValueError(f"Hot key share must be between 0 and 1, got {hot_share}")
+        self.field = field
+        self.hot_share = hot_share
+        self.hot_key = hot_key.encode('utf-8')
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __repr__(self) -> str:
+        return f"KeyStrategy(field={self.field!r}, hot_share={self.hot_share})"
+
+    def key(self, transaction: Mapping[str, Any]) -> bytes:
+        """Key for a single transaction mapping"""
+        if self.hot_share and self.rng.random() < self.hot_share:
+            return self.hot_key
+        value = transaction.get(self.field) or transaction.get('transaction_id', '')
+        return value.encode('utf-8')
+
+    def batch_keys(self, batch) -> List[bytes]:
+        """Keys for every row of a ``TransactionBatch``"""
+        ids = batch.transaction_id
+        if self.field == "transaction_id":
+            keys = [transaction_id.encode('utf-8') for transaction_id in ids]
+        else:
+            column = getattr(batch, self.field).tolist()
+            keys = [(value or transaction_id).encode('utf-8') for value, transaction_id in zip(column, ids)]
+        if self.hot_share:
+            for index in np.flatnonzero(self.rng.random(len(keys)) < self.hot_share).tolist():
+                keys[index] = self.hot_key
+        return keys
+
+def key_strategy_from_config(worker: Optional[int] = None) -> KeyStrategy:
+    """Key strategy from ``KEY_STRATEGY``, ``HOT_KEY_SHARE`` and ``HOT_KEY``.
+
+    ``worker`` gives a fan-out worker process its own hot-key stream.
+    """
+    from .config import config
+
+    # Hot-key draws follow GENERATOR_SEED, on a stream of their own. SeedSequence
+    # ignores trailing zeros, so worker 0 is offset to stay off the [seed, 1] stream
+    seed = config.generator.seed
+    entropy = [seed, 1] if worker is None else [seed, 1, worker + 1]
+    rng = np.random.default_rng(entropy) if seed is not None else None
+    return KeyStrategy(config.kafka.key_strategy, config.kafka.hot_key_share, config.kafka.hot_key, rng=rng)
+
+def main():
+    """Show the partition spread of a key strategy against librdkafka's mock brokers"""
+    from confluent_kafka import Producer
+    from .config import config
+    from .data_generator import TransactionGenerator
+    from .producer import TransactionProducer
+    from .profiles import build_producer_config
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Measure per-partition load for a key strategy")
+    parser.add_argument("--strategy", choices=KEY_FIELDS, default=config.kafka.key_strategy, help="key field")
+    parser.add_argument("--hot-share", type=float, default=config.kafka.hot_key_share,
+                        help="fraction of messages sent with the hot key")
+    parser.add_argument("--messages", type=int, default=50000, help="messages to send")
+    parser.add_argument("--bootstrap-servers", default=None,
+                        help="measure against a real cluster instead of the built-in mock brokers")
+    args = parser.parse_args()
+
+    config.kafka.key_strategy = args.strategy
+    config.kafka.hot_key_share = args.hot_share
+    producer_config = build_producer_config(config.kafka.profile, args.bootstrap_servers)
+    if args.bootstrap_servers is None:
+        producer_config.pop('bootstrap.servers')
+        producer_config['test.mock.num.brokers'] = 3
+    logging.getLogger('src.producer').setLevel(logging.WARNING)
+
+    generator = TransactionGenerator(pool_refresh_interval=0)
+    producer = TransactionProducer(producer=Producer(producer_config))
+    try:
+        producer.send_batch(generator.generate_batch(args.messages))
+        producer.checkpoint(timeout=30)
+        for line in producer.partition_report_lines():
+            logger.info(line)
+    finally:
+        generator.close()
+
+if __name__ == "__main__":
+    main()
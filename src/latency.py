@@ -0,0 +1,316 @@
+"""
+End-to-end latency: nanosecond header stamps on produced messages and HDR histograms per stage
+"""
+
+import argparse
+import logging
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Message headers holding 8-byte big-endian nanosecond stamps from now_ns()
+GENERATED_HEADER = "txn-generated-ns"
+PRODUCED_HEADER = "txn-produced-ns"
+_NANOS = struct.Struct('>q')
+
+# Latency stages: batch generated -> handed to the producer, produced -> broker ack, produced -> consumed
+STAGES = ("generate_produce", "produce_ack", "produce_consume")
+QUANTILES = (0.5, 0.99, 0.999)
+
+# Samples buffered per histogram before they are added in bulk
+FLUSH_SAMPLES = 65536
+
+# Kafka message timestamp type set by the broker on append (confluent_kafka.TIMESTAMP_LOG_APPEND_TIME)
+TIMESTAMP_LOG_APPEND_TIME = 2
+
+LATENCY_QUANTILE = REGISTRY.gauge('txn_latency_quantile_seconds', 'End-to-end latency quantiles from HDR histograms',
+                                  ['stage', 'topic', 'partition', 'quantile'])
+LATENCY_SAMPLES = REGISTRY.gauge('txn_latency_samples', 'Latency samples recorded',
+                                 ['stage', 'topic', 'partition'])
+
+# Offset from the monotonic clock to the Unix epoch, fixed once per process
+_EPOCH_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+def now_ns() -> int:
+    """Monotonic nanoseconds anchored to the Unix epoch at startup.
+
+    Stamps from one process never go backwards. Stamps from different
+    hosts are comparable to within their clock sync (NTP/PTP).
+    """
+    return time.monotonic_ns() + _EPOCH_OFFSET_NS
+
+def encode_ns(value: int) -> bytes:
+    return _NANOS.pack(value)
+
+def decode_ns(value: bytes) -> int:
+    return _NANOS.unpack(value)[0]
+
+class HdrHistogram:
+    """High dynamic range histogram of non-negative integers, as in HdrHistogram.
+
+    Each power-of-two range of values is split into the same number of
+    linear sub-buckets, so every value up to ``highest`` is kept to
+    ``significant_figures`` decimal digits. Counts live in one numpy array
+    and whole arrays of values are recorded with a single ``bincount``.
+    Values outside ``0..highest`` are clamped and counted in ``clamped``.
+    """
+
+    def __init__(self, highest: int = 3_600_000_000_000, significant_figures: int = 3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError(f"significant_figures must be between 1 and 5, got {significant_figures}")
+        if highest >= 1 << 53:
+            raise ValueError(f"highest must be below 2**53, got {highest}")
+        self.highest = highest
+        self.significant_figures = significant_figures
+        sub_bucket_magnitude = (2 * 10 ** significant_figures - 1).bit_length()
+        self._half_magnitude = sub_bucket_magnitude - 1
+        self._sub_bucket_mask = (1 << sub_bucket_magnitude) - 1
+        self._half_count = 1 << self._half_magnitude
+        bucket_count = 1
+        while (1 << (sub_bucket_magnitude + bucket_count - 1)) <= highest:
+            bucket_count += 1
+        self.counts = np.zeros((bucket_count + 1) * self._half_count, dtype=np.int64)
+        self.total = 0
+        self.max = 0
+        self.clamped = 0
+
+    def _index(self, values: np.ndarray) -> np.ndarray:
+        # frexp's exponent is the bit length, exact for values below 2**53
+        bucket = np.frexp((values | self._sub_bucket_mask).astype(np.float64))[1] - (self._half_magnitude + 1)
+        return ((bucket + 1) << self._half_magnitude) + (values >> bucket) - self._half_count
+
+    def _highest_equivalent(self, index: np.ndarray) -> np.ndarray:
+        """Largest value counted in each bucket index"""
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        first = bucket < 0
+        sub_bucket[first] -= self._half_count
+        bucket[first] = 0
+        return (sub_bucket << bucket) + (1 << bucket) - 1
+
+    def record_values(self, values: Iterable[int]):
+        values = np.asarray(values, dtype=np.int64)
+        if not len(values):
+            return
+        out_of_range = (values < 0) | (values > self.highest)
+        if out_of_range.any():
+            self.clamped += int(out_of_range.sum())
+            values = np.clip(values, 0, self.highest)
+        self.counts += np.bincount(self._index(values), minlength=len(self.counts))
+        self.total += len(values)
+        self.max = max(self.max, int(values.max()))
+
+    def add(self, other: 'HdrHistogram'):
+        """Merge the counts of a histogram with the same range and precision"""
+        self.counts += other.counts
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.clamped += other.clamped
+
+    def values_at(self, quantiles: Sequence[float]) -> List[int]:
+        """Value at each quantile (0-1), to the histogram's precision"""
+        if not self.total:
+            return [0] * len(quantiles)
+        targets = np.maximum(1, np.ceil(np.asarray(quantiles, dtype=np.float64) * self.total)).astype(np.int64)
+        index = np.searchsorted(np.cumsum(self.counts), targets)
+        return np.minimum(self._highest_equivalent(index), self.max).tolist()
+
+Key = Tuple[str, str, int]
+
+class LatencyRecorder:
+    """HDR histograms of each latency stage per topic and partition.
+
+    ``record`` appends to a per-histogram buffer that is added in bulk every
+    ``FLUSH_SAMPLES`` samples or when quantiles are read. With ``export``
+    each histogram's p50/p99/p99.9 and sample count are served as gauges,
+    computed at scrape time under the recorder's lock.
+    """
+
+    def __init__(self, highest_ns: int = 3_600_000_000_000, significant_figures: int = 3, export: bool = True):
+        self.highest_ns = highest_ns
+        self.significant_figures = significant_figures
+        self.export = export
+        self.histograms: Dict[Key, HdrHistogram] = {}
+        self._pending: Dict[Key, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _buffer(self, key: Key) -> List[int]:
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = []
+            self.histograms[key] = HdrHistogram(self.highest_ns, self.significant_figures)
+            if self.export:
+                stage, topic, partition = key
+                for quantile in QUANTILES:
+                    LATENCY_QUANTILE.labels(stage, topic, partition, quantile).set_function(
+                        lambda key=key, quantile=quantile: self.quantiles(key, (quantile,))[0] / 1e9)
+                LATENCY_SAMPLES.labels(stage, topic, partition).set_function(lambda key=key: self.count(key))
+        return pending
+
+    def _flush(self, key: Key):
+        pending = self._pending[key]
+        if pending:
+            self.histograms[key].record_values(pending)
+            pending.clear()
+
+    def record(self, stage: str, topic: str, partition: int, value_ns: int):
+        key = (stage, topic, partition)
+        with self._lock:
+            pending = self._buffer(key)
+            pending.append(value_ns)
+            if len(pending) >= FLUSH_SAMPLES:
+                self._flush(key)
+
+    def record_many(self, stage: str, topic: str, partition: int, values_ns: Iterable[int]):
+        key = (stage, topic, partition)
+        with self._lock:
+            pending = self._buffer(key)
+            pending.extend(values_ns)
+            if len(pending) >= FLUSH_SAMPLES:
+                self._flush(key)
+
+    def quantiles(self, key: Key, quantiles: Sequence[float] = QUANTILES) -> List[int]:
+        """Nanosecond values at ``quantiles`` for one (stage, topic, partition)"""
+        with self._lock:
+            self._flush(key)
+            return self.histograms[key].values_at(quantiles)
+
+    def count(self, key: Key) -> int:
+        with self._lock:
+            return self.histograms[key].total + len(self._pending[key])
+
+    def snapshot(self) -> Dict[Key, Dict[str, float]]:
+        """Sample count, p50/p99/p99.9 and max in milliseconds for every histogram"""
+        with self._lock:
+            keys = sorted(self.histograms)
+            for key in keys:
+                self._flush(key)
+            snapshot = {}
+            for key in keys:
+                histogram = self.histograms[key]
+                p50, p99, p999 = histogram.values_at(QUANTILES)
+                snapshot[key] = {"count": histogram.total, "p50_ms": p50 / 1e6, "p99_ms": p99 / 1e6,
+                                 "p999_ms": p999 / 1e6, "max_ms": histogram.max / 1e6,
+                                 "clamped": histogram.clamped}
+        return snapshot
+
+    def summary_lines(self) -> List[str]:
+        return [f"{stage} {topic}[{partition}]: {row['count']:,} samples, p50 {row['p50_ms']:.3f}ms, "
+                f"p99 {row['p99_ms']:.3f}ms, p99.9 {row['p999_ms']:.3f}ms, max {row['max_ms']:.3f}ms"
+                + (f" ({row['clamped']} clamped)" if row['clamped'] else "")
+                for (stage, topic, partition), row in self.snapshot().items()]
+
+def record_messages(recorder: LatencyRecorder, messages: Iterable, received_ns: int) -> Tuple[int, int]:
+    """Record the stamped stages of consumed messages, returning (stamped, unstamped) counts.
+
+    Produce-to-ack latency needs the broker's append time, so it is only
+    recorded for topics with ``message.timestamp.type=LogAppendTime``.
+    """
+    samples: Dict[Key, List[int]] = {}
+    stamped = unstamped = 0
+    for message in messages:
+        headers = message.headers()
+        stamps = dict(headers) if headers else {}
+        produced = stamps.get(PRODUCED_HEADER)
+        if produced is None:
+            unstamped += 1
+            continue
+        stamped += 1
+        produced = decode_ns(produced)
+        topic, partition = message.topic(), message.partition()
+        generated = stamps.get(GENERATED_HEADER)
+        if generated is not None:
+            samples.setdefault(("generate_produce", topic, partition), []).append(produced - decode_ns(generated))
+        samples.setdefault(("produce_consume", topic, partition), []).append(received_ns - produced)
+        timestamp_type, timestamp_ms = message.timestamp()
+        if timestamp_type == TIMESTAMP_LOG_APPEND_TIME:
+            samples.setdefault(("produce_ack", topic, partition), []).append(timestamp_ms * 1_000_000 - produced)
+    for key, values in samples.items():
+        recorder.record_many(*key, values)
+    return stamped, unstamped
+
+def consume_latency(consumer, recorder: LatencyRecorder, batch_size: int = 10000, seconds: Optional[float] = None,
+                    max_messages: Optional[int] = None, idle_seconds: Optional[float] = None,
+                    summary_interval: float = 10.0) -> Dict[str, int]:
+    """Consume stamped messages into ``recorder``, logging per-stage summaries periodically.
+
+    Every message of one ``consume`` call is stamped with the time that call
+    returned, so produce-to-consume includes the wait inside the batch.
+    """
+    started = last_summary = idle_since = time.monotonic()
+    stamped = unstamped = 0
+    while True:
+        messages = [message for message in consumer.consume(num_messages=batch_size, timeout=1.0)
+                    if message.error() is None]
+        received = now_ns()
+        now = time.monotonic()
+        if messages:
+            idle_since = now
+            batch_stamped, batch_unstamped = record_messages(recorder, messages, received)
+            stamped += batch_stamped
+            unstamped += batch_unstamped
+        if now - last_summary >= summary_interval:
+            logger.info(f"Consumed {stamped + unstamped:,} messages ({unstamped:,} without latency headers)")
+            for line in recorder.summary_lines():
+                logger.info(f"  {line}")
+            last_summary = now
+        if (seconds is not None and now - started >= seconds) or \
+                (max_messages is not None and stamped + unstamped >= max_messages) or \
+                (idle_seconds is not None and now - idle_since >= idle_seconds):
+            break
+    logger.info(f"Latency from {stamped:,} stamped messages ({unstamped:,} without latency headers):")
+    for line in recorder.summary_lines():
+        logger.info(f"  {line}")
+    return {"stamped": stamped, "unstamped": unstamped}
+
+def main():
+    """Consume messages stamped with LATENCY_HEADERS and report latency quantiles per stage"""
+    from confluent_kafka import Consumer
+    from .config import config
+    from .metrics import MetricsServer
+    from .verify import build_consumer_config
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Measure end-to-end latency from producer header stamps")
+    parser.add_argument("--topics", nargs="+", default=config.kafka.topics, help="topics to read")
+    parser.add_argument("--bootstrap-servers", default=config.kafka.bootstrap_servers, help="Kafka brokers")
+    parser.add_argument("--group", default=None, help="consumer group (default: a new group per run)")
+    parser.add_argument("--from-latest", action="store_true", help="skip messages produced before startup")
+    parser.add_argument("--batch-size", type=int, default=10000, help="messages per consume() call")
+    parser.add_argument("--seconds", type=float, default=None, help="stop after this long")
+    parser.add_argument("--max-messages", type=int, default=None, help="stop after this many messages")
+    parser.add_argument("--idle-seconds", type=float, default=None, help="stop after this long without messages")
+    parser.add_argument("--summary-interval", type=float, default=10.0, help="seconds between summaries")
+    parser.add_argument("--metrics-port", type=int, default=0, help="serve quantile gauges on this port (0 = off)")
+    parser.add_argument("--significant-figures", type=int, default=3, help="HDR histogram precision")
+    args = parser.parse_args()
+
+    recorder = LatencyRecorder(significant_figures=args.significant_figures, export=bool(args.metrics_port))
+    server = MetricsServer(args.metrics_port) if args.metrics_port else None
+    if server:
+        server.start()
+    consumer_config = build_consumer_config(args.group, args.bootstrap_servers)
+    if args.from_latest:
+        consumer_config['auto.offset.reset'] = 'latest'
+    # Latency is measured per message, so fetches are not held back to fill up
+    consumer_config['fetch.min.bytes'] = 1
+    consumer = Consumer(consumer_config)
+    consumer.subscribe(args.topics)
+    try:
+        consume_latency(consumer, recorder, args.batch_size, seconds=args.seconds, max_messages=args.max_messages,
+                        idle_seconds=args.idle_seconds, summary_interval=args.summary_interval)
+    except KeyboardInterrupt:
+        for line in recorder.summary_lines():
+            logger.info(f"  {line}")
+    finally:
+        consumer.close()
+        if server:
+            server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,25 @@
 Main entry point for the VPBank Transaction Simulator
 """
 
+import argparse
 import logging
 import time
 import random
 import signal
 import sys
 from typing import NoReturn
+from .blast import PayloadRing
 from .config import config
-from .data_generator import TransactionGenerator
+from .control import ControlServer, ControlState, Settings, publish
+from .data_generator import TRANSACTION_TYPES, TransactionGenerator
+from .fanout import FanoutGenerator
+from .keys import KeyStrategy
+from .metrics import REGISTRY, MetricsServer
 from .producer import TransactionProducer
+from .profiles import PRODUCER_PROFILES
+from .sampling import parse_distribution
+from .scheduler import ConstantRate, RateScheduler, parse_rate_profile
+from .sinks import SINKS
 
 # Configure logging
 logging.basicConfig(
@@ -19,44 +29,207 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+STAGE_SECONDS = REGISTRY.histogram(
+    'txn_stage_seconds', 'Time spent per batch in each pipeline stage', ['stage'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+GENERATED = REGISTRY.counter('txn_generated_total', 'Transactions generated')
+TARGET_RATE = REGISTRY.gauge('txn_target_rate', 'Target send rate in messages/second')
+ACHIEVED_RATE = REGISTRY.gauge('txn_achieved_rate', 'Achieved send rate in messages/second')
+
 class TransactionSimulator:
     """Main simulator class"""
     
     def __init__(self):
-        self.generator = TransactionGenerator()
+        self.generator = None
+        self.fanout = None
+        self.blast = None
+        if config.generator.blast:
+            if config.generator.workers > 0:
+                logger.warning("GENERATOR_WORKERS is ignored in blast mode")
+            self.generator = TransactionGenerator()
+        elif config.generator.workers > 0:
+            # Worker processes generate and encode; this process only produces
+            # Worker timestamps step at RATE_PROFILE's starting rate to track the wall clock
+            rate = (parse_rate_profile(config.transaction.rate_profile).rate(0)
+                    if config.transaction.rate_profile else None)
+            self.fanout = FanoutGenerator(
+                config.generator.workers, config.transaction.batch_size,
+                slot_count=config.generator.ring_slots, slot_bytes=config.generator.ring_slot_bytes,
+                rate=rate
+            )
+        else:
+            self.generator = TransactionGenerator()
         self.producer = TransactionProducer()
+        self._send = self.producer.send_encoded if self.fanout else self.producer.send_batch
+        if config.generator.blast:
+            # Pre-encoded templates, patched per message and sent with batch-level accounting
+            self.blast = PayloadRing(self.generator, self.producer.serializer, config.generator.blast_ring_size)
+            self._send = self.producer.send_blast
+        # Restamp paced chunks on release so event time follows actual send time
+        self._restamp = bool(self.generator and not self.blast and self.generator.clock.tracks_wall_clock
+                             and config.generator.clock_track_sends)
+        self.scheduler = None
+        if config.transaction.rate_profile:
+            self.scheduler = RateScheduler(
+                parse_rate_profile(config.transaction.rate_profile),
+                resolution=config.transaction.pacing_resolution
+            )
+        # RATE_PROFILE's scheduler, restored when a control API rate override is cleared
+        self._configured_scheduler = self.scheduler
+        TARGET_RATE.set_function(lambda: self.scheduler.target_rate() if self.scheduler else 0.0)
+        
+        # Runtime-adjustable settings; the loop switches to each new snapshot between batches
+        fixed = {}
+        if self.fanout:
+            for name in ("type_mix", "batch_size", "key_strategy", "hot_key_share"):
+                fixed[name] = "set in the GENERATOR_WORKERS processes at startup"
+        elif self.blast:
+            for name in ("type_mix", "key_strategy", "hot_key_share"):
+                fixed[name] = "blast templates are rendered at startup"
+        self.control = ControlState(Settings.from_config(), fixed)
+        self.settings = self.control.settings
+        publish(self.settings)
+        self.control_server = None
+        if config.control.port:
+            self.control_server = ControlServer(self.control, config.control.port)
+        self.metrics_server = None
+        if config.metrics.port:
+            self.metrics_server = MetricsServer(config.metrics.port)
         self.running = False
+        self._generate_timer = STAGE_SECONDS.labels('generate')
+        self._send_timer = STAGE_SECONDS.labels('send')
+    
+    def _apply_settings(self, settings: Settings):
+        """Switch the running loop over to a new settings snapshot"""
+        previous, self.settings = self.settings, settings
+        if settings.rate != previous.rate:
+            if settings.rate is None:
+                self.scheduler = self._configured_scheduler
+            elif self.scheduler is None or self.scheduler is self._configured_scheduler:
+                self.scheduler = RateScheduler(ConstantRate(settings.rate),
+                                               resolution=config.transaction.pacing_resolution)
+            else:
+                self.scheduler.profile = ConstantRate(settings.rate)
+        if self.scheduler and (settings.rate != previous.rate or previous.paused and not settings.paused):
+            # Drift accounting restarts rather than counting paused time as a shortfall
+            self.scheduler.start()
+        if settings.type_mix != previous.type_mix:
+            self.generator.type_sampler = parse_distribution(settings.type_mix, len(TRANSACTION_TYPES))
+        if (settings.key_strategy, settings.hot_key_share) != (previous.key_strategy, previous.hot_key_share):
+            # Keep drawing hot keys from the seeded stream rather than restarting it unseeded
+            self.producer.key_strategy = KeyStrategy(settings.key_strategy, settings.hot_key_share,
+                                                     config.kafka.hot_key, rng=self.producer.key_strategy.rng)
+        publish(settings)
+    
+    def _send_paced(self, batch) -> int:
+        """Send a batch in small chunks released by the rate scheduler"""
+        successful_sends = 0
+        position = 0
+        send_time = 0.0
+        while position < len(batch) and self.running:
+            chunk = self.scheduler.chunk_size(len(batch) - position)
+            self.scheduler.acquire(chunk)
+            start = time.perf_counter()
+            part = batch.slice(position, position + chunk)
+            if self._restamp:
+                self.generator.clock.stamp(part.timestamp_us, self.generator.rng)
+            successful_sends += self._send(part)
+            send_time += time.perf_counter() - start
+            position += chunk
+        # Pacing waits are excluded so the stage timing reflects producer work only
+        self._send_timer.observe(send_time)
+        return successful_sends
         
+    def _next_batch(self):
+        """Generate the next batch, or take one encoded by a worker process"""
+        if self.fanout:
+            return self.fanout.next_batch()
+        if self.blast:
+            return self.blast.render(self.settings.batch_size)
+        batch = self.generator.generate_batch(self.settings.batch_size)
+        
+        # Debug: Check the first few transactions
+        logger.debug(f"Generated {len(batch)} transactions")
+        for i in range(min(3, len(batch))):  # Show first 3 transactions
+            logger.debug(f"Transaction {i+1}: type='{batch.transaction_type[i]}', id={batch.transaction_id[i]}")
+        return batch
+    
     def start(self):
         """Start the transaction simulation"""
         logger.info("Starting VPBank Transaction Simulator...")
-        logger.info(f"Kafka Topics: {config.kafka.topics}")
-        logger.info(f"Transaction interval: {config.transaction.min_interval}s - {config.transaction.max_interval}s")
-        logger.info(f"Batch size: {config.transaction.batch_size}")
+        logger.info(f"Kafka Topics: {config.kafka.topics} (sink: {config.sink.type})")
+        if self.scheduler:
+            logger.info(f"Rate profile: {self.scheduler.profile!r}")
+        else:
+            logger.info(f"Transaction interval: {config.transaction.min_interval}s - {config.transaction.max_interval}s")
+        logger.info(f"Batch size: {self.settings.batch_size}")
         
         self.running = True
+        if self.metrics_server:
+            self.metrics_server.start()
+        if self.control_server:
+            self.control_server.start()
+        if self.fanout:
+            self.fanout.start()
+        last_checkpoint = time.monotonic()
+        last_rate_report = time.monotonic()
+        if self.scheduler:
+            self.scheduler.start()
         
         try:
             while self.running:
-                # Generate batch of transactions
-                transactions = self.generator.generate_transactions(config.transaction.batch_size)
+                settings = self.control.settings
+                if settings is not self.settings:
+                    self._apply_settings(settings)
+                if settings.paused:
+                    if self.control.changed.wait(0.1):
+                        self.control.changed.clear()
+                    continue
                 
-                # Debug: Check the first few transactions
-                logger.info(f"DEBUG: Generated {len(transactions)} transactions")
-                for i, txn in enumerate(transactions[:3]):  # Show first 3 transactions
-                    logger.info(f"DEBUG: Transaction {i+1}: type='{txn['transaction_type']}', id={txn['transaction_id']}")
+                # Generate a columnar batch of transactions
+                start = time.perf_counter()
+                batch = self._next_batch()
+                self._generate_timer.observe(time.perf_counter() - start)
+                GENERATED.inc(len(batch))
                 
                 # Send transactions to Kafka
-                successful_sends = self.producer.send_transactions_batch(transactions)
+                if self.scheduler:
+                    successful_sends = self._send_paced(batch)
+                else:
+                    start = time.perf_counter()
+                    successful_sends = self._send(batch)
+                    self._send_timer.observe(time.perf_counter() - start)
+                    logger.info(f"Generated and sent {successful_sends} transactions "
+                                f"(queue depth: {self.producer.queue_depth()})")
+                
+                # Periodically wait for in-flight messages in pipelined mode
+                checkpoint_interval = config.kafka.checkpoint_interval
+                if checkpoint_interval > 0 and time.monotonic() - last_checkpoint >= checkpoint_interval:
+                    self.producer.checkpoint()
+                    last_checkpoint = time.monotonic()
                 
-                logger.info(f"Generated and sent {successful_sends} transactions")
+                if self.scheduler:
+                    # Pacing happens inside _send_paced; report how well we track the target
+                    if time.monotonic() - last_rate_report >= config.transaction.rate_report_interval:
+                        report = self.scheduler.report()
+                        ACHIEVED_RATE.set(report['achieved_rate'])
+                        logger.info(f"Rate: {report['achieved_rate']:.0f}/s achieved vs "
+                                    f"{report['target_rate']:.0f}/s target "
+                                    f"(drift {report['rate_drift_pct']:+.2f}%, "
+                                    f"cumulative {report['cumulative_drift']:+.0f} msgs, "
+                                    f"queue depth: {self.producer.queue_depth()})")
+                        last_rate_report = time.monotonic()
+                    continue
                 
                 # Wait for random interval before next batch
                 interval = random.uniform(
                     config.transaction.min_interval,
                     config.transaction.max_interval
                 )
-                time.sleep(interval)
+                # Wakes early when the control API changes a setting
+                if self.control.changed.wait(interval):
+                    self.control.changed.clear()
                 
         except KeyboardInterrupt:
             logger.info("Received interrupt signal, shutting down...")
@@ -69,7 +242,15 @@ class TransactionSimulator:
         """Stop the simulation"""
         logger.info("Stopping transaction simulator...")
         self.running = False
+        if self.fanout:
+            self.fanout.stop()
+        if self.generator:
+            self.generator.close()
         self.producer.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.control_server:
+            self.control_server.stop()
         logger.info("Transaction simulator stopped")
 
 def signal_handler(signum, frame):
@@ -77,8 +258,22 @@ def signal_handler(signum, frame):
     logger.info("Received signal to terminate")
     sys.exit(0)
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line overrides for the environment configuration"""
+    parser = argparse.ArgumentParser(description="VPBank Transaction Simulator")
+    parser.add_argument("--profile", choices=sorted(PRODUCER_PROFILES),
+                        help="producer tuning profile (overrides PRODUCER_PROFILE)")
+    parser.add_argument("--sink", choices=sorted(SINKS), help="where messages go (overrides SINK)")
+    return parser.parse_args(argv)
+
 def main():
     """Main function"""
+    args = parse_args()
+    if args.profile:
+        config.kafka.profile = args.profile
+    if args.sink:
+        config.sink.type = args.sink
+    
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -0,0 +1,279 @@
+"""
+Prometheus-style metrics for the transaction simulator
+"""
+
+import bisect
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds (0.5ms to 30s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape_label(value) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+class _GaugeChild:
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function):
+        """Evaluate ``function`` at scrape time instead of storing a value"""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metric:
+    """A metric family with optional labels"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child for a label combination; cache it on hot paths"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function):
+        self.labels().set_function(function)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+                for key, child in list(self._children.items())]
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), list(child.counts)):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+# Global registry instance
+REGISTRY = MetricsRegistry()
+
+def handle_librdkafka_stats(stats_json: str, registry: MetricsRegistry = REGISTRY):
+    """Parse librdkafka ``statistics.cb`` JSON into gauges"""
+    try:
+        stats = json.loads(stats_json)
+    except ValueError as e:
+        logger.error(f"Invalid librdkafka statistics: {e}")
+        return
+
+    for field, documentation in (
+        ('msg_cnt', 'Messages waiting in the producer queue'),
+        ('msg_size', 'Bytes waiting in the producer queue'),
+        ('txmsgs', 'Messages transmitted to brokers'),
+        ('txmsg_bytes', 'Message bytes transmitted to brokers'),
+        ('tx', 'Requests sent to brokers'),
+        ('tx_bytes', 'Request bytes sent to brokers'),
+    ):
+        if field in stats:
+            registry.gauge(f"librdkafka_{field}", documentation).set(stats[field])
+
+    retries = registry.gauge('librdkafka_broker_txretries', 'Request retries per broker', ['broker'])
+    rtt = registry.gauge('librdkafka_broker_rtt_avg_seconds', 'Average broker round-trip time', ['broker'])
+    outbuf = registry.gauge('librdkafka_broker_outbuf_msg_cnt', 'Messages awaiting transmission per broker',
+                            ['broker'])
+    for broker in stats.get('brokers', {}).values():
+        name = broker.get('name', '')
+        retries.labels(name).set(broker.get('txretries', 0))
+        outbuf.labels(name).set(broker.get('outbuf_msg_cnt', 0))
+        if broker.get('rtt'):
+            rtt.labels(name).set(broker['rtt'].get('avg', 0) / 1e6)
+
+    batch_size = registry.gauge('librdkafka_topic_batchsize_avg_bytes', 'Average batch size per topic', ['topic'])
+    batch_count = registry.gauge('librdkafka_topic_batchcnt_avg', 'Average messages per batch per topic',
+                                 ['topic'])
+    queued = registry.gauge('librdkafka_partition_msgq_cnt', 'Messages queued per partition',
+                            ['topic', 'partition'])
+    for topic_name, topic in stats.get('topics', {}).items():
+        if topic.get('batchsize'):
+            batch_size.labels(topic_name).set(topic['batchsize'].get('avg', 0))
+        if topic.get('batchcnt'):
+            batch_count.labels(topic_name).set(topic['batchcnt'].get('avg', 0))
+        for partition_id, partition in topic.get('partitions', {}).items():
+            if partition_id == '-1':  # Internal UA partition
+                continue
+            queued.labels(topic_name, partition_id).set(partition.get('msgq_cnt', 0) + partition.get('xmit_msgq_cnt', 0))
+
+class MetricsServer:
+    """Serves a registry over HTTP at ``/metrics`` from a daemon thread"""
+
+    def __init__(self, port: int, registry: MetricsRegistry = REGISTRY, host: str = '0.0.0.0'):
+        self.registry = registry
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on port {self.port}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -2,107 +2,457 @@
 Kafka producer for streaming transaction data
 """
 
-import json
 import logging
-from typing import Dict, Any, List
-from confluent_kafka import Producer
+import time
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Any, List, Tuple
+from confluent_kafka import KafkaError, Producer
 from .config import config
+from .data_generator import TRANSACTION_TYPES
+from .fanout import EncodedBatch
+from .keys import key_strategy_from_config
+from .latency import GENERATED_HEADER, PRODUCED_HEADER, LatencyRecorder, encode_ns, now_ns
+from .metrics import REGISTRY, handle_librdkafka_stats
+from .profiles import build_producer_config
+from .serializers import create_serializer
+from .sinks import create_sink
+from .spill import SpillJournal
 
 logger = logging.getLogger(__name__)
 
+# Map transaction types to topics
+TOPIC_MAPPING = {
+    'IBFT': 'IBFT',
+    'QR': 'qr_payments',
+    'TOPUP': 'topup_wallet'
+}
+
+# Topic per ``TransactionBatch.type_code``
+_TYPE_TOPICS = [TOPIC_MAPPING[transaction_type] for transaction_type in TRANSACTION_TYPES]
+
+MESSAGES_PRODUCED = REGISTRY.counter('txn_messages_produced_total', 'Messages handed to the producer', ['topic'])
+MESSAGES_ACKED = REGISTRY.counter('txn_messages_acked_total', 'Messages acknowledged by the broker', ['topic'])
+MESSAGES_FAILED = REGISTRY.counter('txn_messages_failed_total', 'Messages that failed delivery', ['topic'])
+BYTES_SENT = REGISTRY.counter('txn_bytes_sent_total', 'Payload bytes handed to the producer', ['topic'])
+PRODUCE_RETRIES = REGISTRY.counter('txn_produce_retries_total', 'Produce retries while the local queue was full',
+                                   ['topic'])
+DELIVERY_LATENCY = REGISTRY.histogram('txn_delivery_latency_seconds',
+                                      'Time from enqueue to broker acknowledgment', ['topic'])
+QUEUE_DEPTH = REGISTRY.gauge('txn_producer_queue_depth', 'Messages waiting in the librdkafka queue')
+IN_FLIGHT = REGISTRY.gauge('txn_producer_in_flight', 'Messages awaiting a delivery report')
+PARTITION_MESSAGES = REGISTRY.counter('txn_partition_messages_total', 'Messages acknowledged per partition',
+                                      ['topic', 'partition'])
+
+class _TopicMetrics:
+    """Per-topic metric children, cached to keep label lookups off the hot path"""
+
+    __slots__ = ('produced', 'acked', 'failed', 'bytes', 'retries', 'latency')
+
+    def __init__(self, topic: str):
+        self.produced = MESSAGES_PRODUCED.labels(topic)
+        self.acked = MESSAGES_ACKED.labels(topic)
+        self.failed = MESSAGES_FAILED.labels(topic)
+        self.bytes = BYTES_SENT.labels(topic)
+        self.retries = PRODUCE_RETRIES.labels(topic)
+        self.latency = DELIVERY_LATENCY.labels(topic)
+
 class TransactionProducer:
     """Kafka producer for transaction messages"""
     
-    def __init__(self):
+    def __init__(self, producer=None, blast: bool = None):
         self.topics = config.kafka.topics
-        self.producer_config = {
-            'bootstrap.servers': config.kafka.bootstrap_servers,
-            'client.id': 'vpbank-transaction-simulator',
-            'acks': 'all',
-            'retries': 3,
-            'retry.backoff.ms': 100,
-            'linger.ms': 1,
-            'batch.size': 16384,
-            'compression.type': 'none',  # Use no compression for simplicity
-        }
-        self.producer = Producer(self.producer_config)
-        logger.info(f"Connected to Kafka at {config.kafka.bootstrap_servers}")
+        self.profile = config.kafka.profile
+        self.producer_config = build_producer_config(self.profile, config.kafka.bootstrap_servers)
+        self.serializer = create_serializer(config.kafka.serializer, config.kafka.schema_registry_path)
+        self.pipelined = config.kafka.pipelined
+        self.max_in_flight = config.kafka.max_in_flight
+        self.buffer_retry_timeout = config.kafka.buffer_retry_timeout
+        self.key_strategy = key_strategy_from_config()
+        # Blast mode: librdkafka only reports failed deliveries, successes are inferred
+        self.blast = config.generator.blast if blast is None else blast
+        if self.blast:
+            self.producer_config['delivery.report.only.error'] = True
+        # Latency headers: every message gets a produce stamp, plus its batch's generation stamp when known
+        self.latency_headers = config.kafka.latency_headers
+        self.latency = LatencyRecorder() if self.latency_headers else None
+        self._generated_header = None
+        # Spill journal: messages Kafka cannot take right now go to disk and are replayed in order
+        self.spill = None
+        if config.spill.enabled:
+            self.spill = SpillJournal(config.spill.path, config.spill.max_mb * 1024 * 1024,
+                                      segment_bytes=config.spill.segment_mb * 1024 * 1024)
+            self.producer_config['error_cb'] = self._on_kafka_error
+        
+        # Messages handed to librdkafka whose delivery report has not arrived yet
+        self.in_flight = 0
+        self.delivered = 0
+        self.failed = 0
+        self.blast_sent = 0
+        self._topic_metrics = {topic: _TopicMetrics(topic) for topic in TOPIC_MAPPING.values()}
+        # Acknowledged messages per (topic, partition), and their cached metric children
+        self.partition_counts: Dict[Tuple[str, int], int] = {}
+        self._partition_metrics: Dict[Tuple[str, int], Any] = {}
+        
+        if config.metrics.stats_interval_ms > 0:
+            # Parse librdkafka's statistics JSON into gauges
+            self.producer_config['statistics.interval.ms'] = config.metrics.stats_interval_ms
+            self.producer_config['stats_cb'] = handle_librdkafka_stats
+        
+        if producer is not None:
+            # Any object with the Producer produce/poll/flush/__len__ interface
+            self.producer = producer
+            logger.info(f"Using {type(producer).__name__} instead of Kafka "
+                        f"(serializer: {self.serializer.name})")
+        elif config.sink.type != "kafka":
+            self.producer = create_sink(config.sink.type, self.producer_config, path=config.sink.path,
+                                        address=config.sink.address, capacity=config.sink.capacity)
+            if config.sink.type == "memory":
+                # Nothing else in the simulator reads the queue, so drain it here
+                self.producer.start_consumer()
+            logger.info(f"Sending to the {config.sink.type} sink instead of Kafka "
+                        f"(serializer: {self.serializer.name})")
+        else:
+            self.producer = Producer(self.producer_config)
+            logger.info(f"Connected to Kafka at {config.kafka.bootstrap_servers} "
+                        f"(profile: {self.profile}, serializer: {self.serializer.name})")
+        QUEUE_DEPTH.set_function(self.queue_depth)
+        IN_FLIGHT.set_function(lambda: self.in_flight)
+        if self.spill is not None:
+            self.spill.start(self.producer.produce)
+    
+    def _metrics_for(self, topic: str) -> _TopicMetrics:
+        metrics = self._topic_metrics.get(topic)
+        if metrics is None:
+            metrics = self._topic_metrics[topic] = _TopicMetrics(topic)
+        return metrics
     
     def delivery_report(self, err, msg):
         """Delivery report callback"""
+        self.in_flight -= 1
+        metrics = self._metrics_for(msg.topic())
         if err is not None:
+            if self.spill is not None and self.spill.append(msg.topic(), msg.key(), msg.value(), failed=True):
+                logger.debug(f'Message delivery failed, spilled to disk: {err}')
+                return
+            self.failed += 1
+            metrics.failed.inc()
             logger.error(f'Message delivery failed: {err}')
         else:
+            if self.spill is not None and self.spill.broker_down:
+                self.spill.mark_up()
+            self.delivered += 1
+            metrics.acked.inc()
+            self._count_partition(msg.topic(), msg.partition())
+            # librdkafka measures latency from the message's enqueue timestamp
+            latency = msg.latency()
+            if latency is not None:
+                metrics.latency.observe(latency)
+                if self.latency is not None:
+                    self.latency.record("produce_ack", msg.topic(), msg.partition(), int(latency * 1e9))
             logger.debug(f'Message delivered to {msg.topic()} [{msg.partition()}] at offset {msg.offset()}')
     
+    def _on_kafka_error(self, error):
+        """librdkafka error callback: stop handing messages to Kafka while no broker is reachable"""
+        logger.warning(f"Kafka error: {error}")
+        if error.code() == KafkaError._ALL_BROKERS_DOWN:
+            self.spill.mark_down()
+    
+    def _blast_report(self, err, msg):
+        """Delivery callback in blast mode, where librdkafka only reports failures"""
+        if err is not None:
+            self.failed += 1
+            self._metrics_for(msg.topic()).failed.inc()
+            logger.error(f'Message delivery failed: {err}')
+    
+    def _count_partition(self, topic: str, partition: int):
+        key = (topic, partition)
+        count = self.partition_counts.get(key)
+        if count is None:
+            count = 0
+            self._partition_metrics[key] = PARTITION_MESSAGES.labels(topic, partition)
+        self.partition_counts[key] = count + 1
+        self._partition_metrics[key].inc()
+    
+    def partition_report(self) -> Dict[str, Dict[int, int]]:
+        """Acknowledged message counts per partition, grouped by topic"""
+        report: Dict[str, Dict[int, int]] = {}
+        for (topic, partition), count in sorted(self.partition_counts.items()):
+            report.setdefault(topic, {})[partition] = count
+        return report
+    
+    def partition_report_lines(self) -> List[str]:
+        """Human-readable partition imbalance summary, one line per topic"""
+        lines = []
+        for topic, counts in self.partition_report().items():
+            total = sum(counts.values())
+            hottest = max(counts, key=counts.get)
+            share = counts[hottest] / total
+            imbalance = counts[hottest] / (total / len(counts))
+            spread = ', '.join(f"p{partition}={count}" for partition, count in counts.items())
+            lines.append(f"{topic}: {total} messages over {len(counts)} partitions, hottest p{hottest} "
+                         f"{share:.1%} (max/mean {imbalance:.2f}x) [{spread}]")
+        return lines
+    
+    def _produce_once(self, topic: str, value: bytes, key: bytes):
+        """Hand a message to librdkafka once, raising ``BufferError`` if its queue is full"""
+        if self.latency_headers:
+            headers = [(PRODUCED_HEADER, encode_ns(now_ns()))]
+            if self._generated_header is not None:
+                headers.append(self._generated_header)
+            self.producer.produce(topic=topic, value=value, key=key, headers=headers,
+                                  callback=self.delivery_report)
+        else:
+            self.producer.produce(topic=topic, value=value, key=key, callback=self.delivery_report)
+        self.in_flight += 1
+        metrics = self._metrics_for(topic)
+        metrics.produced.inc()
+        metrics.bytes.inc(len(value))
+    
+    def _produce(self, topic: str, value: bytes, key: bytes) -> bool:
+        """Hand a message to librdkafka, polling and retrying while its queue is full"""
+        if self.spill is not None:
+            return self._produce_or_spill(topic, value, key)
+        deadline = None
+        while True:
+            try:
+                self._produce_once(topic, value, key)
+                return True
+            except BufferError:
+                self._metrics_for(topic).retries.inc()
+                # Local queue is full: serve delivery reports to make room and retry
+                if deadline is None:
+                    deadline = time.monotonic() + self.buffer_retry_timeout
+                elif time.monotonic() >= deadline:
+                    logger.error(f"Local producer queue still full after {self.buffer_retry_timeout}s, "
+                                 f"dropping message for topic {topic}")
+                    return False
+                self.producer.poll(0.05)
+    
+    def _produce_or_spill(self, topic: str, value: bytes, key: bytes) -> bool:
+        """Hand a message to librdkafka, or to the spill journal instead of waiting for room"""
+        spill = self.spill
+        # Behind a backlog, new messages join the journal so replay keeps them in order
+        if not spill.active and self.in_flight < self.max_in_flight:
+            try:
+                with spill.produce_lock:
+                    self._produce_once(topic, value, key)
+                return True
+            except BufferError:
+                pass
+        if spill.append(topic, key, value):
+            return True
+        self.failed += 1
+        self._metrics_for(topic).failed.inc()
+        return False
+    
+    def wait_for_capacity(self):
+        """Block until the in-flight budget has room for more messages"""
+        if self.spill is not None:
+            # A full budget spills instead of blocking
+            return
+        while self.in_flight >= self.max_in_flight:
+            self.producer.poll(0.01)
+    
+    def poll(self, timeout: float = 0) -> int:
+        """Serve pending delivery reports"""
+        return self.producer.poll(timeout)
+
+    def queue_depth(self) -> int:
+        """Number of messages waiting in the librdkafka queue"""
+        return len(self.producer)
+    
+    def checkpoint(self, timeout: float = 10) -> int:
+        """Flush all in-flight messages, returning how many are still undelivered"""
+        if self.spill is not None and self.spill.broker_down:
+            # Nothing is delivered while the broker is down; failures spill as their reports arrive
+            self.producer.poll(0)
+            return len(self.producer)
+        remaining = self.producer.flush(timeout=timeout)
+        if self.blast_sent:
+            # Only failures are reported in blast mode; everything else that left the queue was delivered
+            self.delivered = self.blast_sent - self.failed - remaining
+        if remaining:
+            logger.warning(f"{remaining} messages still undelivered after checkpoint")
+        return remaining
+    
     def send_transaction(self, transaction: Dict[str, Any]) -> bool:
         """Send a single transaction to the appropriate topic"""
         try:
             transaction_type = transaction.get('transaction_type')
-            logger.info(f"DEBUG: Processing transaction type: '{transaction_type}' (type: {type(transaction_type)})")
-            
-            # Map transaction types to topics using config
-            topic_mapping = {
-                'IBFT': 'IBFT',
-                'QR': 'qr_payments', 
-                'TOPUP': 'topup_wallet'
-            }
-            
-            logger.info(f"DEBUG: Available topic mapping: {topic_mapping}")
-            topic = topic_mapping.get(transaction_type)
-            logger.info(f"DEBUG: Mapped topic: {topic}")
+            topic = TOPIC_MAPPING.get(transaction_type)
             
             if not topic:
                 logger.error(f"Unknown transaction type: '{transaction_type}' (type: {type(transaction_type)})")
-                logger.error(f"Available mapping: {list(topic_mapping.keys())}")
+                logger.error(f"Available mapping: {list(TOPIC_MAPPING.keys())}")
                 logger.error(f"Available topics: {self.topics}")
                 return False
             
-            # Use transaction_id as the key for partitioning
-            key = transaction.get('transaction_id', '')
-            message = json.dumps(transaction, default=str)
+            # Key by the configured strategy (transaction_id by default) for partitioning
+            key = self.key_strategy.key(transaction)
+            message = self.serializer.encode(transaction)
             
             # Send message
-            self.producer.produce(
-                topic=topic,
-                value=message.encode('utf-8'),
-                key=key.encode('utf-8'),
-                callback=self.delivery_report
-            )
+            if not self._produce(topic, message, key):
+                return False
             
-            # Trigger delivery report callbacks
-            self.producer.poll(0)
+            if not self.pipelined:
+                # Trigger delivery report callbacks
+                self.producer.poll(0)
             
-            logger.debug(f"Sent transaction {key} to topic {topic}")
+            logger.debug(f"Sent transaction {transaction.get('transaction_id')} to topic {topic} (key {key!r})")
             return True
             
         except Exception as e:
             logger.error(f"Error sending transaction: {e}")
             return False
     
+    def send_raw(self, topic: str, value: bytes, key: bytes) -> bool:
+        """Send an already-encoded message, e.g. one read back from a recording"""
+        if self.pipelined:
+            self.wait_for_capacity()
+        if not self._produce(topic, value, key):
+            return False
+        if not self.pipelined:
+            self.producer.poll(0)
+        return True
+
+    def _stamp_generated(self, batch):
+        """Use ``batch.generated_ns`` for the generation header of the messages sent next"""
+        generated_ns = batch.generated_ns if self.latency_headers else None
+        self._generated_header = (GENERATED_HEADER, encode_ns(generated_ns)) if generated_ns is not None else None
+
+    def send_encoded(self, batch) -> int:
+        """Send an ``EncodedBatch`` of already-serialized (topic, value, key) messages"""
+        successful_sends = 0
+        self._stamp_generated(batch)
+        try:
+            for topic, value, key in batch.messages:
+                if self.pipelined:
+                    self.wait_for_capacity()
+                if self._produce(topic, value, key):
+                    successful_sends += 1
+        finally:
+            self._generated_header = None
+
+        if self.pipelined:
+            self.producer.poll(0)
+        else:
+            self._flush_batch()
+        return successful_sends
+
+    def _flush_batch(self):
+        """Wait for a non-pipelined batch to be delivered, unless it would only wait on a down broker"""
+        if self.spill is not None and self.spill.broker_down:
+            self.producer.poll(0)
+        else:
+            self.producer.flush(timeout=10)
+
+    def send_blast(self, batch) -> int:
+        """Send an ``EncodedBatch`` with accounting per batch instead of per message.
+
+        Meant for blast mode, where the producer is created with
+        ``delivery.report.only.error`` so successful deliveries never call
+        back into Python. Acknowledgment metrics and the partition report are
+        not kept; delivered counts are inferred at checkpoint.
+        """
+        produce = self.producer.produce
+        report = self._blast_report
+        dropped = []
+        for topic, value, key in batch.messages:
+            try:
+                produce(topic, value, key, callback=report)
+            except BufferError:
+                # Local queue is full: serve reports to make room and retry
+                deadline = time.monotonic() + self.buffer_retry_timeout
+                while True:
+                    self._metrics_for(topic).retries.inc()
+                    self.producer.poll(0.05)
+                    try:
+                        produce(topic, value, key, callback=report)
+                        break
+                    except BufferError:
+                        if time.monotonic() >= deadline:
+                            logger.error(f"Local producer queue still full after {self.buffer_retry_timeout}s, "
+                                         f"dropping message for topic {topic}")
+                            dropped.append(topic)
+                            break
+        
+        sent = len(batch) - len(dropped)
+        self.blast_sent += sent
+        counts = Counter(map(itemgetter(0), batch.messages))
+        counts.subtract(dropped)
+        sizes: Dict[str, int] = {}
+        for topic, value, _ in batch.messages:
+            sizes[topic] = sizes.get(topic, 0) + len(value)
+        for topic, count in counts.items():
+            metrics = self._metrics_for(topic)
+            metrics.produced.inc(count)
+            metrics.bytes.inc(sizes[topic])
+        self.producer.poll(0)
+        return sent
+
     def send_transactions_batch(self, transactions: List[Dict[str, Any]]) -> int:
         """Send a batch of transactions"""
         successful_sends = 0
         
         for transaction in transactions:
+            if self.pipelined:
+                self.wait_for_capacity()
             if self.send_transaction(transaction):
                 successful_sends += 1
         
-        # Flush to ensure all messages are sent
-        self.producer.flush(timeout=10)
-        
-        logger.info(f"Successfully sent {successful_sends}/{len(transactions)} transactions")
+        if self.pipelined:
+            # Serve delivery reports without waiting; flushing happens on checkpoint/close
+            self.producer.poll(0)
+            logger.debug(f"Queued {successful_sends}/{len(transactions)} transactions "
+                        f"(in flight: {self.in_flight}, queue depth: {self.queue_depth()})")
+        else:
+            # Flush to ensure all messages are sent
+            self._flush_batch()
+            logger.info(f"Successfully sent {successful_sends}/{len(transactions)} transactions")
         return successful_sends
     
+    def send_batch(self, batch) -> int:
+        """Send a columnar ``TransactionBatch``, encoding and keying it a column at a time"""
+        values = self.serializer.encode_rows(batch.rows())
+        keys = self.key_strategy.batch_keys(batch)
+        topics = _TYPE_TOPICS
+        messages = [(topics[code], value, key) for code, value, key in zip(batch.type_code.tolist(), values, keys)]
+        return self.send_encoded(EncodedBatch(messages, batch.generated_ns))
+    
     def close(self):
         """Close the producer connection"""
         try:
-            if self.producer:
-                self.producer.flush(timeout=10)
-                logger.info("Kafka producer connection closed")
+            if self.producer is not None:
+                if self.spill is not None:
+                    self.spill.stop()
+                self.checkpoint(timeout=10)
+                if self.spill is not None:
+                    self._spill_undelivered()
+                    self.spill.close()
+                    logger.info(f"Spill journal: {self.spill.spilled} spilled, {self.spill.drained} replayed, "
+                                f"{self.spill.dropped} dropped")
+                logger.info(f"Kafka producer connection closed "
+                            f"(delivered: {self.delivered}, failed: {self.failed})")
+                for line in self.partition_report_lines():
+                    logger.info(f"Partition load - {line}")
+                if self.latency is not None:
+                    for line in self.latency.summary_lines():
+                        logger.info(f"Latency - {line}")
+                # Sinks hold files or sockets open; confluent_kafka's Producer has nothing to close
+                if hasattr(self.producer, 'close'):
+                    self.producer.close()
         except Exception as e:
             logger.error(f"Error closing producer: {e}")
     
+    def _spill_undelivered(self):
+        """Move messages still queued in librdkafka to the journal before shutting down"""
+        if len(self.producer) and hasattr(self.producer, 'purge'):
+            # Purged messages fail their delivery reports, which spills them
+            self.producer.purge()
+            self.producer.flush(timeout=1)
+
     def __enter__(self):
         return self
     
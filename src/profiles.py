@@ -0,0 +1,160 @@
+"""
+Named producer tuning profiles and a harness to measure them
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+from confluent_kafka import Producer
+from .config import config
+
+# Settings shared by every profile
+BASE_PRODUCER_CONFIG: Dict[str, Any] = {
+    'client.id': 'vpbank-transaction-simulator',
+    'retries': 3,
+    'retry.backoff.ms': 100,
+}
+
+# librdkafka overrides per profile
+PRODUCER_PROFILES: Dict[str, Dict[str, Any]] = {
+    # The original hard-coded settings
+    'default': {
+        'acks': 'all',
+        'linger.ms': 1,
+        'batch.size': 16384,
+        'compression.type': 'none',
+    },
+    # Send as soon as possible, wait for the leader only
+    'latency': {
+        'acks': 1,
+        'linger.ms': 0,
+        'batch.size': 16384,
+        'compression.type': 'none',
+        'enable.idempotence': False,
+        'max.in.flight.requests.per.connection': 5,
+    },
+    # Larger, compressed batches with more requests in flight
+    'throughput': {
+        'acks': 1,
+        'linger.ms': 20,
+        'batch.size': 262144,
+        'compression.type': 'lz4',
+        'enable.idempotence': False,
+        'max.in.flight.requests.per.connection': 10,
+    },
+    # No loss or duplicates: idempotence requires acks=all and at most 5 in flight
+    'durable-idempotent': {
+        'acks': 'all',
+        'linger.ms': 5,
+        'batch.size': 65536,
+        'compression.type': 'zstd',
+        'enable.idempotence': True,
+        'max.in.flight.requests.per.connection': 5,
+    },
+    # Maximum batching and a deep local queue for offline loads
+    'bulk-backfill': {
+        'acks': 1,
+        'linger.ms': 100,
+        'batch.size': 1048576,
+        'compression.type': 'zstd',
+        'enable.idempotence': False,
+        'max.in.flight.requests.per.connection': 20,
+        'queue.buffering.max.messages': 1000000,
+        'queue.buffering.max.kbytes': 2097152,
+    },
+}
+
+def build_producer_config(profile: str = 'default', bootstrap_servers: Optional[str] = None) -> Dict[str, Any]:
+    """Return the librdkafka configuration for a named profile"""
+    if profile not in PRODUCER_PROFILES:
+        raise ValueError(f"Unknown producer profile '{profile}', expected one of {sorted(PRODUCER_PROFILES)}")
+    producer_config = {'bootstrap.servers': bootstrap_servers or config.kafka.bootstrap_servers}
+    producer_config.update(BASE_PRODUCER_CONFIG)
+    producer_config.update(PRODUCER_PROFILES[profile])
+    return producer_config
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def measure_profile(profile: str, payloads: List[bytes], topic: str = 'IBFT',
+                    bootstrap_servers: Optional[str] = None, mock_brokers: int = 3) -> Dict[str, Any]:
+    """Produce ``payloads`` with a profile and measure throughput and delivery latency.
+
+    Unless ``bootstrap_servers`` is given, messages go to librdkafka's built-in
+    mock cluster, a local broker stand-in that needs no running Kafka.
+    """
+    producer_config = build_producer_config(profile, bootstrap_servers)
+    if bootstrap_servers is None:
+        producer_config.pop('bootstrap.servers')
+        producer_config['test.mock.num.brokers'] = mock_brokers
+    producer = Producer(producer_config)
+
+    latencies: List[float] = []
+    errors = 0
+
+    def on_delivery(err, msg):
+        nonlocal errors
+        if err is not None:
+            errors += 1
+        else:
+            latencies.append(msg.latency())
+
+    # Warm up metadata so connection setup is not measured
+    producer.produce(topic, value=payloads[0], on_delivery=lambda err, msg: None)
+    producer.flush(10)
+
+    start = time.perf_counter()
+    for payload in payloads:
+        while True:
+            try:
+                producer.produce(topic, value=payload, on_delivery=on_delivery)
+                break
+            except BufferError:
+                producer.poll(0.01)
+    remaining = producer.flush(60)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    delivered = len(latencies)
+    total_bytes = sum(len(p) for p in payloads)
+    return {
+        "profile": profile,
+        "messages": len(payloads),
+        "delivered": delivered,
+        "failed": errors + remaining,
+        "elapsed_s": elapsed,
+        "messages_per_sec": delivered / elapsed,
+        "bytes_per_sec": total_bytes / elapsed,
+        "latency_p50_ms": _percentile(latencies, 0.50) * 1000,
+        "latency_p99_ms": _percentile(latencies, 0.99) * 1000,
+        "latency_max_ms": (latencies[-1] * 1000) if latencies else 0.0,
+    }
+
+def main():
+    """Measure every producer profile against a local broker stand-in"""
+    from .data_generator import TransactionGenerator
+    from .serializers import create_serializer
+
+    parser = argparse.ArgumentParser(description="Measure producer tuning profiles")
+    parser.add_argument("--messages", type=int, default=100000, help="messages to produce per profile")
+    parser.add_argument("--profiles", default=",".join(PRODUCER_PROFILES), help="comma-separated profile names")
+    parser.add_argument("--serializer", default=config.kafka.serializer, help="payload serializer")
+    parser.add_argument("--bootstrap-servers", default=None,
+                        help="measure against a real cluster instead of the built-in mock brokers")
+    args = parser.parse_args()
+
+    serializer = create_serializer(args.serializer, config.kafka.schema_registry_path)
+    payloads = serializer.encode_rows(TransactionGenerator().generate_batch(args.messages).rows())
+
+    print(f"{'profile':<20} {'msgs/s':>10} {'MB/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7}")
+    for profile in args.profiles.split(','):
+        result = measure_profile(profile.strip(), payloads, bootstrap_servers=args.bootstrap_servers)
+        print(f"{result['profile']:<20} {result['messages_per_sec']:>10,.0f} "
+              f"{result['bytes_per_sec'] / 1e6:>8.2f} {result['latency_p50_ms']:>8.2f} "
+              f"{result['latency_p99_ms']:>8.2f} {result['failed']:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Record generated traffic to segment files and replay it to Kafka
+"""
+
+import argparse
+import logging
+import time
+from typing import Dict, Optional
+from .config import config
+from .data_generator import TransactionGenerator, TransactionBatch, TRANSACTION_TYPES
+from .keys import key_strategy_from_config
+from .segments import SegmentReader, SegmentWriter
+from .serializers import Serializer, create_serializer
+
+logger = logging.getLogger(__name__)
+
+class TransactionRecorder:
+    """Writes encoded transactions to an append-only segment log.
+
+    Payloads are stored exactly as they would be produced, together with the
+    destination topic, message key and the transaction's event timestamp.
+    """
+
+    def __init__(self, directory: str, serializer: Optional[Serializer] = None,
+                 segment_bytes: int = 64 * 1024 * 1024):
+        from .producer import TOPIC_MAPPING
+
+        self.serializer = serializer or create_serializer(config.kafka.serializer, config.kafka.schema_registry_path)
+        self.writer = SegmentWriter(directory, segment_bytes=segment_bytes)
+        self._topics = [TOPIC_MAPPING[transaction_type] for transaction_type in TRANSACTION_TYPES]
+        self.key_strategy = key_strategy_from_config()
+        self.recorded = 0
+
+    def record_batch(self, batch: TransactionBatch) -> int:
+        """Append every transaction in a batch, returning how many were written"""
+        payloads = self.serializer.encode_rows(batch.rows())
+        topics = self._topics
+        append = self.writer.append
+        keys = self.key_strategy.batch_keys(batch)
+        for type_code, key, timestamp_us, payload in zip(
+                batch.type_code.tolist(), keys, batch.timestamp_us.tolist(), payloads):
+            append(topics[type_code], key, payload, timestamp_us)
+        self.recorded += len(payloads)
+        return len(payloads)
+
+    def close(self):
+        self.writer.close()
+
+class TransactionReplayer:
+    """Streams a recorded segment log to Kafka.
+
+    With ``speed`` > 0, records keep their original inter-arrival gaps (taken
+    from the recorded event timestamps) divided by ``speed``, so ``speed=1`` is
+    real time and ``speed=10`` is ten times faster. ``speed=0`` drops the gaps
+    and replays as fast as the producer accepts messages.
+    """
+
+    def __init__(self, directory: str, producer, speed: float = 1.0, spin_threshold: float = 0.0005):
+        self.reader = SegmentReader(directory)
+        self.producer = producer
+        self.speed = speed
+        self.spin_threshold = spin_threshold
+        self.replayed = 0
+
+    def _wait_until(self, deadline: float):
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_threshold:
+            time.sleep(remaining - self.spin_threshold)
+        while time.perf_counter() < deadline:
+            pass
+
+    def run(self, start_offset: int = 0, limit: Optional[int] = None,
+            progress_interval: float = 10.0) -> Dict[str, float]:
+        """Replay records from ``start_offset``; returns a summary of the run"""
+        started = time.perf_counter()
+        last_progress = started
+        first_event_us = None
+        for record in self.reader.read(start_offset):
+            if limit is not None and self.replayed >= limit:
+                break
+            if self.speed > 0:
+                if first_event_us is None:
+                    first_event_us = record.timestamp_us
+                due = started + (record.timestamp_us - first_event_us) / 1e6 / self.speed
+                if due > time.perf_counter():
+                    self.producer.poll(0)
+                    self._wait_until(due)
+            self.producer.send_raw(record.topic, bytes(record.value), bytes(record.key))
+            self.replayed += 1
+
+            now = time.perf_counter()
+            if now - last_progress >= progress_interval:
+                logger.info(f"Replayed {self.replayed} records ({self.replayed / (now - started):,.0f}/s), "
+                            f"offset {record.offset}")
+                last_progress = now
+        self.producer.checkpoint()
+        elapsed = time.perf_counter() - started
+        return {"replayed": self.replayed, "elapsed_s": elapsed,
+                "records_per_sec": self.replayed / elapsed if elapsed else 0.0}
+
+def main():
+    """Record generated traffic or replay a recording"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Record and replay transaction traffic")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="generate transactions into a segment log")
+    record.add_argument("--dir", required=True, help="recording directory")
+    record.add_argument("--count", type=int, required=True, help="transactions to record")
+    record.add_argument("--batch-size", type=int, default=10000, help="transactions generated per batch")
+    record.add_argument("--seed", type=int, default=None, help="generator seed")
+    record.add_argument("--segment-mb", type=int, default=64, help="segment size in MB")
+
+    replay = subparsers.add_parser("replay", help="stream a segment log to Kafka")
+    replay.add_argument("--dir", required=True, help="recording directory")
+    replay.add_argument("--speed", type=float, default=1.0,
+                        help="time-scale of the original gaps (1 = real time, 10 = 10x); 0 = max speed")
+    replay.add_argument("--max-speed", action="store_true", help="ignore the original gaps (same as --speed 0)")
+    replay.add_argument("--start-offset", type=int, default=0, help="first record offset to replay")
+    replay.add_argument("--limit", type=int, default=None, help="maximum records to replay")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        generator = TransactionGenerator(seed=args.seed)
+        recorder = TransactionRecorder(args.dir, segment_bytes=args.segment_mb * 1024 * 1024)
+        remaining = args.count
+        try:
+            while remaining > 0:
+                remaining -= recorder.record_batch(generator.generate_batch(min(args.batch_size, remaining)))
+        finally:
+            recorder.close()
+            generator.close()
+        logger.info(f"Recorded {recorder.recorded} transactions to {args.dir}")
+    else:
+        from .producer import TransactionProducer
+
+        producer = TransactionProducer()
+        replayer = TransactionReplayer(args.dir, producer, speed=0 if args.max_speed else args.speed)
+        try:
+            summary = replayer.run(args.start_offset, args.limit)
+            logger.info(f"Replayed {summary['replayed']} records in {summary['elapsed_s']:.1f}s "
+                        f"({summary['records_per_sec']:,.0f}/s)")
+        finally:
+            producer.close()
+
+if __name__ == "__main__":
+    main()
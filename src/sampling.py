@@ -0,0 +1,124 @@
+"""
+Weighted activity distributions sampled with the alias method
+"""
+
+from typing import Optional, Sequence
+import numpy as np
+
+# Below this many pending columns the alias table is finished with a scalar loop
+_SCALAR_TAIL = 4096
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) per draw.
+
+    Each of the ``n`` columns holds its own entity with probability
+    ``prob[i]`` and ``alias[i]`` otherwise, so a draw is one uniform column
+    pick plus one biased coin flip regardless of how skewed the weights are.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0:
+            raise ValueError("Alias table needs a non-empty 1-D weight vector")
+        if np.any(weights < 0) or not np.isfinite(weights).all() or weights.sum() <= 0:
+            raise ValueError("Alias table weights must be finite, non-negative and not all zero")
+        n = len(weights)
+        self.size = n
+        self.prob = weights * (n / weights.sum())
+        self.alias = np.arange(n, dtype=np.int64)
+        self._build()
+
+    def _build(self):
+        prob, alias = self.prob, self.alias
+        small = np.flatnonzero(prob < 1.0)
+        large = np.flatnonzero(prob >= 1.0)
+
+        # Vectorized rounds: every pending small column borrows from the large
+        # column whose surplus interval contains the start of its deficit.
+        # Larges pushed below 1 become the next round's small columns.
+        while len(small) > _SCALAR_TAIL and len(large):
+            deficit = 1.0 - prob[small]
+            surplus_end = np.cumsum(prob[large] - 1.0)
+            starts = np.cumsum(deficit) - deficit
+            owner = np.minimum(np.searchsorted(surplus_end, starts, side='right'), len(large) - 1)
+            alias[small] = large[owner]
+            taken = np.bincount(owner, weights=deficit, minlength=len(large))
+            prob[large] -= taken
+            exhausted = prob[large] < 1.0
+            small = large[exhausted]
+            large = large[~exhausted]
+
+        # Scalar Vose loop for the remainder
+        small_list = small.tolist()
+        large_list = large.tolist()
+        while small_list and large_list:
+            s = small_list.pop()
+            l = large_list[-1]
+            alias[s] = l
+            prob[l] -= 1.0 - prob[s]
+            if prob[l] < 1.0:
+                small_list.append(large_list.pop())
+        # Whatever is left is 1 up to rounding error
+        prob[small_list] = 1.0
+        prob[large_list] = 1.0
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw ``size`` entity indices"""
+        column = rng.integers(0, self.size, size=size)
+        return np.where(rng.random(size) < self.prob[column], column, self.alias[column])
+
+    def sample_words(self, words: np.ndarray) -> np.ndarray:
+        """Draw one entity index per uint64 random word (low half picks, high half flips)"""
+        column = (((words & np.uint64(0xFFFFFFFF)) * np.uint64(self.size)) >> np.uint64(32)).astype(np.int64)
+        coin = (words >> np.uint64(32)).astype(np.float64) * (1.0 / (1 << 32))
+        return np.where(coin < self.prob[column], column, self.alias[column])
+
+    def probabilities(self) -> np.ndarray:
+        """Per-entity probabilities implied by the table (for checks and reports)"""
+        result = self.prob.copy()
+        np.add.at(result, self.alias, 1.0 - self.prob)
+        return result / self.size
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    """Weights of a Zipf (power-law) distribution over ranks 1..n"""
+    return np.arange(1, n + 1, dtype=np.float64) ** -exponent
+
+def hotset_weights(n: int, fraction: float, share: float) -> np.ndarray:
+    """Weights where the first ``fraction`` of entities get ``share`` of the activity"""
+    hot = min(n, max(1, int(round(n * fraction))))
+    if hot == n:
+        return np.ones(n)
+    weights = np.full(n, (1.0 - share) / (n - hot))
+    weights[:hot] = share / hot
+    return weights
+
+def parse_distribution(spec: str, n: int) -> Optional[AliasTable]:
+    """Build an alias table for ``n`` entities from a distribution spec.
+
+    Specs: ``uniform`` (returns None so callers keep their uniform draws),
+    ``zipf:1.1``, ``hotset:0.01,0.8`` (1% of entities get 80% of activity)
+    or ``weights:5,3,2`` (one weight per entity).
+    """
+    spec = (spec or 'uniform').strip()
+    kind, _, args = spec.partition(':')
+    kind = kind.strip().lower()
+    try:
+        values = [float(value) for value in args.split(',')] if args.strip() else []
+    except ValueError:
+        raise ValueError(f"Invalid distribution arguments in '{spec}'")
+
+    if kind == 'uniform':
+        return None
+    if kind == 'zipf':
+        if len(values) != 1 or values[0] <= 0:
+            raise ValueError(f"Zipf needs one positive exponent: '{spec}'")
+        return AliasTable(zipf_weights(n, values[0]))
+    if kind == 'hotset':
+        if len(values) != 2 or not 0 < values[0] <= 1 or not 0 <= values[1] <= 1:
+            raise ValueError(f"Hot set needs a fraction and a share in (0, 1]: '{spec}'")
+        return AliasTable(hotset_weights(n, values[0], values[1]))
+    if kind == 'weights':
+        if len(values) != n:
+            raise ValueError(f"Expected {n} weights, got {len(values)}: '{spec}'")
+        return AliasTable(values)
+    raise ValueError(f"Unknown distribution '{kind}' (expected uniform, zipf, hotset or weights)")
@@ -0,0 +1,243 @@
+"""
+Target-rate pacing for the transaction simulator
+"""
+
+import math
+import time
+from typing import Dict, List, Tuple
+
+class RateProfile:
+    """Target send rate (messages/second) as a function of elapsed seconds"""
+
+    def rate(self, elapsed: float) -> float:
+        raise NotImplementedError
+
+class ConstantRate(RateProfile):
+    """Fixed target rate"""
+
+    def __init__(self, rate: float):
+        self.target = rate
+
+    def rate(self, elapsed: float) -> float:
+        return self.target
+
+    def __repr__(self):
+        return f"ConstantRate({self.target})"
+
+class StepRamp(RateProfile):
+    """Stair-step rate: each step holds a rate for a duration.
+
+    After the last step the final rate is held, unless ``repeat`` is set in
+    which case the steps start over.
+    """
+
+    def __init__(self, steps: List[Tuple[float, float]], repeat: bool = False):
+        if not steps:
+            raise ValueError("StepRamp needs at least one (rate, duration) step")
+        self.steps = steps
+        self.repeat = repeat
+        self.total = sum(duration for _, duration in steps)
+
+    def rate(self, elapsed: float) -> float:
+        if self.repeat and self.total > 0:
+            elapsed %= self.total
+        for rate, duration in self.steps:
+            if elapsed < duration:
+                return rate
+            elapsed -= duration
+        return self.steps[-1][0]
+
+    def __repr__(self):
+        return f"StepRamp({self.steps}, repeat={self.repeat})"
+
+class SinusoidalRate(RateProfile):
+    """Day/night curve oscillating between ``trough`` and ``peak``.
+
+    The curve reaches ``peak`` ``peak_at`` seconds into each ``period``.
+    """
+
+    def __init__(self, peak: float, trough: float, period: float = 86400.0, peak_at: float = 0.0):
+        self.peak = peak
+        self.trough = trough
+        self.period = period
+        self.peak_at = peak_at
+
+    def rate(self, elapsed: float) -> float:
+        phase = 2 * math.pi * (elapsed - self.peak_at) / self.period
+        return self.trough + (self.peak - self.trough) * (1 + math.cos(phase)) / 2
+
+    def __repr__(self):
+        return (f"SinusoidalRate(peak={self.peak}, trough={self.trough}, "
+                f"period={self.period}, peak_at={self.peak_at})")
+
+class BurstRate(RateProfile):
+    """Periodic burst spikes layered over a base profile"""
+
+    def __init__(self, base: RateProfile, rate: float, every: float, duration: float, offset: float = 0.0):
+        self.base = base
+        self.burst_rate = rate
+        self.every = every
+        self.duration = duration
+        self.offset = offset
+
+    def rate(self, elapsed: float) -> float:
+        if elapsed >= self.offset and (elapsed - self.offset) % self.every < self.duration:
+            return max(self.burst_rate, self.base.rate(elapsed))
+        return self.base.rate(elapsed)
+
+    def __repr__(self):
+        return (f"BurstRate({self.base!r}, rate={self.burst_rate}, every={self.every}, "
+                f"duration={self.duration}, offset={self.offset})")
+
+def _parse_params(text: str) -> Dict[str, float]:
+    params = {}
+    for item in filter(None, text.split(',')):
+        name, _, value = item.partition('=')
+        if not value:
+            raise ValueError(f"Expected name=value, got '{item}'")
+        params[name.strip()] = float(value)
+    return params
+
+def parse_rate_profile(spec: str) -> RateProfile:
+    """Build a rate profile from a config string.
+
+    Supported forms, optionally followed by ``+burst:...`` modifiers::
+
+        constant:20000
+        steps:1000@60,5000@60,20000@120        (rate@seconds, add ",repeat" to loop)
+        diurnal:peak=50000,trough=5000,period=86400,peak_at=50400
+        constant:5000+burst:rate=50000,every=300,duration=5
+    """
+    base_spec, *modifiers = spec.strip().split('+')
+    kind, _, args = base_spec.partition(':')
+    kind = kind.strip().lower()
+
+    if kind == 'constant':
+        profile: RateProfile = ConstantRate(float(args))
+    elif kind == 'steps':
+        items = [item.strip() for item in args.split(',') if item.strip()]
+        repeat = 'repeat' in items
+        steps = []
+        for item in items:
+            if item == 'repeat':
+                continue
+            rate, _, duration = item.partition('@')
+            steps.append((float(rate), float(duration)))
+        profile = StepRamp(steps, repeat=repeat)
+    elif kind == 'diurnal':
+        profile = SinusoidalRate(**_parse_params(args))
+    else:
+        raise ValueError(f"Unknown rate profile '{kind}' in '{spec}'")
+
+    for modifier in modifiers:
+        mod_kind, _, mod_args = modifier.partition(':')
+        if mod_kind.strip().lower() != 'burst':
+            raise ValueError(f"Unknown rate profile modifier '{mod_kind}' in '{spec}'")
+        profile = BurstRate(profile, **_parse_params(mod_args))
+
+    return profile
+
+class RateScheduler:
+    """Leaky-bucket pacer that spreads sends evenly at a target rate.
+
+    ``acquire(n)`` blocks until the next ``n`` messages are due and returns the
+    time they were scheduled for. Each grant pushes the next due time out by
+    ``n / rate``, so sending in small chunks (see ``chunk_size``) keeps the
+    stream smooth instead of clumped. The bucket holds at most ``burst``
+    seconds of credit, so a stalled sender catches up briefly but does not
+    flood the broker. Waits sleep coarsely and then spin for the last
+    ``spin_threshold`` seconds for sub-millisecond accuracy.
+    """
+
+    def __init__(self, profile: RateProfile, resolution: float = 0.001,
+                 burst: float = 0.05, spin_threshold: float = 0.0005, clock=time.perf_counter):
+        self.profile = profile
+        self.resolution = resolution
+        self.burst = burst
+        self.spin_threshold = spin_threshold
+        self.clock = clock
+        self.start_time = None
+        self._next_due = 0.0
+        self._last_check = 0.0
+        self.sent = 0
+        self.expected = 0.0
+        self._window_start = 0.0
+        self._window_sent = 0
+
+    def start(self):
+        """Start (or restart) the schedule at the current time"""
+        now = self.clock()
+        self.start_time = now
+        self._next_due = now
+        self._last_check = now
+        self._window_start = now
+        self._window_sent = 0
+        self.sent = 0
+        self.expected = 0.0
+
+    def elapsed(self) -> float:
+        """Seconds since the schedule started"""
+        return self.clock() - self.start_time
+
+    def target_rate(self) -> float:
+        """Current target rate in messages/second"""
+        return self.profile.rate(self.elapsed())
+
+    def chunk_size(self, limit: int) -> int:
+        """Messages to send per ``acquire`` so one chunk spans ``resolution`` seconds"""
+        return max(1, min(limit, int(self.target_rate() * self.resolution)))
+
+    def _sleep_until(self, deadline: float):
+        remaining = deadline - self.clock()
+        if remaining > self.spin_threshold:
+            time.sleep(remaining - self.spin_threshold)
+        while self.clock() < deadline:
+            pass
+
+    def acquire(self, count: int = 1) -> float:
+        """Block until ``count`` messages are due; returns their scheduled time"""
+        if self.start_time is None:
+            self.start()
+        now = self.clock()
+        # Cap accumulated credit so a stalled sender does not burst unboundedly
+        if self._next_due < now - self.burst:
+            self._next_due = now - self.burst
+
+        while True:
+            due = self._next_due
+            if due > now:
+                self._sleep_until(due)
+            rate = self.profile.rate(due - self.start_time)
+            if rate > 0:
+                break
+            # Zero target: re-check the profile at the pacing resolution
+            self._next_due = due + self.resolution
+            now = self.clock()
+        self._next_due = due + count / rate
+
+        # Integrate the target so drift covers varying profiles
+        now = self.clock()
+        self.expected += rate * (now - self._last_check)
+        self._last_check = now
+        self.sent += count
+        self._window_sent += count
+        return due
+
+    def report(self, reset_window: bool = True) -> Dict[str, float]:
+        """Achieved vs target rate since the last report and cumulative drift"""
+        now = self.clock()
+        window = max(now - self._window_start, 1e-9)
+        achieved = self._window_sent / window
+        target = self.profile.rate(now - self.start_time) if self.start_time is not None else 0.0
+        report = {
+            "target_rate": target,
+            "achieved_rate": achieved,
+            "rate_drift_pct": (achieved - target) / target * 100 if target else 0.0,
+            "sent": self.sent,
+            "expected": self.expected,
+            "cumulative_drift": self.sent - self.expected,
+        }
+        if reset_window:
+            self._window_start = now
+            self._window_sent = 0
+        return report
@@ -0,0 +1,199 @@
+"""
+Append-only segmented message logs with a sparse offset index
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Frame header: crc32, value length, event timestamp (us), topic length, key length
+FRAME_HEADER = struct.Struct('<IIqBH')
+# Index entry: record offset within the log, byte position within the segment
+INDEX_ENTRY = struct.Struct('<QQ')
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx'
+
+class LogRecord(NamedTuple):
+    """A message stored in a segment log"""
+    offset: int
+    timestamp_us: int
+    topic: str
+    key: bytes
+    value: bytes
+
+class CorruptSegmentError(Exception):
+    """Raised when a frame fails its checksum"""
+
+def _segment_name(base_offset: int) -> str:
+    return f"{base_offset:020d}"
+
+def encode_frame(topic: str, key: Optional[bytes], value: bytes, timestamp_us: int = 0) -> bytes:
+    """A checksummed record frame: header, topic, key, then value"""
+    topic_bytes = topic.encode('utf-8')
+    key = key or b''
+    body = FRAME_HEADER.pack(0, len(value), timestamp_us, len(topic_bytes), len(key))[4:] + topic_bytes + key
+    crc = zlib.crc32(value, zlib.crc32(body))
+    return struct.pack('<I', crc) + body + value
+
+def read_frames(stream, verify: bool = True) -> Iterator[LogRecord]:
+    """Yield records from a binary stream of frames, e.g. a socket's ``makefile('rb')``"""
+    offset = 0
+    while True:
+        header = stream.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            return
+        crc, value_len, timestamp_us, topic_len, key_len = FRAME_HEADER.unpack(header)
+        rest = stream.read(topic_len + key_len + value_len)
+        if len(rest) < topic_len + key_len + value_len:
+            return
+        if verify and zlib.crc32(rest, zlib.crc32(header[4:])) != crc:
+            raise CorruptSegmentError(f"Checksum mismatch at offset {offset}")
+        yield LogRecord(offset, timestamp_us, rest[:topic_len].decode('utf-8'),
+                        rest[topic_len:topic_len + key_len], rest[topic_len + key_len:])
+        offset += 1
+
+def list_segments(directory: str) -> List[int]:
+    """Base offsets of the segments in a log directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(directory)
+                  if name.endswith(SEGMENT_SUFFIX))
+
+class SegmentWriter:
+    """Appends framed records to rolling segment files.
+
+    A new segment starts once the current one reaches ``segment_bytes``. Every
+    ``index_interval`` records the writer appends an entry to the segment's
+    index file so readers can seek without scanning the whole segment.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, index_interval: int = 4096):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_interval = index_interval
+        os.makedirs(directory, exist_ok=True)
+
+        segments = list_segments(directory)
+        self.next_offset = 0
+        if segments:
+            # Resume after the last complete record of the newest segment
+            last = segments[-1]
+            records = list(SegmentReader(directory).read_segment(last))
+            self.next_offset = records[-1].offset + 1 if records else last
+        self._segment_file = None
+        self._index_file = None
+        self._segment_base = None
+        self._segment_size = 0
+        self._records_in_segment = 0
+
+    def _roll(self):
+        self._close_segment()
+        self._segment_base = self.next_offset
+        name = os.path.join(self.directory, _segment_name(self._segment_base))
+        self._segment_file = open(name + SEGMENT_SUFFIX, 'ab')
+        self._index_file = open(name + INDEX_SUFFIX, 'ab')
+        self._segment_size = self._segment_file.tell()
+        self._records_in_segment = 0
+
+    def append(self, topic: str, key: Optional[bytes], value: bytes, timestamp_us: int = 0) -> int:
+        """Append a record and return its offset"""
+        if self._segment_file is None or self._segment_size >= self.segment_bytes:
+            self._roll()
+        if self._records_in_segment % self.index_interval == 0:
+            self._index_file.write(INDEX_ENTRY.pack(self.next_offset, self._segment_size))
+        frame = encode_frame(topic, key, value, timestamp_us)
+        self._segment_file.write(frame)
+        self._segment_size += len(frame)
+        self._records_in_segment += 1
+        offset = self.next_offset
+        self.next_offset += 1
+        return offset
+
+    def roll(self):
+        """Close the current segment; the next append starts a new one"""
+        self.flush()
+        self._close_segment()
+
+    def flush(self, fsync: bool = False):
+        """Flush buffered frames to the OS (and to disk with ``fsync``)"""
+        for f in (self._segment_file, self._index_file):
+            if f is not None:
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+    def _close_segment(self):
+        for f in (self._segment_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._segment_file = None
+        self._index_file = None
+
+    def close(self):
+        self.flush()
+        self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class SegmentReader:
+    """Reads records from segment files through memory maps"""
+
+    def __init__(self, directory: str, verify: bool = True):
+        self.directory = directory
+        self.verify = verify
+
+    def _read_index(self, base_offset: int) -> List[Tuple[int, int]]:
+        path = os.path.join(self.directory, _segment_name(base_offset) + INDEX_SUFFIX)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return [INDEX_ENTRY.unpack_from(data, pos) for pos in range(0, usable, INDEX_ENTRY.size)]
+
+    def read_segment(self, base_offset: int, start_offset: Optional[int] = None) -> Iterator[LogRecord]:
+        """Yield records of one segment, optionally starting at ``start_offset``"""
+        path = os.path.join(self.directory, _segment_name(base_offset) + SEGMENT_SUFFIX)
+        if os.path.getsize(path) == 0:
+            return
+        offset, position = base_offset, 0
+        if start_offset is not None and start_offset > base_offset:
+            index = self._read_index(base_offset)
+            slot = bisect.bisect_right(index, (start_offset, float('inf'))) - 1
+            if slot >= 0:
+                offset, position = index[slot]
+
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = len(data)
+            header_size = FRAME_HEADER.size
+            while position + header_size <= end:
+                crc, value_len, timestamp_us, topic_len, key_len = FRAME_HEADER.unpack_from(data, position)
+                frame_end = position + header_size + topic_len + key_len + value_len
+                if frame_end > end:
+                    break  # Torn write at the tail
+                if self.verify and zlib.crc32(data[position + 4:frame_end]) != crc:
+                    raise CorruptSegmentError(f"Checksum mismatch at offset {offset} in {path}")
+                if start_offset is None or offset >= start_offset:
+                    cursor = position + header_size
+                    topic = data[cursor:cursor + topic_len].decode('utf-8')
+                    cursor += topic_len
+                    key = data[cursor:cursor + key_len]
+                    cursor += key_len
+                    yield LogRecord(offset, timestamp_us, topic, key, data[cursor:frame_end])
+                position = frame_end
+                offset += 1
+
+    def read(self, start_offset: int = 0) -> Iterator[LogRecord]:
+        """Yield all records from ``start_offset`` onwards across segments"""
+        segments = list_segments(self.directory)
+        first = max(0, bisect.bisect_right(segments, start_offset) - 1)
+        for base_offset in segments[first:]:
+            yield from self.read_segment(base_offset, start_offset)
@@ -0,0 +1,430 @@
+"""
+Pluggable message serializers for transaction payloads
+"""
+
+import argparse
+import json
+import os
+from json.encoder import encode_basestring_ascii
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from .data_generator import TRANSACTION_FIELDS, TransactionView
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+# Confluent wire format: magic byte followed by a big-endian schema ID
+MAGIC_BYTE = 0
+_HEADER = struct.Struct('>bI')
+_DOUBLE = struct.Struct('<d')
+
+# Subject all transaction schemas are registered under
+SCHEMA_SUBJECT = "vpbank.Transaction"
+
+# Field types shared by the Avro and Protobuf schemas; nullable fields may be None
+FIELD_TYPES: Tuple[Tuple[str, str, bool], ...] = (
+    ("transaction_id", "string", False),
+    ("timestamp", "string", False),
+    ("customer_name", "string", False),
+    ("transaction_type", "string", False),
+    ("amount", "double", False),
+    ("currency", "string", False),
+    ("merchant_id", "string", True),
+    ("sender_account", "string", True),
+    ("receiver_account", "string", True),
+    ("wallet_id", "string", True),
+    ("location_lat", "double", True),
+    ("location_long", "double", True),
+    ("ip_address", "string", True),
+    ("user_agent", "string", True),
+)
+
+AVRO_SCHEMA = json.dumps({
+    "type": "record",
+    "name": "Transaction",
+    "namespace": "vpbank",
+    "fields": [
+        {"name": name, "type": ["null", kind], "default": None} if nullable else {"name": name, "type": kind}
+        for name, kind, nullable in FIELD_TYPES
+    ],
+}, separators=(',', ':'))
+
+PROTOBUF_SCHEMA = "\n".join(
+    ['syntax = "proto3";', 'package vpbank;', '', 'message Transaction {'] +
+    [f"  {'optional ' if nullable else ''}{kind} {name} = {number};"
+     for number, (name, kind, nullable) in enumerate(FIELD_TYPES, 1)] +
+    ['}', '']
+)
+
+class LocalSchemaRegistry:
+    """File-backed stand-in for a schema registry.
+
+    Schemas are stored in a JSON file keyed by subject. Registering a schema
+    that already exists under the subject returns its existing ID, so IDs stay
+    stable across runs that share the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {"next_id": 1, "subjects": {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def register(self, subject: str, schema: str, schema_type: str) -> int:
+        """Register a schema under a subject and return its ID"""
+        with self._lock:
+            versions = self._data["subjects"].setdefault(subject, [])
+            for version in versions:
+                if version["schema"] == schema and version["schemaType"] == schema_type:
+                    return version["id"]
+            schema_id = self._data["next_id"]
+            self._data["next_id"] += 1
+            versions.append({
+                "id": schema_id,
+                "version": len(versions) + 1,
+                "schemaType": schema_type,
+                "schema": schema,
+            })
+            self._save()
+            return schema_id
+
+    def get_schema(self, schema_id: int) -> Optional[Dict[str, Any]]:
+        """Look up a registered schema by ID"""
+        for versions in self._data["subjects"].values():
+            for version in versions:
+                if version["id"] == schema_id:
+                    return version
+        return None
+
+class Serializer:
+    """Encodes transactions to message bytes.
+
+    ``encode`` accepts a dict, a ``TransactionView`` or a ``Transaction``
+    record. Records (and views over them) go through ``encode_record``, which
+    backends implement positionally where that avoids building a dict.
+    """
+
+    name = "base"
+
+    def encode(self, transaction: Any) -> bytes:
+        if isinstance(transaction, TransactionView):
+            return self.encode_record(transaction.record)
+        if isinstance(transaction, tuple):
+            return self.encode_record(transaction)
+        return self.encode_mapping(transaction)
+
+    def encode_mapping(self, transaction: Mapping[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def encode_record(self, record: tuple) -> bytes:
+        """Encode a tuple in ``TRANSACTION_FIELDS`` order"""
+        return self.encode_mapping(dict(zip(TRANSACTION_FIELDS, record)))
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def encode_rows(self, rows: Iterable[tuple]) -> List[bytes]:
+        """Encode rows given as tuples in ``TRANSACTION_FIELDS`` order"""
+        encode_record = self.encode_record
+        return [encode_record(row) for row in rows]
+
+    def decode_rows(self, payloads: List[bytes]) -> List[Dict[str, Any]]:
+        """Decode many messages; raises if any of them is malformed"""
+        decode = self.decode
+        return [decode(payload) for payload in payloads]
+
+# Key prefixes matching json.dumps' default separators
+_JSON_PREFIXES = [('{' if index == 0 else ', ') + json.dumps(field) + ': '
+                  for index, field in enumerate(TRANSACTION_FIELDS)]
+
+class JsonSerializer(Serializer):
+    """Standard library JSON.
+
+    Records are written from pre-encoded key prefixes and per-value encoders,
+    producing the same bytes as ``json.dumps`` without an intermediate dict.
+    """
+
+    name = "json"
+
+    def encode_mapping(self, transaction: Mapping[str, Any]) -> bytes:
+        return json.dumps(transaction, default=str).encode('utf-8')
+
+    def encode_record(self, record: tuple) -> bytes:
+        parts = []
+        append = parts.append
+        for prefix, value in zip(_JSON_PREFIXES, record):
+            append(prefix)
+            if value is None:
+                append('null')
+            elif value.__class__ is str:
+                append(encode_basestring_ascii(value))
+            elif value.__class__ is float:
+                append(float.__repr__(value))
+            else:
+                append(json.dumps(value, default=str))
+        append('}')
+        return ''.join(parts).encode('utf-8')
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        return json.loads(payload)
+
+    def decode_rows(self, payloads: List[bytes]) -> List[Dict[str, Any]]:
+        # One parse of a JSON array instead of a call per message
+        return json.loads(b'[' + b','.join(payloads) + b']')
+
+class OrjsonSerializer(Serializer):
+    """orjson, which serializes straight to compact bytes.
+
+    orjson only writes objects from dicts, and building one in C is cheaper
+    than any Python-level template, so records are zipped into a dict here.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The 'orjson' serializer requires the orjson package")
+
+    def encode_mapping(self, transaction: Mapping[str, Any]) -> bytes:
+        return orjson.dumps(transaction, default=str)
+
+    def encode_record(self, record: tuple) -> bytes:
+        return orjson.dumps(dict(zip(TRANSACTION_FIELDS, record)), default=str)
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        return orjson.loads(payload)
+
+class MsgspecSerializer(Serializer):
+    """msgspec JSON encoder, which serializes straight to compact bytes"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("The 'msgspec' serializer requires the msgspec package")
+        self._encoder = msgspec.json.Encoder(enc_hook=str)
+        self._decoder = msgspec.json.Decoder()
+
+    def encode_mapping(self, transaction: Mapping[str, Any]) -> bytes:
+        return self._encoder.encode(transaction)
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        return self._decoder.decode(payload)
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _read_varint(payload: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = payload[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+# Pre-encoded varints for common string lengths
+_VARINTS = [_varint(n) for n in range(4096)]
+_ZIGZAG = [_varint(n << 1) for n in range(4096)]
+
+class AvroSerializer(Serializer):
+    """Avro binary encoding in the Confluent wire format.
+
+    Encoding is done directly from the schema's field list, so no Avro
+    library is needed. Nullable fields are ``["null", type]`` unions.
+    """
+
+    name = "avro"
+
+    def __init__(self, registry: Optional[LocalSchemaRegistry] = None):
+        self.schema_id = registry.register(SCHEMA_SUBJECT, AVRO_SCHEMA, "AVRO") if registry else 0
+        self.header = _HEADER.pack(MAGIC_BYTE, self.schema_id)
+        self._fields = [(name, kind == "string", nullable) for name, kind, nullable in FIELD_TYPES]
+
+    @staticmethod
+    def _string(value: str) -> bytes:
+        data = value.encode('utf-8')
+        size = len(data)
+        return (_ZIGZAG[size] if size < 4096 else _varint(size << 1)) + data
+
+    def encode_record(self, values: Iterable[Any]) -> bytes:
+        parts = [self.header]
+        append = parts.append
+        string = self._string
+        for (_, is_string, nullable), value in zip(self._fields, values):
+            if nullable:
+                if value is None:
+                    append(b'\x00')
+                    continue
+                append(b'\x02')
+            if is_string:
+                append(string(value if isinstance(value, str) else str(value)))
+            else:
+                append(_DOUBLE.pack(value))
+        return b''.join(parts)
+
+    def encode_mapping(self, transaction: Mapping[str, Any]) -> bytes:
+        return self.encode_record([transaction.get(name) for name in TRANSACTION_FIELDS])
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        pos = _HEADER.size
+        transaction = {}
+        for name, is_string, nullable in self._fields:
+            if nullable:
+                branch, pos = _read_varint(payload, pos)
+                if branch == 0:
+                    transaction[name] = None
+                    continue
+            if is_string:
+                size, pos = _read_varint(payload, pos)
+                size >>= 1
+                transaction[name] = payload[pos:pos + size].decode('utf-8')
+                pos += size
+            else:
+                transaction[name] = _DOUBLE.unpack_from(payload, pos)[0]
+                pos += 8
+        return transaction
+
+class ProtobufSerializer(Serializer):
+    """Protobuf (proto3) encoding in the Confluent wire format.
+
+    Messages are written straight to the protobuf wire format from the field
+    list in ``PROTOBUF_SCHEMA``, so no generated classes are needed. ``None``
+    fields are omitted.
+    """
+
+    name = "protobuf"
+
+    def __init__(self, registry: Optional[LocalSchemaRegistry] = None):
+        self.schema_id = registry.register(SCHEMA_SUBJECT, PROTOBUF_SCHEMA, "PROTOBUF") if registry else 0
+        # Message index list [0] (first message in the schema) encodes as a single zero byte
+        self.header = _HEADER.pack(MAGIC_BYTE, self.schema_id) + b'\x00'
+        self._fields = []
+        for number, (name, kind, _) in enumerate(FIELD_TYPES, 1):
+            wire_type = 2 if kind == "string" else 1
+            self._fields.append((name, kind == "string", _varint((number << 3) | wire_type)))
+        self._names = {number: (name, is_string) for number, (name, is_string, _) in enumerate(self._fields, 1)}
+
+    def encode_record(self, values: Iterable[Any]) -> bytes:
+        parts = [self.header]
+        append = parts.append
+        for (_, is_string, tag), value in zip(self._fields, values):
+            if value is None:
+                continue
+            append(tag)
+            if is_string:
+                data = (value if isinstance(value, str) else str(value)).encode('utf-8')
+                size = len(data)
+                append(_VARINTS[size] if size < 4096 else _varint(size))
+                append(data)
+            else:
+                append(_DOUBLE.pack(value))
+        return b''.join(parts)
+
+    def encode_mapping(self, transaction: Mapping[str, Any]) -> bytes:
+        return self.encode_record([transaction.get(name) for name in TRANSACTION_FIELDS])
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        transaction = dict.fromkeys(TRANSACTION_FIELDS)
+        pos = len(self.header)
+        end = len(payload)
+        while pos < end:
+            tag, pos = _read_varint(payload, pos)
+            name, is_string = self._names[tag >> 3]
+            if is_string:
+                size, pos = _read_varint(payload, pos)
+                transaction[name] = payload[pos:pos + size].decode('utf-8')
+                pos += size
+            else:
+                transaction[name] = _DOUBLE.unpack_from(payload, pos)[0]
+                pos += 8
+        return transaction
+
+SERIALIZERS: Dict[str, Callable[..., Serializer]] = {
+    "json": lambda registry: JsonSerializer(),
+    "orjson": lambda registry: OrjsonSerializer(),
+    "msgspec": lambda registry: MsgspecSerializer(),
+    "avro": lambda registry: AvroSerializer(registry),
+    "protobuf": lambda registry: ProtobufSerializer(registry),
+}
+
+def create_serializer(name: str, registry_path: Optional[str] = None) -> Serializer:
+    """Create a serializer by name, registering its schema if it has one"""
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{name}', expected one of {sorted(SERIALIZERS)}")
+    registry = LocalSchemaRegistry(registry_path) if registry_path else None
+    return SERIALIZERS[name](registry)
+
+def compare_serializers(transactions: List[Dict[str, Any]], names: Optional[List[str]] = None,
+                        registry_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Measure encode cost and message size of each available serializer"""
+    results = []
+    for name in names or list(SERIALIZERS):
+        try:
+            serializer = create_serializer(name, registry_path)
+        except ImportError as e:
+            results.append({"serializer": name, "error": str(e)})
+            continue
+        start = time.perf_counter()
+        payloads = [serializer.encode(txn) for txn in transactions]
+        elapsed = time.perf_counter() - start
+        total_bytes = sum(len(p) for p in payloads)
+        results.append({
+            "serializer": name,
+            "messages": len(payloads),
+            "encode_us_per_msg": elapsed / len(payloads) * 1e6,
+            "messages_per_sec": len(payloads) / elapsed,
+            "avg_bytes": total_bytes / len(payloads),
+        })
+    return results
+
+def main():
+    """Print an encode cost and message size comparison across serializers"""
+    from .data_generator import TransactionGenerator
+
+    parser = argparse.ArgumentParser(description="Compare transaction serializers")
+    parser.add_argument("--count", type=int, default=20000, help="transactions to encode per serializer")
+    parser.add_argument("--registry", default=None, help="local schema registry file")
+    args = parser.parse_args()
+
+    transactions = TransactionGenerator().generate_transactions(args.count)
+    results = compare_serializers(transactions, registry_path=args.registry)
+    baseline = next((r for r in results if r["serializer"] == "json"), None)
+
+    print(f"{'serializer':<10} {'us/msg':>8} {'msgs/s':>12} {'avg bytes':>10} {'size vs json':>13}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['serializer']:<10} skipped: {result['error']}")
+            continue
+        ratio = result["avg_bytes"] / baseline["avg_bytes"] if baseline else 1.0
+        print(f"{result['serializer']:<10} {result['encode_us_per_msg']:>8.2f} "
+              f"{result['messages_per_sec']:>12,.0f} {result['avg_bytes']:>10.1f} {ratio:>12.0%}")
+
+if __name__ == "__main__":
+    main()
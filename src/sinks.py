@@ -0,0 +1,342 @@
+"""
+Message sinks: Kafka, or broker-free stand-ins with the same produce/poll/flush interface
+"""
+
+import argparse
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from confluent_kafka import Producer
+from .segments import SegmentWriter, encode_frame
+
+logger = logging.getLogger(__name__)
+
+# Bytes buffered by the socket sink before they are sent
+SOCKET_BUFFER_BYTES = 256 * 1024
+
+class _DeliveredMessage:
+    """Minimal stand-in for a delivered ``confluent_kafka.Message``"""
+
+    __slots__ = ('_topic', '_value', '_key')
+
+    def __init__(self, topic, value, key):
+        self._topic = topic
+        self._value = value
+        self._key = key
+
+    def topic(self):
+        return self._topic
+
+    def value(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+    def partition(self):
+        return 0
+
+    def offset(self):
+        return -1
+
+    def latency(self):
+        return 0.0
+
+class Sink:
+    """Broker-free stand-in for ``confluent_kafka.Producer``.
+
+    ``TransactionProducer`` accepts any object with ``produce``, ``poll``,
+    ``flush`` and ``__len__``, so a sink takes the place of Kafka without
+    changing how messages are keyed, encoded or counted. ``produce`` hands a
+    message to ``_write``. Delivery callbacks fire on the next
+    ``poll``/``flush`` like librdkafka's. A write that fails with ``OSError``
+    is reported as a failed delivery. With ``only_errors`` (librdkafka's
+    ``delivery.report.only.error``) successful deliveries are not reported.
+    """
+
+    name = "base"
+
+    def __init__(self, only_errors: bool = False):
+        self.only_errors = only_errors
+        self.count = 0
+        self.bytes = 0
+        # A deque, so a thread can produce while another serves delivery reports
+        self._pending: Deque[tuple] = deque()
+
+    def produce(self, topic, value=None, key=None, callback=None, on_delivery=None, **kwargs):
+        callback = callback or on_delivery
+        try:
+            self._write(topic, value, key)
+        except OSError as e:
+            if callback is not None:
+                self._pending.append((callback, e, topic, value, key))
+            return
+        self.count += 1
+        self.bytes += len(value) if value else 0
+        if callback is not None and not self.only_errors:
+            self._pending.append((callback, None, topic, value, key))
+
+    def poll(self, timeout=None) -> int:
+        pending = self._pending
+        count = len(pending)
+        for _ in range(count):
+            callback, error, topic, value, key = pending.popleft()
+            callback(error, _DeliveredMessage(topic, value, key))
+        return count
+
+    def flush(self, timeout=None) -> int:
+        self._flush_output()
+        self.poll(0)
+        return 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        """Flush and release the sink's output"""
+        self.flush()
+
+    def _write(self, topic: str, value: bytes, key: Optional[bytes]):
+        raise NotImplementedError
+
+    def _flush_output(self):
+        pass
+
+class NullSink(Sink):
+    """Discards messages, counting them and their bytes.
+
+    Sending to it measures generation, encoding and the producer's own
+    overhead with no I/O at all. ``keep_messages`` keeps ``(topic, key,
+    value)`` tuples in ``messages`` for inspection.
+    """
+
+    name = "null"
+
+    def __init__(self, keep_messages: bool = False, only_errors: bool = False):
+        super().__init__(only_errors)
+        self.keep_messages = keep_messages
+        self.messages: List[tuple] = []
+
+    def _write(self, topic, value, key):
+        if self.keep_messages:
+            self.messages.append((topic, key, value))
+
+class MemorySink(Sink):
+    """A bounded in-process queue of ``(topic, key, value)`` messages.
+
+    Consumers on other threads take messages with ``get`` or ``drain``. When
+    ``capacity`` messages are waiting, ``produce`` raises ``BufferError``
+    like a full librdkafka queue, so the producer's retry and backpressure
+    paths behave as they do against Kafka. ``poll`` with a timeout waits for a
+    consumer to make room. ``start_consumer`` runs a built-in consumer thread
+    that takes and discards messages, counting them in ``consumed``, for
+    runs where nothing else reads the queue.
+    """
+
+    name = "memory"
+
+    def __init__(self, capacity: int = 100_000, only_errors: bool = False):
+        super().__init__(only_errors)
+        self.capacity = capacity
+        self.queue: "queue.Queue[Tuple[str, Optional[bytes], bytes]]" = queue.Queue(maxsize=capacity)
+        self.consumed = 0
+        self._consumer: Optional[threading.Thread] = None
+        self._stop_consumer = threading.Event()
+
+    def _write(self, topic, value, key):
+        try:
+            self.queue.put_nowait((topic, key, value))
+        except queue.Full:
+            raise BufferError(f"Memory sink full ({self.capacity} messages)") from None
+
+    def poll(self, timeout=None) -> int:
+        served = super().poll(timeout)
+        if timeout and self.queue.full():
+            with self.queue.not_full:
+                self.queue.not_full.wait(timeout)
+        return served
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[str, Optional[bytes], bytes]:
+        """Take the oldest message, waiting up to ``timeout`` (raises ``queue.Empty``)"""
+        return self.queue.get(timeout=timeout)
+
+    def drain(self, max_messages: Optional[int] = None) -> List[Tuple[str, Optional[bytes], bytes]]:
+        """Take up to ``max_messages`` waiting messages without blocking"""
+        messages = []
+        while max_messages is None or len(messages) < max_messages:
+            try:
+                messages.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def start_consumer(self):
+        """Discard messages on a background thread so the queue keeps draining"""
+        if self._consumer is not None:
+            return
+        self._stop_consumer.clear()
+        self._consumer = threading.Thread(target=self._consume, name="memory-sink-consumer", daemon=True)
+        self._consumer.start()
+
+    def _consume(self):
+        while not self._stop_consumer.is_set():
+            self.consumed += len(self.drain())
+            try:
+                self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.consumed += 1
+
+    def close(self):
+        super().close()
+        if self._consumer is not None:
+            self._stop_consumer.set()
+            self._consumer.join()
+            self._consumer = None
+            self.consumed += len(self.drain())
+
+class SegmentSink(Sink):
+    """Appends messages to a local segment log.
+
+    The log has the same format as ``python -m src.replay record``, so its
+    contents can later be replayed to Kafka. Each record is stamped with its
+    send time, so a replay at ``--speed 1`` reproduces the original pacing.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, only_errors: bool = False):
+        super().__init__(only_errors)
+        self.directory = directory
+        self.writer = SegmentWriter(directory, segment_bytes=segment_bytes)
+
+    def _write(self, topic, value, key):
+        self.writer.append(topic, key, value, time.time_ns() // 1000)
+
+    def _flush_output(self):
+        self.writer.flush()
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+class SocketSink(Sink):
+    """Streams messages as segment-log frames over TCP or a Unix socket.
+
+    ``address`` is ``host:port`` or ``unix:/path``. Frames are buffered and
+    sent once ``buffer_bytes`` are pending, and on every ``poll``/``flush``.
+    Reading the stream with ``segments.read_frames`` yields the messages back.
+    """
+
+    name = "socket"
+
+    def __init__(self, address: str, buffer_bytes: int = SOCKET_BUFFER_BYTES, only_errors: bool = False):
+        super().__init__(only_errors)
+        self.address = address
+        self.buffer_bytes = buffer_bytes
+        if address.startswith("unix:"):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(address[len("unix:"):])
+        else:
+            host, _, port = address.rpartition(":")
+            self.socket = socket.create_connection((host or "localhost", int(port)))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = bytearray()
+
+    def _write(self, topic, value, key):
+        self._buffer += encode_frame(topic, key, value, time.time_ns() // 1000)
+        if len(self._buffer) >= self.buffer_bytes:
+            self._flush_output()
+
+    def _flush_output(self):
+        if self._buffer:
+            data, self._buffer = self._buffer, bytearray()
+            self.socket.sendall(data)
+
+    def poll(self, timeout=None) -> int:
+        try:
+            self._flush_output()
+        except OSError as e:
+            logger.error(f"Socket sink {self.address} failed: {e}")
+        return super().poll(timeout)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.socket.close()
+
+SINKS: Dict[str, Callable[..., Any]] = {
+    "kafka": lambda producer_config, **options: Producer(producer_config),
+    "null": lambda producer_config, **options: NullSink(
+        only_errors=producer_config.get('delivery.report.only.error', False)),
+    "memory": lambda producer_config, capacity=100_000, **options: MemorySink(
+        capacity, only_errors=producer_config.get('delivery.report.only.error', False)),
+    "file": lambda producer_config, path="data/sink", **options: SegmentSink(
+        path, only_errors=producer_config.get('delivery.report.only.error', False)),
+    "socket": lambda producer_config, address="localhost:9999", **options: SocketSink(
+        address, only_errors=producer_config.get('delivery.report.only.error', False)),
+}
+
+def create_sink(name: str, producer_config: Optional[Dict[str, Any]] = None, **options):
+    """Create a sink by name.
+
+    ``kafka`` returns a ``confluent_kafka.Producer`` built from
+    ``producer_config``. The others honour its ``delivery.report.only.error``
+    and take ``capacity`` (memory), ``path`` (file) or ``address`` (socket).
+    """
+    if name not in SINKS:
+        raise ValueError(f"Unknown sink '{name}', expected one of {sorted(SINKS)}")
+    return SINKS[name](producer_config or {}, **options)
+
+def main():
+    """Generate and send to a sink for a fixed time, timing each pipeline stage"""
+    from .config import config
+    from .data_generator import TransactionGenerator
+    from .producer import TransactionProducer
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Measure generator and producer throughput against a sink")
+    parser.add_argument("--sink", choices=sorted(SINKS), default="null", help="where messages go")
+    parser.add_argument("--seconds", type=float, default=10, help="how long to run")
+    parser.add_argument("--batch-size", type=int, default=10000, help="transactions per batch")
+    parser.add_argument("--path", default=config.sink.path, help="file sink directory")
+    parser.add_argument("--address", default=config.sink.address, help="socket sink address")
+    args = parser.parse_args()
+
+    config.sink.type = args.sink
+    config.sink.path = args.path
+    config.sink.address = args.address
+    generator = TransactionGenerator(pool_refresh_interval=0)
+    producer = TransactionProducer()
+    generate_s = send_s = 0.0
+    sent = 0
+    deadline = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            batch = generator.generate_batch(args.batch_size)
+            middle = time.perf_counter()
+            sent += producer.send_batch(batch)
+            end = time.perf_counter()
+            generate_s += middle - start
+            send_s += end - middle
+    finally:
+        start = time.perf_counter()
+        producer.checkpoint(timeout=30)
+        send_s += time.perf_counter() - start
+        producer.close()
+        generator.close()
+    total = generate_s + send_s
+    logger.info(f"{args.sink}: {sent:,} messages in {total:.1f}s, {sent / total:,.0f}/s end to end")
+    logger.info(f"  generate {sent / generate_s:>12,.0f}/s ({generate_s / total:.0%} of the time)")
+    logger.info(f"  send     {sent / send_s:>12,.0f}/s ({send_s / total:.0%} of the time)")
+    if args.sink == "memory":
+        logger.info(f"  consumed {producer.producer.consumed:,} messages")
+
+if __name__ == "__main__":
+    main()
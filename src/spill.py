@@ -0,0 +1,259 @@
+"""
+Spill journal: keep messages the broker cannot take in a local segment log and replay them in order
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Set
+from .metrics import REGISTRY
+from .segments import FRAME_HEADER, INDEX_SUFFIX, SEGMENT_SUFFIX, SegmentReader, SegmentWriter, list_segments
+
+logger = logging.getLogger(__name__)
+
+SPILLED = REGISTRY.counter('txn_spill_messages_total', 'Messages written to the spill journal', ['topic'])
+DRAINED = REGISTRY.counter('txn_spill_drained_total', 'Spilled messages delivered after replay')
+DROPPED = REGISTRY.counter('txn_spill_dropped_total', 'Messages dropped because the spill journal was full')
+BACKLOG = REGISTRY.gauge('txn_spill_backlog', 'Spilled messages waiting to be replayed')
+DISK_BYTES = REGISTRY.gauge('txn_spill_disk_bytes', 'Bytes of spill journal segments on disk')
+BROKER_DOWN = REGISTRY.gauge('txn_spill_broker_down', 'Whether new messages go straight to the journal (1) or not (0)')
+
+# Spilled messages handed to the producer per drain pass
+DRAIN_BATCH = 1000
+# Seconds between single-message probes while the broker is down
+PROBE_INTERVAL = 1.0
+# File in the journal directory holding the offset replay resumes from
+POSITION_FILE = 'position'
+
+class SpillJournal:
+    """Append-only disk queue of encoded messages, replayed in order by a background thread.
+
+    The producer appends here when librdkafka's queue is full, when a
+    delivery fails, and for as long as the journal holds a backlog, so new
+    messages queue up behind older ones. The drainer thread sends the
+    backlog through ``produce`` (called under ``produce_lock``). While the
+    broker is marked down it sends only one probe message every
+    ``probe_interval`` seconds. A replayed message that fails again is
+    appended to the end.
+
+    A segment is deleted once every message in it has been delivered or
+    spilled again. An append that would take the segments past
+    ``max_bytes`` is dropped. The offset below which every message is
+    settled is saved to ``POSITION_FILE`` as the drainer goes and on close;
+    a restart replays from there, so after a crash delivery is at least once.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, segment_bytes: int = 16 * 1024 * 1024,
+                 probe_interval: float = PROBE_INTERVAL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.probe_interval = probe_interval
+        self.writer = SegmentWriter(directory, segment_bytes=segment_bytes)
+        self.reader = SegmentReader(directory)
+        segments = list_segments(directory)
+        self.read_offset = segments[0] if segments else self.writer.next_offset
+        self._position_path = os.path.join(directory, POSITION_FILE)
+        if not segments and os.path.exists(self._position_path):
+            # Offsets restart from zero in an empty journal
+            os.remove(self._position_path)
+        elif os.path.exists(self._position_path):
+            with open(self._position_path) as f:
+                self.read_offset = min(max(int(f.read() or 0), self.read_offset), self.writer.next_offset)
+        self._saved_position = self.read_offset
+        self.disk_bytes = sum(os.path.getsize(self._path(base) + SEGMENT_SUFFIX) for base in segments)
+        self.broker_down = False
+        self.in_flight = 0
+        self.spilled = 0
+        self.drained = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.produce_lock = threading.Lock()
+        # Replayed offsets in the order they were produced, and those whose delivery report has arrived
+        self._unsettled: Deque[int] = deque()
+        self._settled: Set[int] = set()
+        self._produce: Optional[Callable] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_probe = 0.0
+        BACKLOG.set_function(lambda: self.backlog)
+        DISK_BYTES.set_function(lambda: self.disk_bytes)
+        BROKER_DOWN.set_function(lambda: 1 if self.broker_down else 0)
+        if self.backlog:
+            logger.info(f"Replaying {self.backlog} messages left in the spill journal at {directory}")
+
+    def _path(self, base_offset: int) -> str:
+        return os.path.join(self.directory, f"{base_offset:020d}")
+
+    @property
+    def backlog(self) -> int:
+        """Messages appended but not yet handed back to the producer"""
+        return self.writer.next_offset - self.read_offset
+
+    @property
+    def active(self) -> bool:
+        """Whether new messages must go to the journal to stay behind the backlog"""
+        return self.broker_down or self.writer.next_offset > self.read_offset
+
+    def append(self, topic: str, key: Optional[bytes], value: bytes, failed: bool = False) -> bool:
+        """Spill a message, returning False if the journal is full and it was dropped.
+
+        ``failed`` marks a message whose delivery failed, which also marks the broker down.
+        """
+        size = FRAME_HEADER.size + len(topic) + len(key or b'') + len(value)
+        with self.lock:
+            if failed:
+                self._mark_down()
+            if self.disk_bytes + size > self.max_bytes:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 10000 == 0:
+                    logger.error(f"Spill journal full ({self.disk_bytes / 2**20:.1f} of {self.max_bytes / 2**20:.1f} MiB), "
+                                 f"{self.dropped} messages dropped")
+                DROPPED.inc()
+                return False
+            if not self.spilled:
+                logger.warning(f"Spilling messages to {self.directory}")
+            self.writer.append(topic, key, value, time.time_ns() // 1000)
+            self.disk_bytes += size
+            self.spilled += 1
+        SPILLED.labels(topic).inc()
+        self._wake.set()
+        return True
+
+    def _mark_down(self):
+        if not self.broker_down:
+            self.broker_down = True
+            logger.warning(f"Broker unavailable, new messages go to the spill journal "
+                           f"(probing every {self.probe_interval}s)")
+
+    def mark_down(self):
+        """Send new messages straight to the journal until a delivery succeeds"""
+        with self.lock:
+            self._mark_down()
+
+    def mark_up(self):
+        with self.lock:
+            if self.broker_down:
+                self.broker_down = False
+                logger.info(f"Broker available again, replaying {self.backlog} spilled messages")
+        self._wake.set()
+
+    def start(self, produce: Callable):
+        """Start replaying through ``produce``, a ``Producer.produce``-compatible function"""
+        self._produce = produce
+        self._thread = threading.Thread(target=self._run, name="spill-drainer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if not self.backlog:
+                    self._release()
+                    self._wake.wait(0.1)
+                    self._wake.clear()
+                    continue
+                if self.broker_down:
+                    if self.in_flight or time.monotonic() - self._last_probe < self.probe_interval:
+                        self._stop.wait(0.01)
+                        continue
+                    self._last_probe = time.monotonic()
+                    sent = self._drain(1)
+                else:
+                    sent = self._drain(DRAIN_BATCH)
+                self._release()
+                if not sent:
+                    self._stop.wait(0.01)
+            except Exception as e:
+                logger.error(f"Spill drainer error: {e}")
+                self._stop.wait(1.0)
+
+    def _drain(self, limit: int) -> int:
+        """Hand up to ``limit`` journal messages to the producer, in order"""
+        with self.lock:
+            self.writer.flush()
+        sent = 0
+        records = self.reader.read(self.read_offset)
+        try:
+            for record in records:
+                if sent >= limit or self._stop.is_set():
+                    break
+                try:
+                    with self.produce_lock:
+                        self._produce(record.topic, value=record.value, key=record.key or None,
+                                      callback=lambda err, msg, offset=record.offset: self._delivered(err, msg, offset))
+                except BufferError:
+                    break
+                with self.lock:
+                    self.read_offset = record.offset + 1
+                    self.in_flight += 1
+                    self._unsettled.append(record.offset)
+                sent += 1
+        finally:
+            records.close()
+        return sent
+
+    def _delivered(self, err, msg, offset: int):
+        """Delivery report for a replayed message"""
+        with self.lock:
+            self.in_flight -= 1
+            self._settled.add(offset)
+            if err is None:
+                self.drained += 1
+        if err is None:
+            DRAINED.inc()
+            if self.broker_down:
+                self.mark_up()
+        else:
+            self.append(msg.topic(), msg.key(), msg.value(), failed=True)
+
+    def _release(self):
+        """Delete segments whose messages have all been delivered or spilled again"""
+        with self.lock:
+            unsettled, settled = self._unsettled, self._settled
+            while unsettled and unsettled[0] in settled:
+                settled.discard(unsettled.popleft())
+            settled_below = unsettled[0] if unsettled else self.read_offset
+            self._save_position(settled_below)
+            segments = list_segments(self.directory)
+            if not unsettled and settled_below >= self.writer.next_offset:
+                # Fully drained: close the active segment so it can go too
+                if segments:
+                    self.writer.roll()
+                    logger.info(f"Spill journal drained ({self.drained} messages replayed so far)")
+                done = segments
+            else:
+                done = [base for base, following in zip(segments, segments[1:]) if following <= settled_below]
+            for base in done:
+                path = self._path(base)
+                self.disk_bytes -= os.path.getsize(path + SEGMENT_SUFFIX)
+                os.remove(path + SEGMENT_SUFFIX)
+                if os.path.exists(path + INDEX_SUFFIX):
+                    os.remove(path + INDEX_SUFFIX)
+
+    def _save_position(self, offset: int):
+        if offset == self._saved_position:
+            return
+        temporary = self._position_path + '.tmp'
+        with open(temporary, 'w') as f:
+            f.write(str(offset))
+        os.replace(temporary, self._position_path)
+        self._saved_position = offset
+
+    def stop(self, timeout: float = 5.0):
+        """Stop replaying; spilled messages stay on disk"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self._release()
+        with self.lock:
+            self.writer.close()
+        if self.backlog:
+            logger.warning(f"{self.backlog} spilled messages remain in {self.directory}; "
+                           f"they are replayed on the next start")
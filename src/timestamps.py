@@ -0,0 +1,187 @@
+"""
+Event-time clock and bulk ISO timestamp formatting
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+
+# Naive epoch used to store timestamps as int64 microseconds
+EPOCH = datetime(1970, 1, 1)
+
+# Event clock modes
+CLOCK_MODES = ("sequential", "wall", "accelerated", "historical")
+
+# Gap between sequential-mode events in seconds
+SEQUENTIAL_GAP = (10, 300)
+
+# Characters in a timestamp with microseconds, len("YYYY-MM-DDTHH:MM:SS.ffffff")
+TIMESTAMP_WIDTH = 26
+
+_SECONDS_PER_DAY = 86400
+_PREFIX_WIDTH = 11  # len("YYYY-MM-DDT")
+
+# "YYYY-MM-DDT" bytes per day since the epoch, shared by every formatter call
+_day_prefixes: Dict[int, bytes] = {}
+
+def to_micros(moment: datetime) -> int:
+    """Convert a naive datetime to microseconds since the naive epoch"""
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+def from_micros(micros: int) -> datetime:
+    """Convert microseconds since the naive epoch back to a datetime"""
+    return EPOCH + timedelta(microseconds=micros)
+
+def _prefix_rows(days: np.ndarray) -> np.ndarray:
+    """Cached date prefixes for the given days as an (n, 11) uint8 array"""
+    prefixes = []
+    for day in days.tolist():
+        prefix = _day_prefixes.get(day)
+        if prefix is None:
+            prefix = _day_prefixes[day] = (EPOCH + timedelta(days=day)).strftime('%Y-%m-%dT').encode('ascii')
+        prefixes.append(prefix)
+    return np.frombuffer(b''.join(prefixes), dtype=np.uint8).reshape(-1, _PREFIX_WIDTH)
+
+def timestamp_buffer(timestamp_us: np.ndarray) -> np.ndarray:
+    """ASCII ``YYYY-MM-DDTHH:MM:SS.ffffff`` for each timestamp as a ``(count, 26)`` uint8 array.
+
+    The date part comes from a per-day prefix cache and the time-of-day digits
+    are written with vectorized arithmetic, so no ``datetime`` is created per row.
+    """
+    timestamp_us = np.asarray(timestamp_us, dtype=np.int64)
+    count = len(timestamp_us)
+    seconds = timestamp_us // 1_000_000
+    micros = timestamp_us - seconds * 1_000_000
+    day = seconds // _SECONDS_PER_DAY
+    second_of_day = seconds - day * _SECONDS_PER_DAY
+    days, day_index = np.unique(day, return_inverse=True)
+
+    buffer = np.empty((count, TIMESTAMP_WIDTH), dtype=np.uint8)
+    if not count:
+        return buffer
+    buffer[:, :_PREFIX_WIDTH] = _prefix_rows(days)[day_index]
+    hour = second_of_day // 3600
+    minute = second_of_day // 60 % 60
+    second = second_of_day % 60
+    for column, value in ((11, hour), (14, minute), (17, second)):
+        buffer[:, column] = value // 10 + 48
+        buffer[:, column + 1] = value % 10 + 48
+    buffer[:, 13] = buffer[:, 16] = 58  # ':'
+    buffer[:, 19] = 46  # '.'
+    for column in range(25, 19, -1):
+        buffer[:, column] = micros % 10 + 48
+        micros = micros // 10
+    return buffer
+
+def format_timestamps(timestamp_us: np.ndarray) -> List[str]:
+    """Format microsecond timestamps exactly like ``datetime.isoformat()``.
+
+    A batch costs a few NumPy passes over ``timestamp_buffer`` plus one decode.
+    Timestamps with zero microseconds drop the fraction, as ``isoformat`` does.
+    """
+    timestamp_us = np.asarray(timestamp_us, dtype=np.int64)
+    count = len(timestamp_us)
+    text = timestamp_buffer(timestamp_us).tobytes().decode('ascii')
+    width = TIMESTAMP_WIDTH
+    formatted = [text[offset:offset + width] for offset in range(0, count * width, width)]
+    for index in np.flatnonzero(timestamp_us % 1_000_000 == 0).tolist():
+        formatted[index] = formatted[index][:19]
+    return formatted
+
+class EventClock:
+    """Simulated event time for generated transactions.
+
+    ``sequential`` reproduces the original behaviour: events start 24 hours
+    ago (or at ``start``) and advance by 10 seconds to 5 minutes each,
+    regardless of how fast they are produced. The other modes derive event
+    time from the wall clock:
+
+    * ``wall`` - event time is the current time.
+    * ``accelerated`` - event time runs ``speed`` times faster than the wall
+      clock from ``start`` (default: now).
+    * ``historical`` - like ``accelerated``, but confined to the window
+      ``start`` to ``end``; after ``end`` the window is replayed from ``start``.
+
+    In those modes each batch is spread over the event time elapsed since the
+    previous batch with a cumulative sum of random gaps, so timestamps never go
+    backwards within a pass and stay close to when the events are sent.
+    ``stamp`` restamps rows in place right before they are sent, letting event
+    time track a pacing scheduler's actual release times.
+    """
+
+    def __init__(self, mode: str = "sequential", speed: float = 1.0, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, clock=time.time):
+        if mode not in CLOCK_MODES:
+            raise ValueError(f"Unknown event clock mode '{mode}' (expected one of {', '.join(CLOCK_MODES)})")
+        if mode == "wall":
+            speed = 1.0
+        if speed <= 0:
+            raise ValueError(f"Event clock speed must be positive, got {speed}")
+        if mode == "historical":
+            if start is None or end is None:
+                raise ValueError("Historical event clock needs both a start and an end")
+            if end <= start:
+                raise ValueError(f"Historical window end {end} is not after its start {start}")
+        self.mode = mode
+        self.speed = speed
+        self.clock = clock
+        self.origin_wall_us = int(clock() * 1_000_000)
+        if mode == "sequential":
+            start = start or datetime.now() - timedelta(hours=24)
+        elif mode == "wall" or start is None:
+            start = datetime.now()
+        self.start_us = to_micros(start)
+        self.window_us = to_micros(end) - self.start_us if mode == "historical" else 0
+        # Last event time handed out
+        self.last_us = self.start_us
+
+    def __repr__(self) -> str:
+        return f"EventClock(mode={self.mode!r}, speed={self.speed}, start={from_micros(self.start_us)})"
+
+    @property
+    def tracks_wall_clock(self) -> bool:
+        """Whether event time is derived from the wall clock"""
+        return self.mode != "sequential"
+
+    def now_us(self) -> int:
+        """Current event time in microseconds (the last event time in sequential mode)"""
+        if not self.tracks_wall_clock:
+            return self.last_us
+        elapsed = int((int(self.clock() * 1_000_000) - self.origin_wall_us) * self.speed)
+        if self.window_us:
+            elapsed %= self.window_us
+        return self.start_us + elapsed
+
+    def next_batch(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        """Monotonic event times in microseconds for the next ``count`` events"""
+        if not self.tracks_wall_clock:
+            low, high = SEQUENTIAL_GAP
+            deltas = np.rint(rng.uniform(low, high, size=count) * 1e6).astype(np.int64)
+            timestamp_us = self.last_us + np.cumsum(deltas)
+        else:
+            now = self.now_us()
+            if now < self.last_us:
+                # The historical window wrapped around: start a new pass
+                self.last_us = self.start_us
+            gaps = np.cumsum(rng.exponential(size=count))
+            span = now - self.last_us
+            timestamp_us = self.last_us + np.rint(gaps * (span / gaps[-1] if count else 0)).astype(np.int64)
+        if count:
+            self.last_us = int(timestamp_us[-1])
+        return timestamp_us
+
+    def stamp(self, timestamp_us: np.ndarray, rng: np.random.Generator):
+        """Overwrite ``timestamp_us`` in place with event times ending now"""
+        timestamp_us[:] = self.next_batch(len(timestamp_us), rng)
+
+def event_clock_from_config() -> EventClock:
+    """Event clock from ``EVENT_CLOCK_MODE``, ``EVENT_CLOCK_SPEED``, ``EVENT_CLOCK_START`` and ``EVENT_CLOCK_END``"""
+    from .config import config
+
+    settings = config.generator
+    return EventClock(
+        settings.clock_mode, settings.clock_speed,
+        datetime.fromisoformat(settings.clock_start) if settings.clock_start else None,
+        datetime.fromisoformat(settings.clock_end) if settings.clock_end else None,
+    )
@@ -0,0 +1,134 @@
+"""
+Columnar customer population for the transaction generator
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_DIGITS = 12
+WALLET_MIN = 1000
+
+# Populations up to this size keep formatted account/wallet strings cached
+STRING_CACHE_LIMIT = 100_000
+
+_COLUMNS = ("name_index", "account", "wallet")
+_NAMES_FILE = "names.json"
+
+class UserStore:
+    """Array-backed user population with O(1) access by user index.
+
+    Each user costs 20 bytes: a 12-byte ASCII account number (``S12``), a
+    uint32 wallet number and a uint32 index into a table of interned names.
+    Stores can be saved to a directory of ``.npy`` files and memory-mapped
+    back, so even multi-million-user populations load instantly and are
+    paged in on demand. Small populations (up to ``STRING_CACHE_LIMIT``) also
+    cache their formatted account and wallet strings.
+    """
+
+    def __init__(self, names: Sequence[str], name_index: np.ndarray, account: np.ndarray, wallet: np.ndarray):
+        self.names = np.asarray(names, dtype=object)
+        self.name_index = name_index
+        self.account = account
+        self.wallet = wallet
+        self._account_strings: Optional[np.ndarray] = None
+        self._wallet_strings: Optional[np.ndarray] = None
+        if len(account) <= STRING_CACHE_LIMIT:
+            self._account_strings = self._format_accounts(self.account)
+            self._wallet_strings = self._format_wallets(self.wallet)
+
+    @staticmethod
+    def _format_accounts(accounts: np.ndarray) -> np.ndarray:
+        return np.array([account.decode('ascii') for account in accounts.tolist()], dtype=object)
+
+    @staticmethod
+    def _format_wallets(wallets: np.ndarray) -> np.ndarray:
+        return np.array([f"WALLET{wallet}" for wallet in wallets.tolist()], dtype=object)
+
+    @classmethod
+    def build(cls, count: int, names: Sequence[str], rng: Optional[np.random.Generator] = None) -> 'UserStore':
+        """Draw ``count`` users with names from ``names``"""
+        rng = rng if rng is not None else np.random.default_rng()
+        name_index = rng.integers(0, len(names), size=count).astype(np.uint32)
+        digits = rng.integers(ord('0'), ord('9') + 1, size=(count, ACCOUNT_DIGITS), dtype=np.uint8)
+        account = digits.view(f'S{ACCOUNT_DIGITS}').reshape(count)
+        wallet = rng.integers(WALLET_MIN, max(10000, WALLET_MIN + 10 * count), size=count).astype(np.uint32)
+        return cls(names, name_index, account, wallet)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'UserStore':
+        """Load a store saved with ``save``, memory-mapping its columns by default"""
+        with open(os.path.join(directory, _NAMES_FILE), 'r', encoding='utf-8') as f:
+            names = json.load(f)
+        mode = 'r' if mmap else None
+        columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in _COLUMNS}
+        return cls(names, **columns)
+
+    def save(self, directory: str):
+        """Write the store as ``.npy`` columns plus a JSON name table"""
+        os.makedirs(directory, exist_ok=True)
+        for name in _COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, _NAMES_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.names.tolist(), f, ensure_ascii=False)
+
+    def __len__(self) -> int:
+        return len(self.account)
+
+    def user(self, index: int) -> Dict[str, str]:
+        """A single user as a dict"""
+        return {
+            'name': self.names[self.name_index[index]],
+            'account_number': self.account[index].decode('ascii'),
+            'wallet_id': f"WALLET{self.wallet[index]}",
+        }
+
+    def names_at(self, indices: np.ndarray) -> np.ndarray:
+        """Customer names for an array of user indices"""
+        return self.names[self.name_index[indices]]
+
+    def accounts_at(self, indices: np.ndarray) -> np.ndarray:
+        """Account numbers for an array of user indices"""
+        if self._account_strings is not None:
+            return self._account_strings[indices]
+        return self._format_accounts(self.account[indices])
+
+    def wallets_at(self, indices: np.ndarray) -> np.ndarray:
+        """Wallet IDs for an array of user indices"""
+        if self._wallet_strings is not None:
+            return self._wallet_strings[indices]
+        return self._format_wallets(self.wallet[indices])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the per-user columns"""
+        return sum(getattr(self, name).nbytes for name in _COLUMNS)
+
+def main():
+    """Pre-build a user store file for fast startup"""
+    from .value_pools import ValuePools
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Build a memory-mappable user population")
+    parser.add_argument("--users", type=int, required=True, help="number of users")
+    parser.add_argument("--output", required=True, help="output directory")
+    parser.add_argument("--names", type=int, default=5000, help="distinct names to draw from")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pools = ValuePools(pool_size=0, seed=args.seed)
+    names: List[str] = list(dict.fromkeys(pools.values('name', args.names)))
+    store = UserStore.build(args.users, names, np.random.default_rng(args.seed))
+    store.save(args.output)
+    logger.info(f"Built {len(store):,} users ({len(names)} distinct names, {store.nbytes / 1e6:.0f} MB) "
+                f"in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Pre-sampled Faker value pools for the transaction generator
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from faker import Faker
+from faker.providers import internet
+
+logger = logging.getLogger(__name__)
+
+# Faker calls used to fill each pool
+POOL_KINDS: Dict[str, Callable[[Faker], str]] = {
+    "ip_address": lambda fake: fake.ipv4(),
+    "user_agent": lambda fake: fake.user_agent(),
+    "name": lambda fake: fake.name(),
+    "account_number": lambda fake: fake.numerify('############'),
+}
+
+class ValuePools:
+    """Pools of Faker values generated once and sampled by index.
+
+    ``pool_size`` trades realism against speed: larger pools repeat values
+    less often but take longer to build. A ``pool_size`` of 0 disables
+    pooling and calls Faker for every value. With a positive
+    ``refresh_interval`` the pools are rebuilt in a background thread and
+    swapped in atomically, so long runs keep seeing fresh values.
+    """
+
+    def __init__(self, locale: str = 'vi_VN', pool_size: int = 2000,
+                 refresh_interval: float = 0.0, rng: Optional[np.random.Generator] = None,
+                 seed: Optional[int] = None):
+        self.locale = locale
+        self.pool_size = pool_size
+        self.refresh_interval = refresh_interval
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.fake = self._make_faker()
+        if seed is not None:
+            # Only the initial pools are reproducible; refreshes draw fresh values
+            self.fake.seed_instance(seed)
+        self.pools: Dict[str, np.ndarray] = self._build_pools(self.fake) if self.pooled else {}
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    @property
+    def pooled(self) -> bool:
+        """Whether values are served from pre-generated pools"""
+        return self.pool_size > 0
+
+    def _make_faker(self) -> Faker:
+        fake = Faker(self.locale)
+        fake.add_provider(internet)
+        return fake
+
+    def _build_pools(self, fake: Faker) -> Dict[str, np.ndarray]:
+        """Generate a full set of pools with the given Faker instance"""
+        return {
+            kind: np.array([make(fake) for _ in range(self.pool_size)], dtype=object)
+            for kind, make in POOL_KINDS.items()
+        }
+
+    def sample(self, kind: str, count: int) -> np.ndarray:
+        """Draw ``count`` values of ``kind`` as an object array"""
+        if not self.pooled:
+            make = POOL_KINDS[kind]
+            return np.array([make(self.fake) for _ in range(count)], dtype=object)
+        pool = self.pools[kind]
+        return pool[self.rng.integers(0, len(pool), size=count)]
+
+    def pick(self, kind: str) -> str:
+        """Draw a single value of ``kind``"""
+        if not self.pooled:
+            return POOL_KINDS[kind](self.fake)
+        pool = self.pools[kind]
+        return pool[self.rng.integers(len(pool))]
+
+    def values(self, kind: str, count: int) -> List[str]:
+        """Draw ``count`` values of ``kind`` as a list"""
+        return self.sample(kind, count).tolist()
+
+    def refresh(self):
+        """Rebuild all pools and swap them in"""
+        # Faker instances are not thread-safe, so refreshes use their own
+        self.pools = self._build_pools(self._make_faker())
+        logger.debug(f"Refreshed value pools ({self.pool_size} values per kind)")
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing value pools: {e}")
+
+    def start(self):
+        """Start background refreshing if a refresh interval is configured"""
+        if not self.pooled or self.refresh_interval <= 0 or self._refresh_thread:
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="value-pool-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+        logger.info(f"Refreshing value pools every {self.refresh_interval}s")
+
+    def stop(self):
+        """Stop background refreshing"""
+        self._stop_event.set()
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout=1)
+            self._refresh_thread = None
@@ -0,0 +1,421 @@
+"""
+Verification consumer: check produced traffic for schema errors, duplicates and gaps in bulk
+"""
+
+import argparse
+import logging
+import math
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .config import config
+from .data_generator import AMOUNT_RANGES, TRANSACTION_FIELDS, TRANSACTION_TYPES
+from .producer import TOPIC_MAPPING
+from .segments import SegmentReader
+from .serializers import Serializer, create_serializer
+from .timestamps import to_micros
+
+logger = logging.getLogger(__name__)
+
+# Fields every transaction carries, and the type-specific ones each type must (and must not) fill
+_FIELD_SET = frozenset(TRANSACTION_FIELDS)
+_NOT_NULL = ("transaction_id", "timestamp", "customer_name", "transaction_type", "amount", "currency")
+_TYPE_FIELDS = {
+    "IBFT": ("sender_account", "receiver_account"),
+    "QR": ("merchant_id",),
+    "TOPUP": ("wallet_id",),
+}
+_OPTIONAL = ("merchant_id", "sender_account", "receiver_account", "wallet_id")
+_UNUSED = {transaction_type: tuple(field for field in _OPTIONAL if field not in fields)
+           for transaction_type, fields in _TYPE_FIELDS.items()}
+_AMOUNT_RANGES = dict(zip(TRANSACTION_TYPES, AMOUNT_RANGES.tolist()))
+
+# Odd 64-bit multiplier spreading sequential hashes (e.g. of integer IDs) across the filter
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+class BloomFilter:
+    """Fixed-size bloom filter over hashable keys, sized for ``capacity`` keys at ``error_rate``.
+
+    Bit positions come from double hashing one 64-bit hash per key, so a
+    batch is looked up and inserted with a handful of numpy operations.
+    10 million keys at 0.1% take about 18 MB.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError(f"Bloom filter needs a positive capacity and 0 < error_rate < 1, "
+                             f"got {capacity} and {error_rate}")
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def add(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """Insert ``keys``, returning which were probably seen before, earlier in ``keys`` included"""
+        count = len(keys)
+        hashes = np.fromiter(map(hash, keys), dtype=np.int64, count=count).view(np.uint64) * _HASH_MIX
+        hashes ^= hashes >> np.uint64(29)
+        repeated = np.ones(count, dtype=bool)
+        repeated[np.unique(hashes, return_index=True)[1]] = False
+        step = (hashes >> np.uint64(32)) | np.uint64(1)
+        positions = (hashes[:, None] + np.arange(self.hash_count, dtype=np.uint64) * step[:, None]) % np.uint64(self.size)
+        byte = (positions >> np.uint64(3)).astype(np.intp)
+        mask = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        seen = ((self.bits[byte] & mask) != 0).all(axis=1) | repeated
+        np.bitwise_or.at(self.bits, byte.ravel(), mask.ravel())
+        self.count += count - int(seen.sum())
+        return seen
+
+class SequenceBitmap:
+    """One bit per counter-mode stream position, recovered from each transaction's timestamp.
+
+    With ``COUNTER_MODE`` transaction N is stamped within
+    ``[start + N*step, start + (N+1)*step)`` (``GENERATOR_COUNTER_STEP_US``), so
+    positions seen twice are exact duplicates and unset bits between the
+    lowest and highest position seen are transactions that never arrived.
+    The bitmap grows in both directions as positions arrive.
+    """
+
+    def __init__(self, start_us: int, step_us: int):
+        self.start_us = start_us
+        self.step_us = step_us
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.base = 0
+        self.low: Optional[int] = None
+        self.high: Optional[int] = None
+        self.seen = 0
+
+    def _cover(self, low: int, high: int):
+        """Make room for positions ``low`` to ``high``"""
+        if self.low is None:
+            self.base = low - low % 8
+            self.bits = np.zeros(max(8192, (high - self.base) // 8 + 1), dtype=np.uint8)
+        elif low < self.base:
+            base = low - low % 8
+            self.bits = np.concatenate([np.zeros((self.base - base) // 8, dtype=np.uint8), self.bits])
+            self.base = base
+        needed = (high - self.base) // 8 + 1
+        if needed > len(self.bits):
+            self.bits = np.concatenate([self.bits, np.zeros(max(needed, 2 * len(self.bits)) - len(self.bits),
+                                                            dtype=np.uint8)])
+
+    def add(self, timestamp_us: np.ndarray) -> np.ndarray:
+        """Mark the positions of ``timestamp_us`` (all at or after the start), returning which were seen before"""
+        positions = (np.asarray(timestamp_us, dtype=np.int64) - self.start_us) // self.step_us
+        if not len(positions):
+            return np.zeros(0, dtype=bool)
+        low, high = int(positions.min()), int(positions.max())
+        self._cover(low, high)
+        offsets = positions - self.base
+        byte = offsets >> 3
+        mask = np.left_shift(1, (offsets & 7).astype(np.uint8)).astype(np.uint8)
+        repeated = np.ones(len(positions), dtype=bool)
+        repeated[np.unique(positions, return_index=True)[1]] = False
+        seen = ((self.bits[byte] & mask) != 0) | repeated
+        np.bitwise_or.at(self.bits, byte, mask)
+        self.seen += len(positions) - int(seen.sum())
+        self.low = low if self.low is None else min(self.low, low)
+        self.high = high if self.high is None else max(self.high, high)
+        return seen
+
+    @property
+    def missing(self) -> int:
+        """Positions between the lowest and highest seen that have not arrived"""
+        return 0 if self.low is None else self.high - self.low + 1 - self.seen
+
+    def missing_ranges(self, limit: int = 10) -> List[Tuple[int, int]]:
+        """The first ``limit`` runs of missing positions as inclusive ``(first, last)`` pairs"""
+        if not self.missing:
+            return []
+        flags = np.unpackbits(self.bits, bitorder='little')[self.low - self.base:self.high - self.base + 1]
+        edges = np.diff(np.concatenate([[1], flags, [1]]).astype(np.int8))
+        starts, ends = np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+        return [(self.low + int(start), self.low + int(end) - 1) for start, end in zip(starts[:limit], ends[:limit])]
+
+def check_record(record: Any, topic: Optional[str] = None) -> Optional[str]:
+    """Why a decoded message breaks the ``Transaction`` schema, or ``None`` if it is valid"""
+    if not isinstance(record, dict):
+        return "not an object"
+    if record.keys() != _FIELD_SET:
+        missing = sorted(_FIELD_SET - record.keys())
+        return f"missing {missing[0]}" if missing else f"unexpected field {sorted(record.keys() - _FIELD_SET)[0]}"
+    for field in _NOT_NULL:
+        if record[field] is None:
+            return f"null {field}"
+    transaction_type = record["transaction_type"]
+    if type(transaction_type) is not str or transaction_type not in _TYPE_FIELDS:
+        return "unknown transaction_type"
+    if topic is not None and topic != TOPIC_MAPPING[transaction_type]:
+        return f"{transaction_type} on topic {topic}"
+    for field in _TYPE_FIELDS[transaction_type]:
+        if record[field] is None:
+            return f"{transaction_type} without {field}"
+    for field in _UNUSED[transaction_type]:
+        if record[field] is not None:
+            return f"{transaction_type} with {field}"
+    amount = record["amount"]
+    low, high = _AMOUNT_RANGES[transaction_type]
+    if type(amount) not in (int, float) or not low <= amount <= high:
+        return f"{transaction_type} amount out of range"
+    if type(record["transaction_id"]) not in (str, int) or type(record["timestamp"]) is not str:
+        return "bad transaction_id or timestamp type"
+    return None
+
+def parse_timestamps(timestamps: List[str]) -> np.ndarray:
+    """ISO timestamps as int64 microseconds since the naive epoch (-1 where unparseable)"""
+    try:
+        return np.array(timestamps, dtype='datetime64[us]').astype(np.int64)
+    except ValueError:
+        parsed = np.empty(len(timestamps), dtype=np.int64)
+        for i, timestamp in enumerate(timestamps):
+            try:
+                parsed[i] = np.datetime64(timestamp, 'us').astype(np.int64)
+            except ValueError:
+                parsed[i] = -1
+        return parsed
+
+class Verifier:
+    """Checks batches of encoded messages and keeps running totals.
+
+    Each batch is decoded with one ``decode_rows`` call, falling back to
+    message-by-message decoding only when the batch holds a bad payload.
+    Valid transactions are checked for duplicate ``transaction_id`` values
+    with a ``BloomFilter`` (a hit is a probable duplicate). With
+    ``counter_start`` (the generator's ``START_TIME`` in ``COUNTER_MODE``)
+    a ``SequenceBitmap`` stepping by ``counter_step_us`` also counts exact
+    duplicates and missing transactions.
+    """
+
+    def __init__(self, serializer: Serializer, capacity: int = 10_000_000, error_rate: float = 0.001,
+                 counter_start: Optional[datetime] = None, counter_step_us: Optional[int] = None,
+                 max_examples: int = 5):
+        self.serializer = serializer
+        self.ids = BloomFilter(capacity, error_rate)
+        self.sequence = None
+        if counter_start is not None:
+            step_us = config.generator.counter_step_us if counter_step_us is None else counter_step_us
+            self.sequence = SequenceBitmap(to_micros(counter_start), step_us)
+        self.max_examples = max_examples
+        self.messages = 0
+        self.bytes = 0
+        self.valid = 0
+        self.decode_errors = 0
+        self.duplicates = 0
+        self.replayed = 0
+        self.invalid: Counter = Counter()
+        self.types: Counter = Counter()
+        self.examples: List[str] = []
+
+    def _example(self, message: str):
+        if len(self.examples) < self.max_examples:
+            self.examples.append(message)
+
+    def _decode(self, payloads: List[bytes]) -> List[Any]:
+        """Decode a batch, with ``None`` in place of payloads the serializer cannot read"""
+        try:
+            records = self.serializer.decode_rows(payloads)
+            # A payload such as b'1,2' decodes as two array items, so the count must match
+            if len(records) == len(payloads):
+                return records
+        except Exception:
+            pass
+        records = []
+        for offset, payload in enumerate(payloads):
+            try:
+                records.append(self.serializer.decode(payload))
+            except Exception as e:
+                self.decode_errors += 1
+                self._example(f"message {self.messages + offset}: cannot decode ({e.__class__.__name__})")
+                records.append(None)
+        return records
+
+    def add(self, topics: List[Optional[str]], payloads: List[bytes]):
+        """Verify one batch of messages and the topics they were read from"""
+        records = self._decode(payloads)
+        valid = []
+        for offset, (record, topic) in enumerate(zip(records, topics)):
+            if record is None:
+                continue
+            problem = check_record(record, topic)
+            if problem is not None:
+                self.invalid[problem] += 1
+                self._example(f"message {self.messages + offset}: {problem}")
+                continue
+            valid.append(record)
+        timestamps = parse_timestamps([record["timestamp"] for record in valid])
+        if self.sequence is not None:
+            early = timestamps < self.sequence.start_us
+        else:
+            early = timestamps < 0
+        if early.any():
+            problem = "timestamp before counter start" if self.sequence is not None else "bad timestamp"
+            self.invalid[problem] += int(early.sum())
+            self._example(f"{problem}: {valid[int(np.argmax(early))]['timestamp']!r}")
+            valid = [record for record, bad in zip(valid, early.tolist()) if not bad]
+            timestamps = timestamps[~early]
+
+        if valid:
+            duplicates = self.ids.add([record["transaction_id"] for record in valid])
+            self.duplicates += int(duplicates.sum())
+            if self.sequence is not None:
+                self.replayed += int(self.sequence.add(timestamps).sum())
+            self.types.update(record["transaction_type"] for record in valid)
+        self.messages += len(payloads)
+        self.bytes += sum(map(len, payloads))
+        self.valid += len(valid)
+
+    @property
+    def problems(self) -> int:
+        """Messages that failed any check, plus transactions that never arrived"""
+        missing = self.sequence.missing if self.sequence is not None else 0
+        return self.decode_errors + sum(self.invalid.values()) + self.duplicates + self.replayed + missing
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "valid": self.valid,
+            "decode_errors": self.decode_errors,
+            "invalid": dict(self.invalid),
+            "duplicates": self.duplicates,
+            "types": dict(self.types),
+            "examples": list(self.examples),
+        }
+        if self.sequence is not None:
+            summary.update(replayed=self.replayed, missing=self.sequence.missing,
+                           missing_ranges=self.sequence.missing_ranges(),
+                           positions=(self.sequence.low, self.sequence.high))
+        return summary
+
+    def log_summary(self, elapsed: float):
+        rate = self.messages / elapsed if elapsed > 0 else 0.0
+        line = (f"Verified {self.messages:,} messages ({rate:,.0f}/s): {self.valid:,} valid, "
+                f"{sum(self.invalid.values()):,} invalid, {self.decode_errors:,} undecodable, "
+                f"{self.duplicates:,} duplicate IDs")
+        if self.sequence is not None:
+            line += f", {self.replayed:,} replayed and {self.sequence.missing:,} missing positions"
+        logger.info(line)
+
+    def run(self, batches: Iterable[Tuple[List[Optional[str]], List[bytes]]], seconds: Optional[float] = None,
+            max_messages: Optional[int] = None, summary_interval: float = 10.0) -> Dict[str, Any]:
+        """Verify ``batches`` until they run out, ``seconds`` pass or ``max_messages`` are read"""
+        started = time.monotonic()
+        last_summary = started
+        for topics, payloads in batches:
+            if payloads:
+                self.add(topics, payloads)
+            now = time.monotonic()
+            if now - last_summary >= summary_interval:
+                self.log_summary(now - started)
+                last_summary = now
+            if (seconds is not None and now - started >= seconds) or \
+                    (max_messages is not None and self.messages >= max_messages):
+                break
+        self.log_summary(time.monotonic() - started)
+        summary = self.summary()
+        for reason, count in sorted(summary["invalid"].items(), key=lambda item: -item[1]):
+            logger.info(f"  {count:,} x {reason}")
+        for example in summary["examples"]:
+            logger.info(f"  e.g. {example}")
+        for first, last in summary.get("missing_ranges", []):
+            logger.info(f"  missing positions {first}-{last}")
+        return summary
+
+def build_consumer_config(group_id: Optional[str] = None, bootstrap_servers: Optional[str] = None) -> Dict[str, Any]:
+    """librdkafka settings for reading whole topics quickly without committing offsets"""
+    return {
+        'bootstrap.servers': bootstrap_servers or config.kafka.bootstrap_servers,
+        # A fresh group per run reads every topic from the beginning
+        'group.id': group_id or f"txn-verify-{os.getpid()}-{int(time.time())}",
+        'auto.offset.reset': 'earliest',
+        'enable.auto.commit': False,
+        # Larger fetches and a deeper prefetch queue keep consume() batches full
+        'fetch.min.bytes': 1048576,
+        'fetch.wait.max.ms': 100,
+        'queued.max.messages.kbytes': 262144,
+    }
+
+def kafka_batches(consumer, batch_size: int = 10000, timeout: float = 1.0,
+                  idle_seconds: Optional[float] = None) -> Iterator[Tuple[List[str], List[bytes]]]:
+    """Batches from ``consumer.consume``, ending after ``idle_seconds`` without messages.
+
+    Empty batches are yielded while waiting so the caller can keep time.
+    """
+    idle_since = time.monotonic()
+    while True:
+        topics, payloads = [], []
+        for message in consumer.consume(num_messages=batch_size, timeout=timeout):
+            if message.error() is not None:
+                logger.warning(f"Consumer error: {message.error()}")
+                continue
+            topics.append(message.topic())
+            payloads.append(message.value())
+        if payloads:
+            idle_since = time.monotonic()
+        elif idle_seconds is not None and time.monotonic() - idle_since >= idle_seconds:
+            return
+        yield topics, payloads
+
+def segment_batches(directory: str, batch_size: int = 10000) -> Iterator[Tuple[List[str], List[bytes]]]:
+    """Batches from a segment log, as written by the file sink or ``src.replay record``"""
+    topics, payloads = [], []
+    for record in SegmentReader(directory).read():
+        topics.append(record.topic)
+        payloads.append(bytes(record.value))
+        if len(payloads) == batch_size:
+            yield topics, payloads
+            topics, payloads = [], []
+    if payloads:
+        yield topics, payloads
+
+def main():
+    """Consume produced topics (or a segment log) and report schema errors, duplicates and gaps"""
+    from .serializers import SERIALIZERS
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Verify produced transactions in bulk")
+    parser.add_argument("--topics", nargs="+", default=config.kafka.topics, help="topics to read")
+    parser.add_argument("--bootstrap-servers", default=config.kafka.bootstrap_servers, help="Kafka brokers")
+    parser.add_argument("--group", default=None, help="consumer group (default: a new group per run)")
+    parser.add_argument("--segments", help="verify a segment log directory instead of Kafka")
+    parser.add_argument("--serializer", choices=sorted(SERIALIZERS), default=config.kafka.serializer,
+                        help="message encoding (default SERIALIZER)")
+    parser.add_argument("--registry", default=config.kafka.schema_registry_path, help="local schema registry file")
+    parser.add_argument("--batch-size", type=int, default=10000, help="messages per consume() call")
+    parser.add_argument("--seconds", type=float, default=None, help="stop after this long")
+    parser.add_argument("--max-messages", type=int, default=None, help="stop after this many messages")
+    parser.add_argument("--idle-seconds", type=float, default=10.0, help="stop after this long without messages")
+    parser.add_argument("--summary-interval", type=float, default=10.0, help="seconds between summaries")
+    parser.add_argument("--capacity", type=int, default=10_000_000, help="transaction IDs the bloom filter is sized for")
+    parser.add_argument("--error-rate", type=float, default=0.001, help="bloom filter false-positive rate")
+    parser.add_argument("--counter-start", nargs="?", const=config.generator.start_time, default=None,
+                        help="check for gaps in a COUNTER_MODE stream starting at this time (default START_TIME)")
+    parser.add_argument("--counter-step-us", type=int, default=config.generator.counter_step_us,
+                        help="counter-mode timestamp step (default GENERATOR_COUNTER_STEP_US)")
+    args = parser.parse_args()
+
+    verifier = Verifier(create_serializer(args.serializer, args.registry), capacity=args.capacity,
+                        error_rate=args.error_rate,
+                        counter_start=datetime.fromisoformat(args.counter_start) if args.counter_start else None,
+                        counter_step_us=args.counter_step_us)
+    if args.segments:
+        summary = verifier.run(segment_batches(args.segments, args.batch_size), seconds=args.seconds,
+                               max_messages=args.max_messages, summary_interval=args.summary_interval)
+    else:
+        from confluent_kafka import Consumer
+
+        consumer = Consumer(build_consumer_config(args.group, args.bootstrap_servers))
+        consumer.subscribe(args.topics)
+        try:
+            summary = verifier.run(kafka_batches(consumer, args.batch_size, idle_seconds=args.idle_seconds),
+                                   seconds=args.seconds, max_messages=args.max_messages,
+                                   summary_interval=args.summary_interval)
+        finally:
+            consumer.close()
+    raise SystemExit(1 if verifier.problems or not summary["messages"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for historical backfill planning and execution
+"""
+
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.backfill import plan_shards, run_backfill
+from src.config import config
+from src.scheduler import parse_rate_profile
+from src.timestamps import to_micros
+
+START, END = datetime(2024, 1, 1), datetime(2024, 1, 2, 12)
+
+def read_dataset(directory):
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            files[name] = [json.loads(line) for line in f]
+    return files
+
+def test_plan_shards():
+    """Test that shard volumes follow the requested total, daily volume or profile"""
+    print("=== Testing Shard Planning ===")
+    shards = plan_shards(START, END, 3600, per_day=100000)
+    assert len(shards) == 36 and sum(shard.count for shard in shards) == 150000
+    assert shards[0].start_us == to_micros(START) and shards[-1].end_us == to_micros(END)
+    assert all(a.end_us == b.start_us for a, b in zip(shards, shards[1:]))
+
+    uneven = plan_shards(START, datetime(2024, 1, 1, 2, 30), 3600, total=1001)
+    assert [shard.count for shard in uneven] == [400, 401, 200]
+
+    diurnal = parse_rate_profile("diurnal:peak=10,trough=0,period=86400,peak_at=43200")
+    shaped = plan_shards(START, datetime(2024, 1, 2), 3600, total=24000, profile=diurnal)
+    counts = [shard.count for shard in shaped]
+    assert sum(counts) == 24000 and counts.index(max(counts)) in (11, 12) and counts[0] < counts[12] / 20
+    print(f"✅ Diurnal shards: {counts[0]} at midnight, {max(counts)} at noon")
+
+    for bad in (dict(per_day=10, end=START), dict(per_day=10, shard_seconds=0), dict()):
+        try:
+            plan_shards(START, bad.pop("end", END), bad.pop("shard_seconds", 3600), **bad)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+    print("✅ Shards tile the range and counts add up exactly")
+
+def test_backfill_files():
+    """Test per-shard files with monotonic in-range timestamps, reproducible across worker counts"""
+    print("\n=== Testing File Backfill ===")
+    shards = plan_shards(START, datetime(2024, 1, 1, 6), 3600, total=6000)
+    with tempfile.TemporaryDirectory() as serial, tempfile.TemporaryDirectory() as parallel:
+        options = dict(batch_size=700, seed=99, format="ndjson", compression="none")
+        summary = run_backfill(shards, workers=0, output=serial, **options)
+        assert summary["rows"] == 6000 and summary["failed"] == 0
+        files = read_dataset(serial)
+        assert len(files) == 6
+        for shard, (name, rows) in zip(shards, files.items()):
+            assert name.startswith(f"transactions-{shard.label}") and len(rows) == shard.count
+            stamps = [to_micros(datetime.fromisoformat(row['timestamp'])) for row in rows]
+            assert stamps == sorted(stamps)
+            assert shard.start_us <= stamps[0] and stamps[-1] < shard.end_us
+        print(f"✅ {len(files)} shard files, timestamps monotonic within each shard")
+
+        run_backfill(shards, workers=2, output=parallel, **options)
+        assert read_dataset(parallel) == files
+    print("✅ Two worker processes write the same dataset as one")
+
+def test_backfill_sink():
+    """Test backfilling through the producer to a broker-free sink"""
+    print("\n=== Testing Sink Backfill ===")
+    shards = plan_shards(START, END, 6 * 3600, per_day=4000)
+    summary = run_backfill(shards, workers=0, batch_size=1000, sink="null")
+    assert summary["rows"] == 6000 and summary["failed"] == 0 and summary["shards"] == 6
+    print(f"✅ {summary['rows']} rows at {summary['rows_per_sec']:,.0f} rows/s")
+
+    # Worker producers never open the spill journal, which they would otherwise share
+    saved = (config.spill.enabled, config.spill.path)
+    with tempfile.TemporaryDirectory() as tmp:
+        config.spill.enabled, config.spill.path = True, os.path.join(tmp, "spill")
+        try:
+            summary = run_backfill(shards, workers=2, batch_size=1000, sink="null")
+        finally:
+            config.spill.enabled, config.spill.path = saved
+        assert summary["rows"] == 6000 and summary["failed"] == 0
+        assert not os.path.exists(os.path.join(tmp, "spill"))
+    print("✅ Backfill workers ignore SPILL_ENABLED")
+
+def test_backfill_snowflake_ids():
+    """Test that backfill worker processes get distinct snowflake worker IDs"""
+    print("\n=== Testing Backfill Snowflake IDs ===")
+    shards = plan_shards(START, datetime(2024, 1, 1, 8), 3600, total=40000)
+    saved = (config.generator.id_scheme, config.generator.id_worker_id)
+    config.generator.id_scheme, config.generator.id_worker_id = "snowflake", 1022
+    try:
+        with tempfile.TemporaryDirectory() as output:
+            # Small batches have both workers minting IDs within the same milliseconds
+            run_backfill(shards, workers=2, batch_size=200, output=output, format="ndjson", compression="none")
+            ids = [row["transaction_id"] for rows in read_dataset(output).values() for row in rows]
+        try:
+            run_backfill(shards, workers=3, output=output, format="ndjson", compression="none")
+            assert False, "worker IDs past 1023 were accepted"
+        except ValueError as e:
+            print(f"✅ Rejected: {e}")
+    finally:
+        config.generator.id_scheme, config.generator.id_worker_id = saved
+    assert len(ids) == 40000
+    duplicates = len(ids) - len(set(ids))
+    assert duplicates == 0, f"{duplicates} duplicate IDs"
+    print(f"✅ {len(ids)} IDs from two workers, no duplicates")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Backfill Test")
+    print("=" * 60)
+
+    test_plan_shards()
+    test_backfill_files()
+    test_backfill_sink()
+    test_backfill_snowflake_ids()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar batch engine of the transaction generator
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data_generator import TransactionGenerator, Transaction, TransactionView, TRANSACTION_FIELDS
+from src.value_pools import ValuePools
+
+def test_batch_columns():
+    """Test that a batch has consistent columns and per-type fields"""
+    print("=== Testing Batch Columns ===")
+    generator = TransactionGenerator()
+    batch = generator.generate_batch(500)
+
+    assert len(batch) == 500
+    transactions = batch.to_dicts()
+    assert all(tuple(txn.keys()) == TRANSACTION_FIELDS for txn in transactions)
+
+    for txn in transactions:
+        txn_type = txn['transaction_type']
+        assert (txn['sender_account'] is not None) == (txn_type == 'IBFT')
+        assert (txn['merchant_id'] is not None) == (txn_type == 'QR')
+        assert (txn['wallet_id'] is not None) == (txn_type == 'TOPUP')
+        assert isinstance(txn['amount'], float)
+
+    print(f"✅ {len(transactions)} transactions with consistent fields")
+
+def test_timestamps_sequential():
+    """Test that timestamps keep increasing across batches"""
+    print("\n=== Testing Sequential Timestamps ===")
+    generator = TransactionGenerator()
+    first = generator.generate_transactions(50)
+    second = generator.generate_transactions(50)
+
+    timestamps = [txn['timestamp'] for txn in first + second]
+    assert timestamps == sorted(timestamps)
+    assert len(set(txn['transaction_id'] for txn in first + second)) == 100
+    print(f"✅ Timestamps increase from {timestamps[0]} to {timestamps[-1]}")
+
+def test_fixed_type_batch():
+    """Test generating a batch of a single transaction type"""
+    print("\n=== Testing Fixed Type Batch ===")
+    generator = TransactionGenerator()
+    batch = generator.generate_batch(20, transaction_type='QR')
+
+    assert set(batch.transaction_type.tolist()) == {'QR'}
+    assert all(5000 <= amount <= 2000000 for amount in batch.amount.tolist())
+    print("✅ QR batch generated with QR amount range")
+
+def test_record_views():
+    """Test that records are compact tuples readable through a mapping view"""
+    print("\n=== Testing Record Views ===")
+    generator = TransactionGenerator()
+    txn = generator.generate_views(1, 'TOPUP')[0]
+
+    assert isinstance(txn, TransactionView)
+    assert isinstance(txn.record, Transaction)
+    assert txn['transaction_type'] == 'TOPUP'
+    assert txn.get('merchant_id') is None and txn.get('missing', 'n/a') == 'n/a'
+    assert txn.to_dict() == dict(txn.items()) == txn.record.to_dict()
+    assert not hasattr(txn.record, '__dict__')
+    print("✅ Records support key access without a dict")
+
+    # The single and list helpers keep returning plain, JSON-serializable dicts
+    assert type(generator.generate_topup_wallet_transaction()) is dict
+    assert json.loads(json.dumps(generator.generate_transactions(2)))[0].keys() == set(TRANSACTION_FIELDS)
+    print("✅ generate_transactions returns plain dicts")
+
+def test_value_pools():
+    """Test pooled and unpooled Faker value sampling"""
+    print("\n=== Testing Value Pools ===")
+    pools = ValuePools(pool_size=50)
+    ips = pools.values('ip_address', 1000)
+    assert len(ips) == 1000
+    assert set(ips) <= set(pools.pools['ip_address'].tolist())
+
+    before = pools.pools
+    pools.refresh()
+    assert pools.pools is not before
+
+    unpooled = ValuePools(pool_size=0)
+    assert not unpooled.pools
+    assert len(unpooled.values('user_agent', 5)) == 5
+    print("✅ Pools sample by index and refresh atomically")
+
+def test_seeded_helpers():
+    """Test that the per-record helpers follow the generator seed"""
+    print("\n=== Testing Seeded Helpers ===")
+    def draws(generator):
+        return (generator.get_random_user(), generator.generate_account_number(),
+                generator.generate_amount(), generator.generate_location())
+    first = TransactionGenerator(seed=31, pool_refresh_interval=0)
+    second = TransactionGenerator(seed=31, pool_refresh_interval=0)
+    assert [draws(first) for _ in range(20)] == [draws(second) for _ in range(20)]
+    assert not hasattr(first, 'fake')
+    first.close()
+    second.close()
+    print("✅ Users, pooled values, amounts and locations repeat under a seed")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Batch Generation Test")
+    print("=" * 60)
+
+    test_batch_columns()
+    test_timestamps_sequential()
+    test_fixed_type_batch()
+    test_record_views()
+    test_value_pools()
+    test_seeded_helpers()
+
+    generator = TransactionGenerator()
+    start = time.perf_counter()
+    generator.generate_batch(100000)
+    elapsed = time.perf_counter() - start
+    print(f"\nGenerated 100000 transactions in {elapsed:.2f}s ({100000 / elapsed:,.0f}/s)")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline benchmark suite
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.sinks import NullSink
+from src.benchmark import run_benchmarks, compare_results
+from src.producer import TransactionProducer
+from src.data_generator import TransactionGenerator
+
+def test_in_memory_producer():
+    """Test that the producer runs end to end against the in-memory stand-in"""
+    print("=== Testing In-Memory Producer ===")
+    sink = NullSink(keep_messages=True)
+    producer = TransactionProducer(producer=sink)
+    sent = producer.send_transactions_batch(TransactionGenerator(seed=1).generate_transactions(100))
+    producer.close()
+
+    assert sent == 100 and sink.count == 100
+    assert producer.delivered == 100 and producer.in_flight == 0
+    assert {topic for topic, _, _ in sink.messages} <= {'IBFT', 'qr_payments', 'topup_wallet'}
+    print(f"✅ {sink.count} messages, {sink.bytes} bytes")
+
+def test_run_benchmarks():
+    """Test that the suite produces a result per stage and flags regressions"""
+    print("\n=== Testing Benchmark Suite ===")
+    results = run_benchmarks(count=200, repeat=1, stages=['generate.batch', 'encode.json', 'produce'])
+    stages = [result['stage'] for result in results]
+    assert 'generate.batch.mixed' in stages and 'produce.send_transactions_batch' in stages
+    assert all(result['items_per_sec'] > 0 for result in results)
+
+    baseline = {"results": [dict(result, items_per_sec=result['items_per_sec'] * 2) for result in results]}
+    regressions = compare_results(baseline, {"results": results}, threshold=0.2)
+    assert len(regressions) == len(results)
+    print(f"✅ {len(results)} stages measured")
+
+def test_seed_is_reproducible():
+    """Test that a fixed seed reproduces the same transactions"""
+    print("\n=== Testing Fixed Seed ===")
+    first = TransactionGenerator(seed=7).generate_batch(50)
+    second = TransactionGenerator(seed=7).generate_batch(50)
+    assert first.transaction_id == second.transaction_id
+    assert first.amount.tolist() == second.amount.tolist()
+    assert first.customer_name.tolist() == second.customer_name.tolist()
+    print("✅ Same seed, same transactions")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Benchmark Suite Test")
+    print("=" * 60)
+
+    test_in_memory_producer()
+    test_run_benchmarks()
+    test_seed_is_reproducible()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the runtime control API
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.config import config
+from src.control import ControlServer, ControlState, Settings
+from src.main import TransactionSimulator
+from src.metrics import REGISTRY
+
+def request(port, method, path, body=None):
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+def test_atomic_updates():
+    """Test that updates validate fully before swapping in a new snapshot"""
+    print("=== Testing Settings Updates ===")
+    state = ControlState(Settings(), fixed={"key_strategy": "not here"})
+    before = state.settings
+    updated = state.update({"rate": 2500, "type_mix": {"IBFT": 3, "QR": 1}})
+    assert updated.version == 1 and updated.rate == 2500 and updated.type_mix == "weights:3.0,1.0,0.0"
+    assert before.rate is None and before.version == 0
+    shares = updated.type_shares()
+    assert abs(shares["IBFT"] - 0.75) < 1e-9 and shares["TOPUP"] == 0
+
+    for bad in ({"batch_size": 500, "rate": -1}, {"batch_size": 2.5}, {"paused": "yes"},
+                {"key_strategy": "sender_account"}, {"type_mix": {"WIRE": 1}}, {"colour": "red"}, [1, 2]):
+        try:
+            state.update(bad)
+            assert False, f"accepted {bad}"
+        except ValueError as e:
+            print(f"Rejected {bad}: {e}")
+    assert state.settings is updated
+    print("✅ Invalid requests leave the snapshot untouched")
+
+def test_http_api():
+    """Test the HTTP routes"""
+    print("\n=== Testing Control HTTP API ===")
+    state = ControlState(Settings(batch_size=100))
+    server = ControlServer(state, 0, host='127.0.0.1')
+    server.start()
+    try:
+        assert request(server.port, "GET", "/settings") == (200, Settings(batch_size=100).to_dict())
+        assert request(server.port, "PUT", "/settings/batch-size", 2000) == (200, {"batch_size": 2000})
+        status, body = request(server.port, "PUT", "/settings", {"rate": 1000, "paused": True})
+        assert status == 200 and body["rate"] == 1000 and body["paused"] and body["version"] == 2
+        assert request(server.port, "POST", "/resume")[1]["paused"] is False
+        assert request(server.port, "GET", "/settings/paused") == (200, {"paused": False})
+        assert request(server.port, "PUT", "/settings/rate", 0)[0] == 400
+        assert request(server.port, "PUT", "/settings/version", 9)[0] == 400
+        assert request(server.port, "GET", "/settings/colour")[0] == 404
+        assert request(server.port, "DELETE", "/settings")[0] == 405
+        assert state.settings.version == 3
+    finally:
+        server.stop()
+    print("✅ GET/PUT per setting and for the whole snapshot")
+
+def test_running_simulator():
+    """Test that changes reach a running simulator and its metrics"""
+    print("\n=== Testing Live Changes ===")
+    saved = (config.sink.type, config.metrics.port, config.transaction.min_interval,
+             config.transaction.max_interval, config.transaction.rate_profile)
+    config.sink.type, config.metrics.port = "null", 0
+    config.transaction.min_interval = config.transaction.max_interval = 0.01
+    config.transaction.rate_profile = ""
+    simulator = TransactionSimulator()
+    sink = simulator.producer.producer
+    sink.keep_messages = True
+    thread = threading.Thread(target=simulator.start)
+    thread.start()
+    try:
+        wait_for(lambda: sink.count > 0)
+        simulator.control.update({"type_mix": {"IBFT": 1}, "batch_size": 37})
+        wait_for(lambda: simulator.settings.version == 1)
+        start = sink.count
+        wait_for(lambda: sink.count >= start + 74 * 3)
+        recent = sink.messages[start + 74:]
+        assert {topic for topic, _, _ in recent} == {"IBFT"}
+        assert 'txn_control_batch_size 37' in REGISTRY.render()
+        print(f"✅ Type mix and batch size applied after {start} messages")
+
+        simulator.control.update({"paused": True})
+        wait_for(lambda: simulator.settings.paused)
+        count = sink.count
+        time.sleep(0.3)
+        assert sink.count == count and 'txn_control_paused 1' in REGISTRY.render()
+        simulator.control.update({"paused": False, "rate": 5000})
+        wait_for(lambda: sink.count > count and simulator.scheduler is not None)
+        assert simulator.scheduler.target_rate() == 5000
+        print(f"✅ Paused at {count} messages, resumed with pacing at 5000/s")
+
+        rng = simulator.producer.key_strategy.rng
+        version = simulator.settings.version
+        simulator.control.update({"key_strategy": "sender_account", "hot_key_share": 0.1})
+        wait_for(lambda: simulator.settings.version > version)
+        assert simulator.producer.key_strategy.field == "sender_account"
+        assert simulator.producer.key_strategy.rng is rng
+        print("✅ Key strategy swapped without restarting its hot-key stream")
+    finally:
+        simulator.running = False
+        thread.join(timeout=10)
+        (config.sink.type, config.metrics.port, config.transaction.min_interval,
+         config.transaction.max_interval, config.transaction.rate_profile) = saved
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Control API Test")
+    print("=" * 60)
+
+    test_atomic_updates()
+    test_http_api()
+    test_running_simulator()
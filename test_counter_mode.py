@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for counter-based (seekable, shardable) generation
+"""
+
+import sys
+import os
+from datetime import datetime
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.config import config
+from src.data_generator import TransactionGenerator, shard_indices
+from src.timestamps import to_micros
+
+def make_generator(**kwargs):
+    return TransactionGenerator(seed=2024, counter_mode=True, pool_refresh_interval=0, **kwargs)
+
+def test_random_access():
+    """Test that any index regenerates identically, independent of history"""
+    print("=== Testing Random Access ===")
+    generator = make_generator()
+    stream = generator.generate_range(0, 1000).views()
+    for index in (0, 1, 517, 999):
+        assert generator.generate_at(index) == stream[index]
+    middle = generator.generate_range(400, 20).views()
+    assert middle == stream[400:420]
+
+    other = make_generator()
+    other.generate_batch(123)  # Advancing one generator does not affect another's indices
+    assert other.generate_at(517) == stream[517]
+    generator.close()
+    other.close()
+    print("✅ Transaction N depends only on (seed, N)")
+
+def test_sequential_batches():
+    """Test that consecutive batches continue the stream and timestamps increase"""
+    print("\n=== Testing Sequential Batches ===")
+    generator = make_generator()
+    full = generator.generate_range(0, 300)
+    parts = [generator.generate_batch(100) for _ in range(3)]
+    assert sum((p.transaction_id for p in parts), []) == full.transaction_id
+    assert np.all(np.diff(full.timestamp_us) > 0)
+    assert len(set(full.transaction_id)) == 300
+
+    generator.seek(150)
+    assert generator.generate_batch(1).transaction_id == full.transaction_id[150:151]
+    generator.close()
+    print("✅ Batches are contiguous, seekable and time-ordered")
+
+def test_sharding():
+    """Test that shards partition the stream without overlap"""
+    print("\n=== Testing Shards ===")
+    positions = np.arange(10)
+    assert shard_indices(positions, 1, 3, block=4).tolist() == [4, 5, 6, 7, 16, 17, 18, 19, 28, 29]
+
+    shards = [make_generator(shard_index=k, shard_count=3) for k in range(3)]
+    # Each shard's first block is one of the first three blocks of the stream
+    seen = []
+    for shard in shards:
+        seen.extend(shard.generate_batch(4096).transaction_id)
+    assert len(set(seen)) == len(seen) == 3 * 4096
+    assert seen == shards[0].generate_range(0, 3 * 4096).transaction_id
+    for shard in shards:
+        shard.close()
+    print("✅ Shards partition the stream")
+
+def test_counter_step():
+    """Test a configured timestamp step and the rejection of offsets past datetime.max"""
+    print("\n=== Testing Counter Step ===")
+    generator = make_generator(start_time=datetime(2024, 1, 1), counter_step_us=1000)
+    stamps = generator.generate_range(0, 1000).timestamp_us - to_micros(datetime(2024, 1, 1))
+    assert np.array_equal(stamps // 1000, np.arange(1000))
+    last = generator.generate_at(generator.last_index)
+    assert last["timestamp"].startswith("9999-12-31T23:59:59.99")
+    try:
+        generator.generate_range(generator.last_index, 2)
+        assert False, "index past datetime.max was generated"
+    except ValueError:
+        pass
+    generator.close()
+
+    saved = config.generator.start_offset
+    config.generator.start_offset = 10 ** 12
+    try:
+        make_generator()
+        assert False, "start offset past datetime.max was accepted"
+    except ValueError as e:
+        print(f"✅ Rejected at construction: {e}")
+    finally:
+        config.generator.start_offset = saved
+    try:
+        make_generator(counter_step_us=0)
+        assert False, "zero step was accepted"
+    except ValueError:
+        pass
+    print("✅ Timestamps follow the configured step up to datetime.max")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Counter Mode Test")
+    print("=" * 60)
+
+    test_random_access()
+    test_sequential_batches()
+    test_sharding()
+    test_counter_step()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-process generation over shared-memory rings
+"""
+
+import sys
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.sinks import NullSink
+from src.data_generator import TransactionGenerator
+from src.fanout import FanoutGenerator, RingBuffer, pack_messages, unpack_messages, worker_generator
+from src.producer import TransactionProducer
+
+def test_ring_buffer():
+    """Test packing, wrap-around and backpressure on a full ring"""
+    print("=== Testing Ring Buffer ===")
+    topics = ['IBFT', 'qr_payments', 'topup_wallet']
+    ring = RingBuffer(slot_count=2, slot_bytes=256)
+    try:
+        payloads = list(pack_messages([0, 1, 2], [b'a', b'bb', b'ccc'], [b'x' * 100, b'y' * 100, b'z'], 200))
+        assert [count for _, count in payloads] == [1, 2]
+        for round_ in range(3):  # Wraps around the two slots
+            for payload, count in payloads:
+                assert ring.write(payload, count)
+            first = ring.read()
+            second = ring.read()
+            assert ring.read() is None
+            messages = unpack_messages(first[1], first[0], topics) + unpack_messages(second[1], second[0], topics)
+            assert messages == [('IBFT', b'x' * 100, b'a'), ('qr_payments', b'y' * 100, b'bb'),
+                                ('topup_wallet', b'z', b'ccc')]
+
+        # A full ring blocks the writer until the reader frees a slot
+        ring.write(*payloads[0])
+        ring.write(*payloads[0])
+        stop = threading.Event()
+        stop.set()
+        assert not ring.write(*payloads[0], stop_event=stop)
+        assert ring.stalls == 1
+        threading.Timer(0.05, ring.read).start()
+        assert ring.write(*payloads[0])
+        assert ring.used() == 2
+    finally:
+        ring.close()
+    print("✅ Ring wraps and applies backpressure")
+
+def test_fanout_workers():
+    """Test that workers deliver disjoint shards of one seeded stream"""
+    print("\n=== Testing Fan-out Workers ===")
+    fanout = FanoutGenerator(workers=2, batch_size=500, seed=99, slot_count=4, slot_bytes=256 * 1024)
+    sink = NullSink(keep_messages=True)
+    producer = TransactionProducer(producer=sink)
+    fanout.start()
+    try:
+        while len(sink.messages) < 3000:
+            batch = fanout.next_batch(timeout=60.0)
+            assert len(batch) > 0, "workers produced nothing"
+            producer.send_encoded(batch)
+        stats = fanout.stats()
+    finally:
+        fanout.stop()
+    print(f"Received {len(sink.messages)} messages, worker stats: {stats}")
+
+    keys = [key.decode() for _, key, _ in sink.messages]
+    assert len(set(keys)) == len(keys)
+    # Each worker's first block comes from the first two blocks of the seeded stream
+    reference = TransactionGenerator(seed=99, counter_mode=True, pool_refresh_interval=0)
+    expected = set(reference.generate_range(0, 2 * 4096).transaction_id)
+    reference.close()
+    assert set(keys) <= expected
+    topic, key, value = sink.messages[0]
+    assert json.loads(value)['transaction_id'] == key.decode()
+    print("✅ Workers fill the producer without overlap")
+
+def test_fanout_timestamps():
+    """Test that worker timestamps start at the wall clock and advance at the target rate"""
+    print("\n=== Testing Fan-out Timestamps ===")
+    fanout = FanoutGenerator(workers=2, batch_size=500, seed=7, slot_count=4, slot_bytes=256 * 1024)
+    assert fanout.step_us == 1 and FanoutGenerator(1, 500, rate=2000).step_us == 500
+    sink = NullSink(keep_messages=True)
+    producer = TransactionProducer(producer=sink)
+    fanout.start()
+    try:
+        while len(sink.messages) < 20000:
+            producer.send_encoded(fanout.next_batch(timeout=60.0))
+    finally:
+        fanout.stop()
+    stamps = [datetime.fromisoformat(json.loads(value)['timestamp']) for _, _, value in sink.messages]
+    # Unpaced, 1us per message trails the wall clock
+    assert fanout.start_time <= min(stamps) and max(stamps) <= datetime.now()
+    print(f"✅ {len(stamps)} timestamps between {min(stamps)} and {max(stamps)}")
+
+    # Two billion messages at 1000/s are stamped about 23 days on, not past datetime.max
+    generator = worker_generator(7, 1, 2, fanout.start_time, 1000)
+    generator.seek(10 ** 9)
+    stamp = datetime.fromisoformat(generator.generate_batch(1).views()[0]['timestamp'])
+    generator.close()
+    elapsed = stamp - fanout.start_time
+    assert abs(elapsed - timedelta(seconds=2 * 10 ** 9 / 1000)) < timedelta(seconds=10)
+    print(f"✅ Message 2e9 at 1000 msgs/s is stamped {elapsed} after the start")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Fan-out Test")
+    print("=" * 60)
+
+    test_ring_buffer()
+    test_fanout_workers()
+    test_fanout_timestamps()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the NDJSON, Parquet and Arrow file sinks
+"""
+
+import sys
+import os
+import gzip
+import json
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data_generator import TransactionGenerator
+from src.file_sinks import FILE_FORMATS, create_file_sink, zstandard
+
+def read_ndjson(paths):
+    rows = []
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+def test_ndjson_rolling():
+    """Test NDJSON round trips, size-based rolling and sequence resume"""
+    print("=== Testing NDJSON Sinks ===")
+    generator = TransactionGenerator(seed=41, pool_refresh_interval=0)
+    batches = [generator.generate_batch(2000) for _ in range(5)]
+    expected = [row for batch in batches for row in batch.to_dicts()]
+
+    for compression in ("none", "gzip"):
+        with tempfile.TemporaryDirectory() as tmp:
+            with create_file_sink("ndjson", tmp, compression, roll_bytes=600 * 1024) as sink:
+                for batch in batches:
+                    sink.write_batch(batch)
+            assert sink.rows == 10000 and len(sink.files) > 1
+            assert sorted(os.listdir(tmp)) == sorted(os.path.basename(path) for path in sink.files)
+            assert read_ndjson(sink.files) == expected
+            print(f"✅ {compression}: {len(sink.files)} files, {sink.bytes_written:,} bytes")
+
+            # A second sink continues the numbering instead of overwriting
+            with create_file_sink("ndjson", tmp, compression) as again:
+                again.write_batch(batches[0])
+            assert again.files[0] not in sink.files
+            assert read_ndjson(sink.files + again.files) == expected + batches[0].to_dicts()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with create_file_sink("ndjson", tmp, "none", roll_seconds=1e-9) as sink:
+            for batch in batches:
+                sink.write_batch(batch)
+        assert len(sink.files) == len(batches)
+    print("✅ Files roll by size and time")
+
+    # Without a codec, NDJSON works on a clean install by falling back to gzip
+    with tempfile.TemporaryDirectory() as tmp:
+        with create_file_sink("ndjson", tmp) as sink:
+            sink.write_batch(batches[0])
+        assert sink.compression == ("zstd" if zstandard is not None else "gzip")
+        if zstandard is None:
+            assert read_ndjson(sink.files) == batches[0].to_dicts()
+    generator.close()
+    print(f"✅ Default NDJSON codec: {sink.compression}")
+
+def test_optional_formats():
+    """Test zstd NDJSON, Parquet and Arrow IPC where their packages are installed"""
+    print("\n=== Testing Optional Formats ===")
+    generator = TransactionGenerator(seed=42, pool_refresh_interval=0)
+    batches = [generator.generate_batch(3000) for _ in range(4)]
+    generator.close()
+    expected = [row for batch in batches for row in batch.to_dicts()]
+
+    for format, compression in (("ndjson", "zstd"), ("parquet", "zstd"), ("arrow", "lz4")):
+        with tempfile.TemporaryDirectory() as tmp:
+            options = {} if format == "ndjson" else {"row_group_rows": 5000}
+            try:
+                sink = create_file_sink(format, tmp, compression, **options)
+            except ImportError as e:
+                print(f"Skipping {format}/{compression}: {e}")
+                continue
+            with sink:
+                for batch in batches:
+                    sink.write_batch(batch)
+            if format == "ndjson":
+                import zstandard
+                with open(sink.files[0], 'rb') as f:
+                    data = zstandard.ZstdDecompressor().stream_reader(f).read()
+                rows = [json.loads(line) for line in data.splitlines()]
+            else:
+                import pyarrow.feather
+                import pyarrow.parquet
+                path = sink.files[0]
+                table = pyarrow.parquet.read_table(path) if format == "parquet" else pyarrow.feather.read_table(path)
+                if format == "parquet":
+                    sizes = [pyarrow.parquet.ParquetFile(path).metadata.row_group(i).num_rows
+                             for i in range(pyarrow.parquet.ParquetFile(path).metadata.num_row_groups)]
+                    assert sizes == [5000, 5000, 2000], sizes
+                rows = table.to_pylist()
+                for row in rows:
+                    row['timestamp'] = row['timestamp'].isoformat()
+            assert rows == expected
+            print(f"✅ {format}/{compression} round trip OK")
+
+    for format in FILE_FORMATS:
+        try:
+            create_file_sink(format, tempfile.gettempdir(), "brotli-9")
+            assert False, f"{format} accepted an unknown codec"
+        except (ValueError, ImportError):
+            pass
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - File Sink Test")
+    print("=" * 60)
+
+    test_ndjson_rolling()
+    test_optional_formats()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk transaction ID schemes
+"""
+
+import sys
+import os
+import time
+import uuid
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.blast import PayloadRing
+from src.data_generator import TransactionGenerator
+from src.ids import SNOWFLAKE_EPOCH_MS, create_id_generator
+from src.serializers import create_serializer
+
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def ulid_to_int(text: str) -> int:
+    value = 0
+    for char in text:
+        value = value * 32 + CROCKFORD.index(char)
+    return value
+
+def test_uuid4():
+    """Test bulk UUID4 format and seeded reproducibility"""
+    print("=== Testing UUID4 ===")
+    ids = create_id_generator("uuid4").generate(5000)
+    assert len(set(ids)) == 5000
+    for text in ids[:500]:
+        assert str(uuid.UUID(text)) == text and uuid.UUID(text).version == 4
+    first = create_id_generator("uuid4", np.random.default_rng(7)).generate(10)
+    assert first == create_id_generator("uuid4", np.random.default_rng(7)).generate(10)
+    print(f"✅ UUID4 e.g. {ids[0]}")
+
+def test_time_ordered():
+    """Test that UUIDv7 and ULID are strictly increasing and carry the current time"""
+    print("\n=== Testing Time-Ordered IDs ===")
+    for name, to_int in (("uuid7", lambda text: uuid.UUID(text).int), ("ulid", ulid_to_int)):
+        generator = create_id_generator(name)
+        before = time.time_ns() // 1_000_000
+        # Two batches, the first larger than the 4096 IDs a millisecond can hold
+        ids = generator.generate(10000) + generator.generate(3)
+        values = [to_int(text) for text in ids]
+        assert ids == sorted(ids) and len(set(ids)) == len(ids)
+        assert values == sorted(values)
+        millis = values[0] >> 80
+        assert before <= millis <= time.time_ns() // 1_000_000
+        if name == "uuid7":
+            assert all(uuid.UUID(text).version == 7 and uuid.UUID(text).variant == uuid.RFC_4122
+                       for text in ids[:100])
+        else:
+            assert all(len(text) == 26 for text in ids)
+        print(f"✅ {name} ordered, e.g. {ids[0]}")
+
+def test_snowflake_workers():
+    """Test that Snowflake IDs from different workers never collide"""
+    print("\n=== Testing Snowflake Workers ===")
+    first, second = create_id_generator("snowflake", worker_id=1), create_id_generator("snowflake", worker_id=2)
+    ids_a, ids_b = first.generate(20000), second.generate(20000)
+    assert not set(ids_a) & set(ids_b)
+    assert ids_a == sorted(ids_a) and len(set(ids_a)) == len(ids_a)
+    value = int(ids_a[0])
+    assert (value >> 12) & 0x3FF == 1
+    assert abs((value >> 22) + SNOWFLAKE_EPOCH_MS - time.time_ns() // 1_000_000) < 60_000
+    for worker_id in (-1, 1024):
+        try:
+            create_id_generator("snowflake", worker_id=worker_id)
+            assert False, f"worker {worker_id} accepted"
+        except ValueError:
+            pass
+    print(f"✅ Workers 1 and 2 disjoint, e.g. {ids_a[0]}")
+
+def test_generator_schemes():
+    """Test ID schemes in generated batches and blast templates"""
+    print("\n=== Testing Generator ID Schemes ===")
+    generator = TransactionGenerator(seed=31, pool_refresh_interval=0)
+    serializer = create_serializer("orjson")
+    for name in ("ulid", "snowflake"):
+        generator.ids = create_id_generator(name, worker_id=5)
+        ids = generator.generate_batch(500).transaction_id
+        assert ids == sorted(ids) and len(ids[0]) == generator.ids.width
+        ring = PayloadRing(generator, serializer, size=20)
+        messages = ring.render(100).messages
+        decoded = [serializer.decode(value)['transaction_id'] for _, value, _ in messages]
+        assert decoded == sorted(decoded) and decoded == [key.decode() for _, _, key in messages]
+        assert decoded[0] > ids[-1]
+        print(f"✅ {name} IDs in batches and blast payloads, e.g. {decoded[0]}")
+    generator.close()
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - ID Scheme Test")
+    print("=" * 60)
+
+    test_uuid4()
+    test_time_ordered()
+    test_snowflake_workers()
+    test_generator_schemes()
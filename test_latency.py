@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for latency header stamping and HDR histograms
+"""
+
+import sys
+import os
+import logging
+import re
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+from confluent_kafka import Consumer, Producer
+from src.config import config
+from src.data_generator import TransactionGenerator
+from src.fanout import FanoutGenerator
+from src.latency import HdrHistogram, LatencyRecorder, consume_latency, now_ns
+from src.metrics import REGISTRY
+from src.producer import TransactionProducer
+from src.verify import build_consumer_config
+
+class _LogCapture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(record.getMessage())
+
+def mock_cluster_producer():
+    """A producer on librdkafka's mock cluster, and the cluster's address for a consumer"""
+    capture = _LogCapture()
+    rdkafka_logger = logging.getLogger("test_latency.rdkafka")
+    rdkafka_logger.addHandler(capture)
+    rdkafka_logger.setLevel(logging.DEBUG)
+    rdkafka_logger.propagate = False
+    producer = Producer({'test.mock.num.brokers': 1, 'debug': 'mock', 'logger': rdkafka_logger})
+    producer.poll(0.5)
+    address = next(match.group(0) for match in map(re.compile(r'127\.0\.0\.1:\d+').search, capture.lines) if match)
+    return producer, address
+
+def test_hdr_histogram():
+    """Test quantile precision, clamping and merging"""
+    print("=== Testing HDR Histogram ===")
+    values = np.random.default_rng(3).lognormal(13, 1.5, 200000).astype(np.int64)
+    histogram = HdrHistogram(significant_figures=3)
+    histogram.record_values(values[:100000])
+    other = HdrHistogram(significant_figures=3)
+    other.record_values(values[100000:])
+    histogram.add(other)
+    assert histogram.total == 200000
+    for quantile, value in zip((0.5, 0.99, 0.999, 1.0), histogram.values_at([0.5, 0.99, 0.999, 1.0])):
+        exact = np.quantile(values, quantile, method='inverted_cdf')
+        assert abs(value - exact) <= exact * 1e-3, (quantile, value, exact)
+    print(f"✅ p50/p99/p99.9 within 0.1% using {histogram.counts.nbytes // 1024} KiB of counts")
+
+    small = HdrHistogram(highest=10_000_000)
+    small.record_values([-5, 0, 1, 2047, 10**9])
+    assert small.clamped == 2 and small.values_at([0, 1.0]) == [0, 10_000_000]
+    print("✅ Out-of-range values are clamped and counted")
+
+def test_end_to_end_latency():
+    """Test stamped messages through the mock cluster into per-stage, per-partition histograms"""
+    print("\n=== Testing End-to-End Latency ===")
+    kafka_producer, address = mock_cluster_producer()
+    saved = config.kafka.latency_headers
+    config.kafka.latency_headers = True
+    try:
+        producer = TransactionProducer(producer=kafka_producer)
+    finally:
+        config.kafka.latency_headers = saved
+    generator = TransactionGenerator(seed=11, pool_refresh_interval=0)
+    for _ in range(3):
+        producer.send_batch(generator.generate_batch(500))
+    assert producer.checkpoint(timeout=10) == 0
+    producer_side = producer.latency.snapshot()
+    assert {stage for stage, _, _ in producer_side} == {"produce_ack"}
+    assert sum(row["count"] for row in producer_side.values()) == 1500
+
+    consumer = Consumer(build_consumer_config(bootstrap_servers=address))
+    consumer.subscribe(config.kafka.topics)
+    recorder = LatencyRecorder()
+    try:
+        counts = consume_latency(consumer, recorder, batch_size=400, max_messages=1500, seconds=30)
+    finally:
+        consumer.close()
+    assert counts == {"stamped": 1500, "unstamped": 0}
+    snapshot = recorder.snapshot()
+    for stage in ("generate_produce", "produce_consume"):
+        rows = {key: row for key, row in snapshot.items() if key[0] == stage}
+        assert sum(row["count"] for row in rows.values()) == 1500
+        assert {topic for _, topic, _ in rows} == {"IBFT", "qr_payments", "topup_wallet"}
+        assert all(0 <= row["p50_ms"] <= row["p99_ms"] <= row["p999_ms"] <= row["max_ms"] for row in rows.values())
+    stage, topic, partition = next(iter(snapshot))
+    assert (f'txn_latency_quantile_seconds{{stage="{stage}",topic="{topic}",partition="{partition}",'
+            f'quantile="0.99"}}') in REGISTRY.render()
+    for line in recorder.summary_lines()[:3]:
+        print(f"   {line}")
+    print(f"✅ {len(snapshot)} stage/topic/partition histograms from 1500 stamped messages")
+
+def test_fanout_generation_stamp():
+    """Test that fan-out batches keep their worker's generation stamp through to the consumer"""
+    print("\n=== Testing Fan-out Generation Stamps ===")
+    kafka_producer, address = mock_cluster_producer()
+    saved = config.kafka.latency_headers
+    config.kafka.latency_headers = True
+    try:
+        producer = TransactionProducer(producer=kafka_producer)
+    finally:
+        config.kafka.latency_headers = saved
+    fanout = FanoutGenerator(workers=1, batch_size=300, seed=12, slot_count=2)
+    fanout.start()
+    try:
+        sent = 0
+        while sent < 900:
+            batch = fanout.next_batch(timeout=30)
+            assert batch.generated_ns is not None and batch.generated_ns <= now_ns()
+            sent += producer.send_encoded(batch)
+    finally:
+        fanout.stop()
+    assert producer.checkpoint(timeout=10) == 0
+
+    consumer = Consumer(build_consumer_config(bootstrap_servers=address))
+    consumer.subscribe(config.kafka.topics)
+    recorder = LatencyRecorder()
+    try:
+        counts = consume_latency(consumer, recorder, batch_size=400, max_messages=sent, seconds=30)
+    finally:
+        consumer.close()
+    assert counts == {"stamped": sent, "unstamped": 0}
+    generated = [row for key, row in recorder.snapshot().items() if key[0] == "generate_produce"]
+    assert sum(row["count"] for row in generated) == sent
+    print(f"✅ {sent} fan-out messages recorded generate_produce latency")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Latency Test")
+    print("=" * 60)
+
+    test_hdr_histogram()
+    test_end_to_end_latency()
+    test_fanout_generation_stamp()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus metrics surface
+"""
+
+import sys
+import os
+import json
+import urllib.request
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.metrics import MetricsRegistry, MetricsServer, handle_librdkafka_stats
+
+def test_render_prometheus_text():
+    """Test counter, gauge and histogram exposition"""
+    print("=== Testing Prometheus Rendering ===")
+    registry = MetricsRegistry()
+    registry.counter('sent_total', 'Messages sent', ['topic']).labels('IBFT').inc(3)
+    registry.gauge('depth', 'Queue depth').set_function(lambda: 7)
+    latency = registry.histogram('latency_seconds', 'Latency', ['topic'], buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.5):
+        latency.labels('IBFT').observe(value)
+
+    text = registry.render()
+    print(text)
+    assert 'sent_total{topic="IBFT"} 3' in text
+    assert 'depth 7' in text
+    assert 'latency_seconds_bucket{topic="IBFT",le="0.01"} 1' in text
+    assert 'latency_seconds_bucket{topic="IBFT",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{topic="IBFT",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{topic="IBFT"} 3' in text
+    registry.counter('errors_total', 'Errors', ['reason']).labels('bad "path" C:\\tmp\nnext').inc()
+    assert r'errors_total{reason="bad \"path\" C:\\tmp\nnext"} 1' in registry.render()
+    print("✅ Metrics rendered")
+
+def test_librdkafka_stats():
+    """Test parsing librdkafka statistics JSON into gauges"""
+    print("\n=== Testing librdkafka Statistics ===")
+    registry = MetricsRegistry()
+    handle_librdkafka_stats(json.dumps({
+        "msg_cnt": 12, "msg_size": 3400, "txmsgs": 1000,
+        "brokers": {"b1": {"name": "kafka:29092/1", "txretries": 2, "outbuf_msg_cnt": 5,
+                           "rtt": {"avg": 1500}}},
+        "topics": {"IBFT": {"batchsize": {"avg": 8000}, "batchcnt": {"avg": 16},
+                            "partitions": {"0": {"msgq_cnt": 3, "xmit_msgq_cnt": 1},
+                                           "-1": {"msgq_cnt": 0, "xmit_msgq_cnt": 0}}}},
+    }), registry)
+    text = registry.render()
+    assert 'librdkafka_msg_cnt 12' in text
+    assert 'librdkafka_broker_rtt_avg_seconds{broker="kafka:29092/1"} 0.0015' in text
+    assert 'librdkafka_partition_msgq_cnt{topic="IBFT",partition="0"} 4' in text
+    assert 'partition="-1"' not in text
+    print("✅ Statistics parsed")
+
+def test_metrics_server():
+    """Test scraping metrics over HTTP"""
+    print("\n=== Testing Metrics Server ===")
+    registry = MetricsRegistry()
+    registry.counter('scrapes_total', 'Scrapes').inc()
+    server = MetricsServer(0, registry, host='127.0.0.1')
+    server.start()
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics') as response:
+            body = response.read().decode('utf-8')
+            assert response.headers['Content-Type'].startswith('text/plain')
+    finally:
+        server.stop()
+    assert 'scrapes_total 1' in body
+    print("✅ Metrics scraped over HTTP")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Metrics Test")
+    print("=" * 60)
+
+    test_render_prometheus_text()
+    test_librdkafka_stats()
+    test_metrics_server()
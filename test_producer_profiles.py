@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for producer tuning profiles against the librdkafka mock cluster
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.profiles import PRODUCER_PROFILES, build_producer_config, measure_profile
+
+def test_profile_configs():
+    """Test that every profile builds a complete producer configuration"""
+    print("=== Testing Profile Configs ===")
+    for profile in PRODUCER_PROFILES:
+        producer_config = build_producer_config(profile, 'broker:9092')
+        assert producer_config['bootstrap.servers'] == 'broker:9092'
+        assert 'linger.ms' in producer_config and 'compression.type' in producer_config
+        if producer_config.get('enable.idempotence'):
+            assert producer_config['acks'] == 'all'
+            assert producer_config['max.in.flight.requests.per.connection'] <= 5
+        print(f"✅ {profile}: {PRODUCER_PROFILES[profile]}")
+
+    try:
+        build_producer_config('fastest')
+    except ValueError:
+        print("✅ Unknown profile rejected")
+    else:
+        raise AssertionError("Unknown profile should be rejected")
+
+def test_measure_profiles():
+    """Test the measurement harness against the mock cluster"""
+    print("\n=== Testing Profile Harness ===")
+    payloads = [b'{"transaction_id": "%d"}' % i for i in range(2000)]
+    for profile in ('latency', 'durable-idempotent'):
+        result = measure_profile(profile, payloads, mock_brokers=1)
+        assert result['delivered'] == len(payloads) and result['failed'] == 0
+        print(f"✅ {profile}: {result['messages_per_sec']:,.0f} msgs/s, "
+              f"p99 {result['latency_p99_ms']:.1f} ms")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Producer Profile Test")
+    print("=" * 60)
+
+    test_profile_configs()
+    test_measure_profiles()
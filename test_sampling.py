@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for skewed activity distributions
+"""
+
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data_generator import TransactionGenerator
+from src.sampling import AliasTable, parse_distribution, zipf_weights
+
+def test_alias_table():
+    """Test that alias tables reproduce their weights"""
+    print("=== Testing Alias Table ===")
+    rng = np.random.default_rng(1)
+    for weights in (np.array([5.0, 3.0, 2.0, 0.0]), zipf_weights(20000, 1.1), rng.random(50000)):
+        table = AliasTable(weights)
+        expected = weights / weights.sum()
+        assert np.allclose(table.probabilities(), expected, atol=1e-12)
+        assert (table.prob >= 0).all() and (table.prob <= 1).all()
+
+    table = AliasTable([5.0, 3.0, 2.0, 0.0])
+    draws = table.sample(rng, 200000)
+    shares = np.bincount(draws, minlength=4) / len(draws)
+    print(f"Shares for weights 5:3:2:0 -> {np.round(shares, 3)}")
+    assert np.allclose(shares, [0.5, 0.3, 0.2, 0.0], atol=0.01)
+    words = rng.integers(0, 2 ** 64, size=200000, dtype=np.uint64)
+    shares = np.bincount(table.sample_words(words), minlength=4) / len(words)
+    assert np.allclose(shares, [0.5, 0.3, 0.2, 0.0], atol=0.01)
+    print("✅ Alias draws follow the weights")
+
+def test_distribution_specs():
+    """Test distribution spec parsing"""
+    print("\n=== Testing Distribution Specs ===")
+    assert parse_distribution("uniform", 10) is None
+    assert parse_distribution("", 10) is None
+    hot = parse_distribution("hotset:0.1,0.9", 100).probabilities()
+    assert abs(hot[:10].sum() - 0.9) < 1e-9
+    zipf = parse_distribution("zipf:1.2", 1000).probabilities()
+    assert zipf[0] > zipf[1] > zipf[999]
+    for spec in ("zipf:0", "hotset:2,0.5", "weights:1,2", "pareto:1"):
+        try:
+            parse_distribution(spec, 3)
+            assert False, f"{spec} accepted"
+        except ValueError:
+            pass
+    print("✅ Specs parsed and validated")
+
+def test_generator_skew():
+    """Test that the generator applies user, merchant and type skew"""
+    print("\n=== Testing Generator Skew ===")
+    generator = TransactionGenerator(seed=4, user_count=10000, pool_refresh_interval=0)
+    generator.user_sampler = parse_distribution("hotset:0.01,0.8", len(generator.users))
+    generator.merchant_sampler = parse_distribution("zipf:2", len(generator.merchants))
+    generator.type_sampler = parse_distribution("weights:6,3,1", 3)
+    hot_accounts = set(generator.users.accounts_at(np.arange(100)).tolist())
+
+    for batch in (generator.generate_batch(20000), generator.generate_range(0, 20000)):
+        types = np.bincount(batch.type_code, minlength=3) / len(batch)
+        ibft = batch.sender_account[batch.type_code == 0]
+        hot_share = np.mean([account in hot_accounts for account in ibft])
+        merchants = batch.merchant_id[batch.type_code == 1].tolist()
+        top_merchant = merchants.count(generator.merchants[0]) / len(merchants)
+        print(f"Types {np.round(types, 2)}, hot-set share {hot_share:.2f}, top merchant {top_merchant:.2f}")
+        assert np.allclose(types, [0.6, 0.3, 0.1], atol=0.02)
+        assert 0.75 < hot_share < 0.85
+        assert top_merchant > 0.55
+    generator.close()
+    print("✅ Skew applied in sequential and counter modes")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Sampling Test")
+    print("=" * 60)
+
+    test_alias_table()
+    test_distribution_specs()
+    test_generator_skew()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the pluggable transaction serializers
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data_generator import TransactionGenerator
+from src.serializers import (
+    SERIALIZERS, LocalSchemaRegistry, create_serializer, compare_serializers
+)
+
+def available_serializers(registry_path=None):
+    """Create every serializer whose optional dependency is installed"""
+    serializers = []
+    for name in SERIALIZERS:
+        try:
+            serializers.append(create_serializer(name, registry_path))
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+    return serializers
+
+def test_round_trip():
+    """Test that every serializer decodes what it encodes"""
+    print("=== Testing Serializer Round Trips ===")
+    transactions = TransactionGenerator().generate_transactions(300)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for serializer in available_serializers(os.path.join(tmp, 'registry.json')):
+            for txn in transactions:
+                payload = serializer.encode(txn)
+                assert isinstance(payload, bytes)
+                assert serializer.decode(payload) == txn, serializer.name
+            rows = [tuple(txn.values()) for txn in transactions]
+            assert serializer.encode_rows(rows) == [serializer.encode(txn) for txn in transactions]
+            print(f"✅ {serializer.name} round trip OK")
+
+def test_json_matches_stdlib():
+    """Test that the JSON payload is still plain JSON of the transaction"""
+    print("\n=== Testing JSON Compatibility ===")
+    txn = TransactionGenerator().generate_ibft_transaction()
+    assert json.loads(create_serializer('json').encode(txn)) == txn
+    assert json.loads(create_serializer('orjson').encode(txn)) == txn
+    print("✅ JSON payloads decode with the standard library")
+
+def test_record_encoding_matches_dicts():
+    """Test that records encode to the same bytes as the equivalent dicts"""
+    print("\n=== Testing Record Encoding ===")
+    batch = TransactionGenerator().generate_batch(200)
+    for serializer in available_serializers():
+        from_records = [serializer.encode(record) for record in batch.records()]
+        from_dicts = [serializer.encode(txn) for txn in batch.to_dicts()]
+        assert from_records == from_dicts, serializer.name
+        print(f"✅ {serializer.name} encodes records and dicts identically")
+
+def test_schema_registry():
+    """Test that schema IDs are stable across registry instances"""
+    print("\n=== Testing Local Schema Registry ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'registry.json')
+        avro_id = create_serializer('avro', path).schema_id
+        proto_id = create_serializer('protobuf', path).schema_id
+        assert avro_id != proto_id
+
+        registry = LocalSchemaRegistry(path)
+        assert create_serializer('avro', path).schema_id == avro_id
+        assert registry.get_schema(avro_id)['schemaType'] == 'AVRO'
+        assert create_serializer('avro', path).encode(
+            TransactionGenerator().generate_qr_payment_transaction()
+        )[1:5] == avro_id.to_bytes(4, 'big')
+    print("✅ Schema IDs registered and reused")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Serializer Test")
+    print("=" * 60)
+
+    test_round_trip()
+    test_json_matches_stdlib()
+    test_record_encoding_matches_dicts()
+    test_schema_registry()
+
+    print("\n=== Serializer Comparison ===")
+    transactions = TransactionGenerator().generate_transactions(5000)
+    for result in compare_serializers(transactions):
+        print(result)
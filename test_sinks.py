@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the broker-free message sinks
+"""
+
+import sys
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.config import config
+from src.data_generator import TransactionGenerator
+from src.producer import TransactionProducer
+from src.replay import TransactionReplayer
+from src.segments import SegmentReader, read_frames
+from src.sinks import MemorySink, NullSink, create_sink
+
+def test_sink_selection():
+    """Test that SINK picks the producer's destination and error-only reports are honoured"""
+    print("=== Testing Sink Selection ===")
+    previous = config.sink.type
+    config.sink.type = "null"
+    try:
+        producer = TransactionProducer()
+    finally:
+        config.sink.type = previous
+    assert isinstance(producer.producer, NullSink)
+    generator = TransactionGenerator(seed=51, pool_refresh_interval=0)
+    sent = producer.send_batch(generator.generate_batch(500))
+    producer.checkpoint()
+    assert sent == 500 == producer.delivered and producer.producer.count == 500
+    print(f"✅ SINK=null: {producer.producer.count} messages, {producer.producer.bytes:,} bytes")
+
+    sink = create_sink("null", {'delivery.report.only.error': True})
+    reports = []
+    sink.produce("IBFT", b"value", b"key", callback=lambda err, msg: reports.append(err))
+    assert sink.poll(0) == 0 and not reports and sink.count == 1
+    try:
+        create_sink("carrier-pigeon")
+        assert False, "unknown sink accepted"
+    except ValueError:
+        pass
+    generator.close()
+    print("✅ Error-only reports skip successful deliveries")
+
+def test_memory_backpressure():
+    """Test that a full memory sink pushes back until a consumer drains it"""
+    print("\n=== Testing Memory Sink ===")
+    sink = MemorySink(capacity=100)
+    producer = TransactionProducer(producer=sink)
+    generator = TransactionGenerator(seed=52, pool_refresh_interval=0)
+    batch = generator.generate_batch(1000)
+    generator.close()
+
+    received = []
+    def consume():
+        while len(received) < 1000:
+            received.append(sink.get(timeout=10))
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    sent = producer.send_batch(batch)
+    consumer.join()
+    producer.checkpoint()
+    assert sent == 1000 and producer.delivered == 1000 and producer.failed == 0
+    assert [key.decode() for _, key, _ in received] == batch.transaction_id
+    retries = sum(metrics.retries.value for metrics in producer._topic_metrics.values())
+    print(f"✅ 1000 messages through a 100-slot queue in order ({retries:.0f} full-queue retries)")
+
+    # Built from SINK=memory, the sink drains itself so sends never stall on a full queue
+    saved = (config.sink.type, config.sink.capacity)
+    config.sink.type, config.sink.capacity = "memory", 100
+    try:
+        drained = TransactionProducer()
+    finally:
+        config.sink.type, config.sink.capacity = saved
+    started = time.monotonic()
+    assert drained.send_batch(batch) == 1000
+    drained.close()
+    assert drained.delivered == 1000 and drained.failed == 0 and drained.producer.consumed == 1000
+    print(f"✅ SINK=memory drained 1000 messages past capacity in {time.monotonic() - started:.2f}s")
+
+    for i in range(100):
+        sink.produce("IBFT", b"x", str(i).encode())
+    try:
+        sink.produce("IBFT", b"x", b"overflow")
+        assert False, "full sink accepted a message"
+    except BufferError:
+        pass
+    assert len(sink.drain(40)) == 40 and len(sink.drain()) == 60
+    try:
+        sink.get(timeout=0.01)
+        assert False, "empty sink returned a message"
+    except queue.Empty:
+        pass
+    print("✅ BufferError when full, drain empties the queue")
+
+def test_file_sink_replay():
+    """Test that the file sink writes a segment log that replays message for message"""
+    print("\n=== Testing File Sink ===")
+    generator = TransactionGenerator(seed=53, pool_refresh_interval=0)
+    batch = generator.generate_batch(800)
+    generator.close()
+    with tempfile.TemporaryDirectory() as directory:
+        producer = TransactionProducer(producer=create_sink("file", path=directory))
+        assert producer.send_batch(batch) == 800
+        producer.close()
+        records = list(SegmentReader(directory).read())
+        assert [record.key.decode() for record in records] == batch.transaction_id
+        assert [record.timestamp_us for record in records] == sorted(record.timestamp_us for record in records)
+
+        replayed = NullSink(keep_messages=True)
+        TransactionReplayer(directory, TransactionProducer(producer=replayed), speed=0).run()
+        assert [(topic, key, value) for topic, key, value in replayed.messages] == \
+            [(record.topic, bytes(record.key), bytes(record.value)) for record in records]
+    print(f"✅ {len(records)} records written and replayed")
+
+def test_socket_sink():
+    """Test that the socket sink streams frames a reader can decode"""
+    print("\n=== Testing Socket Sink ===")
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    records = []
+    def receive():
+        connection, _ = server.accept()
+        with connection, connection.makefile('rb') as stream:
+            records.extend(read_frames(stream))
+    receiver = threading.Thread(target=receive)
+    receiver.start()
+
+    generator = TransactionGenerator(seed=54, pool_refresh_interval=0)
+    batch = generator.generate_batch(2000)
+    generator.close()
+    sink = create_sink("socket", address=f"127.0.0.1:{port}")
+    producer = TransactionProducer(producer=sink)
+    assert producer.send_batch(batch) == 2000
+    producer.close()
+    receiver.join(timeout=10)
+    server.close()
+    assert [record.key.decode() for record in records] == batch.transaction_id
+    assert sum(len(record.value) for record in records) == sink.bytes
+    print(f"✅ {len(records)} frames, {sink.bytes:,} payload bytes over TCP")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Sink Test")
+    print("=" * 60)
+
+    test_sink_selection()
+    test_memory_backpressure()
+    test_file_sink_replay()
+    test_socket_sink()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the disk spill journal
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import orjson
+from src.config import config
+from src.data_generator import TransactionGenerator
+from src.producer import TransactionProducer
+from src.segments import list_segments
+from src.sinks import MemorySink
+
+class _Message:
+    def __init__(self, topic, value, key):
+        self._topic, self._value, self._key = topic, value, key
+
+    def topic(self):
+        return self._topic
+
+    def value(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+    def partition(self):
+        return 0
+
+    def offset(self):
+        return -1
+
+    def latency(self):
+        return None
+
+class FlakyBroker:
+    """Producer stand-in whose deliveries fail while ``down`` is set"""
+
+    def __init__(self):
+        self.down = True
+        self.delivered = []
+        self._reports = deque()
+
+    def produce(self, topic, value=None, key=None, callback=None, **kwargs):
+        self._reports.append((callback, topic, value, key))
+
+    def poll(self, timeout=0):
+        count = len(self._reports)
+        for _ in range(count):
+            callback, topic, value, key = self._reports.popleft()
+            if not self.down:
+                self.delivered.append(value)
+            callback("broker down" if self.down else None, _Message(topic, value, key))
+        return count
+
+    def flush(self, timeout=None):
+        self.poll()
+        return 0
+
+    def __len__(self):
+        return len(self._reports)
+
+def spilling_producer(producer, directory):
+    saved = (config.spill.enabled, config.spill.path)
+    config.spill.enabled, config.spill.path = True, directory
+    try:
+        return TransactionProducer(producer=producer)
+    finally:
+        config.spill.enabled, config.spill.path = saved
+
+def wait_for(condition, poll, seconds=30):
+    deadline = time.monotonic() + seconds
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        poll(0.01)
+
+def transaction_ids(values):
+    return [orjson.loads(value)["transaction_id"] for value in values]
+
+def test_spill_when_queue_full():
+    """Test that a full queue spills instead of blocking and the backlog drains in order"""
+    print("=== Testing Spill on a Full Queue ===")
+    generator = TransactionGenerator(seed=21, pool_refresh_interval=0)
+    batches = [generator.generate_batch(500) for _ in range(6)]
+    sent = [row["transaction_id"] for batch in batches for row in batch.views()]
+    sink = MemorySink(capacity=500)
+    with tempfile.TemporaryDirectory() as directory:
+        producer = spilling_producer(sink, directory)
+        started = time.perf_counter()
+        assert sum(producer.send_batch(batch) for batch in batches) == 3000
+        elapsed = time.perf_counter() - started
+        assert producer.failed == 0 and producer.spill.spilled == 2500
+        print(f"✅ 3000 messages accepted in {elapsed * 1000:.0f} ms with room for 500, 2500 spilled")
+
+        received = []
+        consumer = threading.Thread(target=lambda: received.extend(sink.get(timeout=30)[2] for _ in range(3000)))
+        consumer.start()
+        wait_for(lambda: producer.spill.drained == 2500, producer.poll)
+        consumer.join(30)
+        assert transaction_ids(received) == sent
+        wait_for(lambda: not list_segments(directory), producer.poll)
+        assert producer.spill.backlog == 0 and producer.spill.disk_bytes == 0
+        producer.close()
+    assert producer.delivered == 500
+    print("✅ Backlog replayed in generation order and its segments deleted")
+
+def test_broker_outage_and_restart():
+    """Test spilling through an outage, replay after a restart, and the disk bound"""
+    print("\n=== Testing Broker Outage and Restart ===")
+    generator = TransactionGenerator(seed=22, pool_refresh_interval=0)
+    batch = generator.generate_batch(1000)
+    sent = [row["transaction_id"] for row in batch.views()]
+    broker = FlakyBroker()
+    with tempfile.TemporaryDirectory() as directory:
+        producer = spilling_producer(broker, directory)
+        producer.spill.probe_interval = 0.05
+        assert producer.send_batch(batch) == 1000
+        producer.poll()
+        assert producer.spill.broker_down and producer.failed == 0
+        time.sleep(0.3)
+        producer.poll()
+        assert not broker.delivered and producer.spill.spilled > 1000
+        producer.close()
+        assert list_segments(directory) and producer.spill.backlog == 1000
+        print(f"✅ Outage spilled every message ({producer.spill.spilled - 1000} failed probes re-spilled)")
+
+        broker.down = False
+        producer = spilling_producer(broker, directory)
+        wait_for(lambda: len(broker.delivered) == 1000, producer.poll)
+        assert sorted(transaction_ids(broker.delivered)) == sorted(sent)
+        wait_for(lambda: not list_segments(directory), producer.poll)
+        print("✅ Restart replayed the journal left on disk")
+
+        broker.down = True
+        producer.spill.max_bytes = 20000
+        producer.send_batch(generator.generate_batch(1000))
+        producer.poll()
+        # Failed probes that no longer fit are dropped too, without a producer failure
+        assert 0 < producer.failed <= producer.spill.dropped
+        assert producer.spill.disk_bytes <= 20000
+        producer.close()
+    print(f"✅ Disk bound held at {producer.spill.disk_bytes} bytes, {producer.spill.dropped} messages dropped")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Spill Test")
+    print("=" * 60)
+
+    test_spill_when_queue_full()
+    test_broker_outage_and_restart()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the event clock and bulk timestamp formatting
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data_generator import TransactionGenerator
+from src.timestamps import EventClock, format_timestamps, from_micros, to_micros
+
+class FakeClock:
+    """Wall clock that only moves when told to"""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_format_matches_isoformat():
+    """Test that bulk formatting is identical to datetime.isoformat()"""
+    print("=== Testing Timestamp Formatting ===")
+    rng = np.random.default_rng(3)
+    low, high = to_micros(datetime(1999, 12, 31)), to_micros(datetime(2031, 1, 1))
+    timestamp_us = rng.integers(low, high, size=20000)
+    timestamp_us[:50] -= timestamp_us[:50] % 1_000_000  # Whole seconds drop the fraction
+    edges = [to_micros(datetime(2024, 2, 29, 23, 59, 59, 999999)), to_micros(datetime(2024, 3, 1)), 0]
+    timestamp_us = np.concatenate([timestamp_us, edges])
+
+    expected = [from_micros(us).isoformat() for us in timestamp_us.tolist()]
+    assert format_timestamps(timestamp_us) == expected
+    assert format_timestamps(np.array([], dtype=np.int64)) == []
+    print(f"✅ {len(expected)} timestamps match isoformat, e.g. {expected[-2]}")
+
+def test_sequential_mode():
+    """Test that sequential mode keeps the 10s-5min gaps"""
+    print("\n=== Testing Sequential Clock ===")
+    clock = EventClock("sequential", start=datetime(2024, 1, 1))
+    rng = np.random.default_rng(1)
+    first = clock.next_batch(1000, rng)
+    second = clock.next_batch(1000, rng)
+    gaps = np.diff(np.concatenate([[to_micros(datetime(2024, 1, 1))], first, second]))
+    assert gaps.min() >= 10_000_000 and gaps.max() <= 300_000_000
+    print("✅ Sequential gaps stay between 10s and 5min")
+
+def test_wall_and_accelerated_modes():
+    """Test that wall-clock modes follow the (scaled) wall clock"""
+    print("\n=== Testing Wall and Accelerated Clocks ===")
+    rng = np.random.default_rng(2)
+    for mode, speed in (("wall", 1.0), ("accelerated", 60.0)):
+        wall = FakeClock()
+        clock = EventClock(mode, speed=speed, start=datetime(2024, 6, 1), clock=wall)
+        origin = clock.now_us()
+        batches = []
+        for _ in range(5):
+            wall.now += 2.0
+            batch = clock.next_batch(500, rng)
+            assert batch[-1] == clock.now_us()
+            batches.append(batch)
+        stream = np.concatenate(batches)
+        assert np.all(np.diff(stream) >= 0)
+        elapsed = (stream[-1] - origin) / 1e6
+        print(f"{mode}: 10s of wall time -> {elapsed:.0f}s of event time")
+        assert elapsed == 10 * speed
+    print("✅ Event time tracks the wall clock")
+
+def test_historical_window():
+    """Test that historical mode replays a fixed window"""
+    print("\n=== Testing Historical Clock ===")
+    start, end = datetime(2023, 11, 24), datetime(2023, 11, 25)
+    wall = FakeClock()
+    clock = EventClock("historical", speed=3600.0, start=start, end=end, clock=wall)
+    rng = np.random.default_rng(4)
+    stamps = []
+    for _ in range(40):
+        wall.now += 1.0  # One event hour per wall second
+        stamps.append(clock.next_batch(100, rng))
+    stream = np.concatenate(stamps)
+    assert stream.min() >= to_micros(start) and stream.max() < to_micros(end)
+    wraps = np.flatnonzero(np.diff(stream) < 0)
+    assert len(wraps) == 1
+    print(f"✅ Window replayed from {from_micros(int(stream[wraps[0] + 1]))}")
+
+    for kwargs in ({"mode": "historical", "start": start}, {"mode": "historical", "start": end, "end": start},
+                   {"mode": "accelerated", "speed": 0}, {"mode": "tomorrow"}):
+        try:
+            EventClock(**kwargs)
+            assert False, f"{kwargs} accepted"
+        except ValueError:
+            pass
+
+def test_generator_restamp():
+    """Test that generated batches use the event clock and can be restamped at send time"""
+    print("\n=== Testing Generator Restamp ===")
+    wall = FakeClock()
+    clock = EventClock("wall", clock=wall)
+    generator = TransactionGenerator(seed=6, pool_refresh_interval=0, clock=clock)
+    wall.now += 1.0
+    batch = generator.generate_batch(1000)
+    assert batch.timestamp_us[-1] == clock.now_us()
+
+    wall.now += 0.5
+    chunk = batch.slice(0, 100)
+    clock.stamp(chunk.timestamp_us, generator.rng)
+    assert batch.timestamp_us[99] == clock.now_us()
+    assert batch.to_dicts()[99]['timestamp'] == from_micros(clock.now_us()).isoformat()
+    generator.close()
+    assert timedelta(microseconds=int(batch.timestamp_us[99] - batch.timestamp_us[999])) == timedelta(seconds=0.5)
+    print("✅ Chunks restamped with their release time")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Timestamp Test")
+    print("=" * 60)
+
+    test_format_matches_isoformat()
+    test_sequential_mode()
+    test_wall_and_accelerated_modes()
+    test_historical_window()
+    test_generator_restamp()
@@ -7,8 +7,8 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from data_generator import TransactionGenerator
-from config import config
+from src.data_generator import TransactionGenerator
+from src.config import config
 import json
 
 def test_transaction_generation():
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar user store
+"""
+
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data_generator import TransactionGenerator
+from src.users import UserStore
+
+def test_build_and_access():
+    """Test user layout and O(1) access"""
+    print("=== Testing User Store ===")
+    store = UserStore.build(1000, ["An", "Binh", "Chi"], np.random.default_rng(5))
+    assert len(store) == 1000 and store.nbytes == 1000 * 20
+    user = store.user(10)
+    assert user['name'] in ("An", "Binh", "Chi")
+    assert len(user['account_number']) == 12 and user['account_number'].isdigit()
+    assert user['wallet_id'].startswith("WALLET")
+
+    indices = np.array([10, 3, 10])
+    assert store.accounts_at(indices).tolist()[0] == user['account_number']
+    assert store.names_at(indices)[2] == user['name']
+    assert store.wallets_at(indices)[0] == user['wallet_id']
+    print("✅ Users are addressable by index")
+
+def test_save_and_mmap():
+    """Test saving a store and memory-mapping it back"""
+    print("\n=== Testing Memory-Mapped Store ===")
+    store = UserStore.build(2_000_000, ["Lan", "Minh"], np.random.default_rng(6))
+    with tempfile.TemporaryDirectory() as directory:
+        store.save(directory)
+        start = time.perf_counter()
+        loaded = UserStore.load(directory)
+        elapsed = time.perf_counter() - start
+        print(f"Loaded {len(loaded):,} users in {elapsed * 1000:.1f}ms")
+        assert isinstance(loaded.account, np.memmap)
+        for index in (0, 1_234_567, 1_999_999):
+            assert loaded.user(index) == store.user(index)
+        del loaded
+    print("✅ Stores round-trip through memory-mapped files")
+
+def test_generator_population():
+    """Test that the generator draws from a large population"""
+    print("\n=== Testing Generator Population ===")
+    generator = TransactionGenerator(seed=8, user_count=100000, pool_refresh_interval=0)
+    batch = generator.generate_batch(5000, "IBFT")
+    senders = set(batch.sender_account.tolist())
+    print(f"Distinct senders in 5000 transfers: {len(senders)}")
+    assert len(senders) > 4000
+    topups = generator.generate_batch(100, "TOPUP")
+    assert all(wallet.startswith("WALLET") for wallet in topups.wallet_id)
+    assert all(account is None for account in topups.sender_account)
+    generator.close()
+    print("✅ Generator uses the columnar population")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - User Store Test")
+    print("=" * 60)
+
+    test_build_and_access()
+    test_save_and_mmap()
+    test_generator_population()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the bulk verification consumer
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import orjson
+from src.config import config
+from src.data_generator import TransactionGenerator
+from src.producer import TOPIC_MAPPING, TransactionProducer
+from src.segments import SegmentWriter
+from src.serializers import create_serializer
+from src.verify import BloomFilter, SequenceBitmap, Verifier, segment_batches
+
+START = datetime(2024, 1, 1)
+
+def test_bloom_and_bitmap():
+    """Test duplicate lookups in the bloom filter and gap tracking in the sequence bitmap"""
+    print("=== Testing Bloom Filter and Sequence Bitmap ===")
+    ids = BloomFilter(100000, error_rate=0.001)
+    keys = [f"txn-{i}" for i in range(50000)]
+    assert not ids.add(keys).any() and ids.count == 50000
+    assert ids.add(keys[:100]).all()
+    assert ids.add(["new", "new", "other"]).tolist() == [False, True, False]
+    false_positives = ids.add([f"fresh-{i}" for i in range(40000)]).mean()
+    assert false_positives < 0.005
+    print(f"✅ {ids.size / 8 / 1024:.0f} KiB filter, {false_positives:.3%} false positives near capacity")
+
+    step = 1000
+    sequence = SequenceBitmap(0, step)
+    assert not sequence.add(step * (100000 + np.arange(50))).any()
+    sequence.add([step * 100060 + 7, step * 99990])
+    assert sequence.add([step * 100010]).all()
+    assert sequence.missing == 9 + 10
+    assert sequence.missing_ranges() == [(99991, 99999), (100050, 100059)]
+    print(f"✅ Missing positions {sequence.missing_ranges()}")
+
+def test_verify_segment_log():
+    """Test a clean counter-mode run, then one with every kind of fault"""
+    print("\n=== Testing Verification of a Segment Log ===")
+    serializer = create_serializer("orjson")
+    saved = (config.sink.type, config.sink.path, config.kafka.serializer)
+    with tempfile.TemporaryDirectory() as clean, tempfile.TemporaryDirectory() as faulty:
+        try:
+            config.sink.type, config.sink.path, config.kafka.serializer = "file", clean, "orjson"
+            generator = TransactionGenerator(seed=5, counter_mode=True, start_time=START, pool_refresh_interval=0)
+            producer = TransactionProducer()
+            for _ in range(4):
+                producer.send_batch(generator.generate_batch(5000))
+            producer.close()
+        finally:
+            config.sink.type, config.sink.path, config.kafka.serializer = saved
+        verifier = Verifier(serializer, capacity=100000, counter_start=START)
+        summary = verifier.run(segment_batches(clean, batch_size=3000))
+        assert summary["messages"] == summary["valid"] == 20000 and verifier.problems == 0
+        assert summary["positions"] == (0, 19999) and sum(summary["types"].values()) == 20000
+        print(f"✅ 20000 clean messages: {summary['types']}")
+
+        rows = generator.generate_range(0, 1000).to_dicts()
+        with SegmentWriter(faulty) as log:
+            for index, row in enumerate(rows):
+                if 400 <= index < 410:
+                    continue  # dropped
+                topic = TOPIC_MAPPING[row["transaction_type"]]
+                log.append(topic, None, orjson.dumps(row))
+                if index == 500:
+                    log.append(topic, None, orjson.dumps(row))  # redelivered
+            log.append("IBFT", None, b'{"transaction_id": ')
+            log.append("IBFT", None, b'1,2')
+            qr = next(row for row in rows if row["transaction_type"] == "QR")
+            log.append("IBFT", None, orjson.dumps(qr))
+            log.append("qr_payments", None, orjson.dumps(dict(qr, merchant_id=None)))
+            log.append("qr_payments", None, orjson.dumps(dict(qr, amount=-1)))
+            log.append("qr_payments", None, orjson.dumps({k: v for k, v in qr.items() if k != "currency"}))
+        verifier = Verifier(serializer, capacity=100000, counter_start=START)
+        summary = verifier.run(segment_batches(faulty, batch_size=256))
+        assert summary["messages"] == 997 and summary["valid"] == 991
+        assert summary["decode_errors"] == 2
+        assert summary["invalid"] == {"QR on topic IBFT": 1, "QR without merchant_id": 1,
+                                      "QR amount out of range": 1, "missing currency": 1}
+        assert summary["duplicates"] == 1 and summary["replayed"] == 1
+        assert summary["missing"] == 10 and summary["missing_ranges"] == [(400, 409)]
+        assert verifier.problems == 2 + 4 + 1 + 1 + 10
+    print(f"✅ Found {summary['decode_errors']} undecodable, {summary['invalid']}, one duplicate and 10 missing")
+
+if __name__ == "__main__":
+    print("VPBank Transaction Simulator - Verification Consumer Test")
+    print("=" * 60)
+
+    test_bloom_and_bitmap()
+    test_verify_segment_log()